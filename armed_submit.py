@@ -0,0 +1,206 @@
+"""
+预装填写提交工具
+功能：问卷开放前把字典匹配、填写和提交逻辑编译成一段JS，用Page.addScriptToEvaluateOnNewDocument预装到浏览器，
+      之后每次刷新/跳转时页面一加载就自动运行，表单出现即在页面内完成填写和点击提交，中间没有任何Python往返
+"""
+
+import json
+import time
+from urllib.parse import urlsplit
+
+from page_scan import (DISCOVER_INPUTS_JS, EXTRACT_LABELS_JS, LOCATE_SUBMIT_JS,
+                       INPUT_SELECTOR, SUBMIT_CANDIDATE_SELECTOR)
+from fast_fill import FILL_VALUES_JS
+from submit_monitor import ARM_MONITOR_JS, SUBMIT_URL_PATTERN, SUCCESS_KEYWORDS, VALIDATION_ERROR_SELECTOR
+
+# 页面内结果在sessionStorage中的键，提交后跳转到完成页仍可读取
+RESULT_STORAGE_KEY = '__armedPayloadResult'
+
+# ==================== 页面内脚本 ====================
+
+# 预装脚本模板：__CONFIG__ 替换为JSON配置，各__*_BODY__替换为page_scan等模块中的现成脚本
+_PAYLOAD_TEMPLATE = r"""
+(function () {
+    var CONFIG = __CONFIG__;
+    if (window.top !== window || location.host !== CONFIG.host) return;
+    if (sessionStorage.getItem(CONFIG.storageKey + ':' + location.pathname)) return;  // 本页已提交过
+
+    var state = window.__armedPayload = {state: 'armed', url: location.href};
+    function call(body, args) { return body.apply(null, args); }
+    var discoverInputs = function () { __DISCOVER_BODY__ };
+    var extractLabels = function () { __LABELS_BODY__ };
+    var fillValues = function () { __FILL_BODY__ };
+    var locateSubmit = function () { __SUBMIT_BODY__ };
+    var armMonitor = function () { __MONITOR_BODY__ };
+
+    // 与dict_matcher.KeywordMatcher相同的Aho-Corasick自动机（由Python编译后导出），一次扫描文本；
+    // 命中多个时取最长的，长度相同取位置靠前的；按码点计位置，与Python一致
+    var AUTOMATON = CONFIG.automaton, hasOwn = Object.prototype.hasOwnProperty;
+    function matchKey(text) {
+        var chars = Array.from(text), state = 0, best = null, bestStart = -1;
+        for (var i = 0; i < chars.length; i++) {
+            var ch = chars[i];
+            while (state && !hasOwn.call(AUTOMATON.goto[state], ch)) state = AUTOMATON.fail[state];
+            state = hasOwn.call(AUTOMATON.goto[state], ch) ? AUTOMATON.goto[state][ch] : 0;
+            var output = AUTOMATON.output[state];
+            for (var j = 0; j < output.length; j++) {
+                var start = i - output[j][1] + 1;
+                if (!best || output[j][1] > best[1] || (output[j][1] === best[1] && start < bestStart)) {
+                    best = output[j];
+                    bestStart = start;
+                }
+            }
+        }
+        return best ? [best[0], CONFIG.answers[best[0]]] : null;
+    }
+
+    function finish(status, extra) {
+        state.state = status;
+        for (var k in extra) state[k] = extra[k];
+        try { sessionStorage.setItem(CONFIG.storageKey, JSON.stringify(state)); } catch (e) {}
+    }
+
+    function run() {
+        if (state.state !== 'armed') return true;
+        var found = call(discoverInputs, [CONFIG.inputSelector]);
+        if (!found.length) return false;
+
+        var started = performance.now();
+        var inputs = found.map(function (item) { return item.element; });
+        var labels = call(extractLabels, [inputs, CONFIG.inputSelector]);
+        var items = [], fields = [];
+        for (var i = 0; i < inputs.length; i++) {
+            var label = (labels[i] && labels[i].text) || '';
+            var entry = label ? matchKey(label) : null;
+            var value = entry ? entry[1] : CONFIG.defaultValue;
+            items.push([inputs[i], value]);
+            fields.push({label: label, key: entry ? entry[0] : null, value: value});
+        }
+        var written = call(fillValues, [items]);
+        var filled = written.filter(function (ok) { return ok; }).length;
+        var result = {total: inputs.length, filled: filled, fields: fields};
+
+        if (!CONFIG.autoSubmit) {
+            result.elapsedMs = performance.now() - started;
+            finish('filled', result);
+            return true;
+        }
+        var button = call(locateSubmit, [CONFIG.submitSelector, 40]);
+        if (!button) {
+            result.elapsedMs = performance.now() - started;
+            finish('no_button', result);
+            return true;
+        }
+        call(armMonitor, [CONFIG.submitPattern, CONFIG.successWords, CONFIG.errorSelector]);
+        result.button = button.text;
+        result.elapsedMs = performance.now() - started;
+        finish('submitted', result);
+        sessionStorage.setItem(CONFIG.storageKey + ':' + location.pathname, '1');
+        button.element.click();
+        return true;
+    }
+
+    function start() {
+        if (run()) return;
+        var scheduled = false;
+        var observer = new MutationObserver(function () {
+            if (scheduled) return;
+            scheduled = true;
+            setTimeout(function () {
+                scheduled = false;
+                if (run()) observer.disconnect();
+            }, 0);
+        });
+        observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true,
+                                                    attributeFilter: ['style', 'class', 'hidden', 'disabled']});
+    }
+    // 排在页面自己的ready回调之后运行，保证问卷星的校验和提交处理已绑定
+    function schedule() {
+        if (window.jQuery) window.jQuery(function () { setTimeout(start, CONFIG.settleMs); });
+        else setTimeout(start, CONFIG.settleMs);
+    }
+    if (document.readyState === 'loading') document.addEventListener('DOMContentLoaded', schedule);
+    else schedule();
+})();
+"""
+
+READ_RESULT_JS = r"""
+var state = window.__armedPayload;
+if (state && state.state !== 'armed') return state;
+var stored = sessionStorage.getItem(arguments[0]);
+return stored ? JSON.parse(stored) : (state || null);
+"""
+
+CANCEL_JS = r"""
+if (window.__armedPayload && window.__armedPayload.state === 'armed') window.__armedPayload.state = 'cancelled';
+"""
+
+# 清除上一次运行留下的结果和"已提交"标记
+RESET_JS = r"""
+var prefix = arguments[0];
+Object.keys(sessionStorage).forEach(function (key) {
+    if (key.indexOf(prefix) === 0) sessionStorage.removeItem(key);
+});
+"""
+
+
+# ==================== 工具函数 ====================
+
+def build_payload(matcher, url, default_value="默认填写", auto_submit=True, settle_ms=50):
+    """把字典（已编译的KeywordMatcher）和填写/提交逻辑编译成预装脚本，只在url所在的站点运行"""
+    config = {
+        'host': urlsplit(url).netloc,
+        'automaton': matcher.export_tables(),
+        'answers': matcher.mapping,
+        'defaultValue': default_value,
+        'autoSubmit': auto_submit,
+        'settleMs': settle_ms,
+        'inputSelector': INPUT_SELECTOR,
+        'submitSelector': SUBMIT_CANDIDATE_SELECTOR,
+        'submitPattern': SUBMIT_URL_PATTERN,
+        'successWords': SUCCESS_KEYWORDS,
+        'errorSelector': VALIDATION_ERROR_SELECTOR,
+        'storageKey': RESULT_STORAGE_KEY,
+    }
+    return (_PAYLOAD_TEMPLATE
+            .replace('__CONFIG__', json.dumps(config, ensure_ascii=False))
+            .replace('__DISCOVER_BODY__', DISCOVER_INPUTS_JS)
+            .replace('__LABELS_BODY__', EXTRACT_LABELS_JS)
+            .replace('__FILL_BODY__', FILL_VALUES_JS)
+            .replace('__SUBMIT_BODY__', LOCATE_SUBMIT_JS)
+            .replace('__MONITOR_BODY__', ARM_MONITOR_JS))
+
+
+def arm_payload(driver, matcher, url, **options):
+    """预装脚本，之后加载的每个页面都会自动运行；返回脚本标识，用于disarm_payload"""
+    driver.execute_cdp_cmd('Page.enable', {})
+    driver.execute_script(RESET_JS, RESULT_STORAGE_KEY)
+    source = build_payload(matcher, url, **options)
+    return driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': source})['identifier']
+
+
+def disarm_payload(driver, identifier):
+    """移除预装脚本，并停止当前页面中尚未执行的预装逻辑"""
+    try:
+        driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': identifier})
+        driver.execute_script(CANCEL_JS)
+    except Exception as e:
+        print(f"移除预装脚本失败: {e}")
+
+
+def read_payload_result(driver):
+    """读取预装脚本的执行结果，state为 armed / filled / no_button / submitted / cancelled"""
+    try:
+        return driver.execute_script(READ_RESULT_JS, RESULT_STORAGE_KEY)
+    except Exception:
+        return None
+
+
+def wait_payload_result(driver, timeout=2.0, interval=0.05):
+    """页面已出现表单时，等待预装脚本执行完（最多timeout秒）"""
+    deadline = time.time() + timeout
+    while True:
+        result = read_payload_result(driver)
+        if (result and result.get('state') != 'armed') or time.time() >= deadline:
+            return result
+        time.sleep(interval)
@@ -0,0 +1,1615 @@
+"""
+统一填写流程
+功能：四个脚本共用的分阶段填写引擎，流程为
+      打开网页 -> 等待开放 -> 查找输入框 -> 提取标签 -> 填写 -> 查找提交按钮 -> 提交 -> 确认结果；
+      每个阶段有若干种实现（一次往返的批量实现和逐个元素的兼容实现），由PipelineConfig按名称选择，
+      各脚本原有的行为就是不同的阶段配置，某项优化只需在这里实现一次
+
+每个阶段计入耗时追踪（tracing.span），各阶段耗时写入结果摘要的stage_ms，也可用add_hook注册回调；
+AutofillPipeline.use可以把某个阶段替换为其他已注册的实现或自定义函数 func(run)
+"""
+
+import re
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.action_chains import ActionChains
+
+from armed_submit import arm_payload, disarm_payload, read_payload_result, wait_payload_result
+from driver_backend import DriverBackend
+from fast_fill import fill_values_batch, insert_text, insert_text_batch
+from field_refs import field_locators, rebind_fields
+from field_verify import flagged_fields, verify_fields
+from geometric_labels import extract_labels_geometric
+from http_poller import SurveyHttpPoller, cookies_from_driver
+from label_stats import LabelStats
+from open_scheduler import scheduler_from_driver
+from page_ready import START_BUTTON_SELECTOR, wait_for_survey_ready
+from page_scan import _JS_HELPERS, LABEL_METHODS, discover_inputs, extract_labels_batch, locate_submit_button
+from resource_blocking import block_resources, release_resource_blocking
+from structure_cache import StructureCache, element_locator, scan_structure
+from submit_monitor import OUTCOME_VALIDATION_ERROR, SubmitMonitor, discard_network_log
+from tracing import span
+
+# 阶段名称（按执行顺序）及显示名称
+STAGE_ORDER = ('open', 'wait_open', 'discover', 'labels', 'fill', 'locate_submit', 'submit', 'confirm')
+STAGE_TITLES = {
+    'open': '打开网页',
+    'wait_open': '等待问卷开放',
+    'discover': '查找输入框',
+    'labels': '提取标签',
+    'fill': '自动填写输入框',
+    'locate_submit': '查找提交按钮',
+    'submit': '点击提交按钮',
+    'confirm': '确认结果',
+}
+
+# 未指定时各阶段使用的实现
+DEFAULT_STAGES = {
+    'open': 'navigate',
+    'wait_open': 'none',
+    'discover': 'batch',
+    'labels': 'dom',
+    'fill': 'batch',
+    'locate_submit': 'scored',
+    'submit': 'actions',
+    'confirm': 'outcome',
+}
+
+# 流程参数的默认值
+DEFAULT_OPTIONS = {
+    'max_retries': 15,            # 查找输入框的最大尝试次数
+    'refresh_interval': 0.5,      # 两次尝试之间的间隔（秒）
+    'retry_mode': 'refresh',      # 未找到输入框时："refresh"刷新，"schedule"按开放时间休眠后刷新，"reopen"重新打开网址
+    'ready_timeout': 5,           # 等待输入框或按钮出现的最长时间（秒）
+    'submit_timeout': 10,         # 点击提交后等待结果的最长时间（秒）
+    'http_prepoll': False,        # 等待初始按钮时用HTTP轮询代替浏览器刷新
+    'http_poll_interval': 0.5,
+    'open_lead_time': 1.5,        # 开放前多少秒开始密集轮询
+    'tight_poll_interval': 0.1,   # 密集轮询区间内的HTTP轮询和刷新间隔（秒）
+    'block_resources': True,      # 刷新等待阶段屏蔽图片、字体和统计脚本
+    'typing_mode': 'send_keys',   # 逐个输入方式："send_keys"或"cdp"
+    'fill_unmatched': True,       # 未匹配到关键字的输入框填写默认值
+    'structure_cache': False,     # 读写问卷结构缓存
+    'label_stats': True,          # 按历史统计调整标签提取方法的顺序，并记录本次各方法的命中情况
+    'armed_submit': False,        # 开放前预装页面内填写提交脚本
+    'pre_submit_check': 'report',  # 提交前检查："none"不检查，"report"只提示，"refill"补填空输入框且未全部填写时不提交
+    'click_delay': 0.5,           # 点击提交前等待的秒数
+    'resubmit_attempts': 1,       # 提交未通过校验时，按字典补填被标记的输入框并重新提交的次数
+}
+
+INPUT_SELECTORS = [
+    'input[type="text"]',
+    'input[type="password"]',
+    'input[type="email"]',
+    'input[type="number"]',
+    'input[type="tel"]',
+    'input[type="search"]',
+    'input[type="url"]',
+    'textarea',
+    'input:not([type])',
+]
+
+INITIAL_BUTTON_SELECTORS = [
+    "button",  # 所有按钮
+    "input[type='button']",  # 输入类型按钮
+    "input[type='submit']",  # 提交按钮
+    "div[role='button']",  # 具有按钮角色的div
+    "a[role='button']",  # 具有按钮角色的链接
+    ".btn",  # 类名为btn的元素
+    ".button",  # 类名为button的元素
+    "input[value*='开始']",  # 值包含"开始"的输入框
+    "input[value*='进入']",  # 值包含"进入"的输入框
+    "input[value*='Start']",  # 值包含"Start"的输入框
+    "input[value*='Enter']",  # 值包含"Enter"的输入框
+]
+
+SUBMIT_BUTTON_SELECTORS = [
+    # 问卷星的提交按钮: <div id="ctlNext" class="submitbtn mainBgColor">提交</div>
+    'div.submitbtn',
+    'div[class*="submitbtn"]',
+    'div[class*="submit"]',
+    'div[class*="btn"]',
+    'div[id*="submit"]',
+    'div[id*="next"]',
+    'div[id*="ctlNext"]',
+    'div[id*="ctl_Next"]',
+    'button.submitbtn',
+    'button[class*="submitbtn"]',
+    'input[type="submit"]',
+    'input[value*="提交"]',
+    'input[value*="下一步"]',
+    'button[type="submit"]',
+    'a[class*="submitbtn"]',
+    'a[class*="btn"]',
+    'span[class*="submitbtn"]',
+    'span[class*="btn"]',
+]
+
+SUBMIT_TEXT_XPATHS = [
+    "//*[contains(text(), '提交')]",
+    "//*[contains(text(), '下一步')]",
+    "//*[contains(text(), '确认')]",
+    "//*[contains(text(), 'Submit')]",
+    "//*[contains(text(), 'submit')]",
+]
+
+SUBMIT_WORDS = ["提交", "下一步", "确认", "submit"]
+
+CHINESE_RE = re.compile(r'[\u4e00-\u9fff]')
+CHINESE_PHRASE_RE = re.compile(r'[\u4e00-\u9fff]{2,}')
+
+# 与INITIAL_BUTTON_SELECTORS逐个查找相同的规则：第一个可见、可用且文字较短的按钮
+FIND_START_BUTTON_JS = _JS_HELPERS + r"""
+var nodes = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    if (!isVisible(el) || !isEnabled(el)) continue;
+    var text = (el.innerText || '').trim() || el.value || el.getAttribute('placeholder') || '';
+    if (text && text.length < 50) return el;
+}
+return null;
+"""
+
+JS_CLICK = "arguments[0].click();"
+DISPATCH_CLICK_JS = "arguments[0].dispatchEvent(new MouseEvent('click', {bubbles: true, cancelable: true, view: window}));"
+
+
+# ==================== 配置与运行状态 ====================
+
+class PipelineConfig:
+    def __init__(self, name, stages=None, confirm=None, **options):
+        """name为脚本名称；stages为 阶段 -> 实现名称，未指定的阶段使用DEFAULT_STAGES；
+        confirm为网页打开后的确认函数，返回False时结束流程；其余参数见DEFAULT_OPTIONS"""
+        stages = dict(DEFAULT_STAGES, **(stages or {}))
+        for stage, implementation in stages.items():
+            if stage not in STAGE_IMPLEMENTATIONS:
+                raise ValueError(f"未知的阶段: {stage}")
+            if implementation not in STAGE_IMPLEMENTATIONS[stage]:
+                raise ValueError(f"阶段 {stage} 没有实现 {implementation}，"
+                                 f"可选: {', '.join(STAGE_IMPLEMENTATIONS[stage])}")
+        unknown = set(options) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"未知的流程参数: {', '.join(sorted(unknown))}")
+
+        self.name = name
+        self.stages = stages
+        self.confirm = confirm
+        for key, value in dict(DEFAULT_OPTIONS, **options).items():
+            setattr(self, key, value)
+
+
+class PipelineRun:
+    """一次填写流程的状态，各阶段读写其中的字段"""
+
+    def __init__(self, driver, config, profile_store, url):
+        self.driver = driver
+        self.config = config
+        self.profile_store = profile_store
+        self.profile = profile_store.profile
+        self.url = url
+
+        self.inputs = []           # 输入框元素
+        self.field_locators = None  # 与inputs一一对应的稳定定位，元素失效后据此重新获取
+        self.labels = None         # 与inputs一一对应的标签文字
+        self.label_methods = None  # 与inputs一一对应的命中方法（计入标签统计），未按方法顺序提取时为None
+        self.fields = None         # 与inputs一一对应的 {'label', 'key'}，key为None表示填写默认值
+        self.planned_values = None  # 与inputs一一对应的填写内容，不填写的为None（补填时使用）
+        self.structure = None      # 问卷结构指纹和各输入框定位（结构缓存）
+        self.cached_plan = None    # 命中的结构缓存
+        self.filled_count = 0
+        self.button_info = None
+        self.buttons_found = 0
+        self.click_result = None
+        self.page_info = None
+        self.armed_script_id = None
+        self.scheduler = None      # 开放时间调度器，首次需要时创建，之后一直复用
+        self.network_log = True    # performance日志是否可用，不可用时刷新前不再尝试清空
+        self.stage_ms = {}
+
+    def reload_profile(self):
+        """配置文件被修改时换用新的答案和匹配器；已预装填写提交脚本时换成按新配置生成的脚本"""
+        if self.profile_store.reload_if_changed():
+            self.profile = self.profile_store.profile
+            if self.armed_script_id is not None:
+                disarm_payload(self.driver, self.armed_script_id)
+                self.armed_script_id = None
+                if self.arm_submit_script():
+                    print("✓ 已按新配置重新预装填写提交脚本")
+
+    def arm_submit_script(self):
+        """按当前配置预装填写提交脚本，失败时返回False（使用普通流程）"""
+        try:
+            self.armed_script_id = arm_payload(self.driver, self.profile.matcher, self.url,
+                                               default_value=self.profile.default_value)
+            return True
+        except Exception as e:
+            print(f"预装填写提交脚本失败，使用普通流程: {e}")
+            return False
+
+    def refresh_interval(self):
+        """当前的刷新间隔：临近开放时间（调度器的密集轮询区间内）按tight_poll_interval，其余时间按refresh_interval"""
+        if self.scheduler is not None and self.scheduler.in_tight_window():
+            return self.config.tight_poll_interval
+        return self.config.refresh_interval
+
+    def refresh(self):
+        """刷新当前网页，最多等待一个刷新间隔，内容出现即返回；已找到输入框时按定位重新获取"""
+        if self.network_log:
+            # 每次刷新前清空上一轮积累的Network事件，提交时SubmitMonitor只需读取点击前后少量事件
+            self.network_log = discard_network_log(self.driver)
+        try:
+            print("刷新网页...")
+            self.driver.refresh()
+            wait_for_survey_ready(self.driver, self.refresh_interval())
+            print("✓ 网页刷新成功")
+        except Exception as e:
+            print(f"刷新网页失败: {e}")
+            return False
+        if self.inputs:
+            self.rebind_inputs()
+        return True
+
+    def rebind_inputs(self):
+        """输入框元素失效（刷新、重新渲染）后，一次往返按稳定定位重新获取，返回是否全部找回"""
+        if not self.field_locators:
+            return False
+        try:
+            with span('field_rebind'):
+                elements = rebind_fields(self.driver, self.field_locators)
+        except Exception as e:
+            print(f"重新定位输入框失败: {e}")
+            return False
+
+        missing = [i + 1 for i, element in enumerate(elements) if element is None]
+        if missing:
+            print(f"⚠ 按定位未找回输入框: {missing}")
+            return False
+        self.inputs = elements
+        print(f"✓ 已按定位重新获取 {len(elements)} 个输入框")
+        return True
+
+    def summary(self):
+        """各阶段完成后的结果摘要"""
+        click_result = self.click_result or {}
+        summary = {
+            'success': True,
+            'total_inputs': len(self.inputs),
+            'filled_count': self.filled_count,
+            'button_found': self.button_info is not None,
+            'buttons_found': self.buttons_found,
+            'button_clicked': bool(click_result.get('success')),
+            'page_changed': bool(click_result.get('page_changed')),
+            'submit_outcome': click_result.get('outcome'),
+            'stage_ms': self.stage_ms,
+        }
+        if self.page_info is not None:
+            summary['page_title'] = self.page_info.get('标题', 'N/A')
+        return summary
+
+
+class AutofillPipeline:
+    def __init__(self, driver, config, profile_store):
+        self.driver = driver
+        self.config = config
+        self.profile_store = profile_store
+        self.stages = {stage: STAGE_IMPLEMENTATIONS[stage][name] for stage, name in config.stages.items()}
+        self.hooks = []
+
+    def use(self, stage, implementation):
+        """替换某个阶段的实现：implementation为已注册的实现名称或 func(run) 函数"""
+        if stage not in STAGE_IMPLEMENTATIONS:
+            raise ValueError(f"未知的阶段: {stage}")
+        if isinstance(implementation, str):
+            implementation = STAGE_IMPLEMENTATIONS[stage][implementation]
+        self.stages[stage] = implementation
+        return self
+
+    def add_hook(self, callback):
+        """注册阶段耗时回调 callback(stage, elapsed_ms, run)，每个阶段结束后调用"""
+        self.hooks.append(callback)
+        return self
+
+    def start(self, url):
+        """创建一次流程的状态，配合run_stage逐阶段执行"""
+        return PipelineRun(self.driver, self.config, self.profile_store, url)
+
+    def run_stage(self, run, stage):
+        """只执行一个阶段，返回其结果：流程应结束时为摘要，否则为None"""
+        start = time.perf_counter()
+        with span(stage):
+            result = self.stages[stage](run)
+        run.stage_ms[stage] = round((time.perf_counter() - start) * 1000, 3)
+        return result
+
+    def run(self, url):
+        """执行一次完整的填写流程，返回结果摘要；某个阶段返回摘要时提前结束
+
+        无论流程如何结束（未找到按钮、拒绝提交、出错），返回前都会解除资源屏蔽，方便用户手动完成
+        """
+        run = PipelineRun(self.driver, self.config, self.profile_store, url)
+        if self.config.block_resources:
+            block_resources(self.driver)
+
+        try:
+            number = 0
+            for stage in STAGE_ORDER:
+                implementation = self.stages[stage]
+                if implementation is not skip_stage:
+                    number += 1
+                    print(f"\n阶段{number}: {STAGE_TITLES[stage]}")
+
+                result = self.run_stage(run, stage)
+                for hook in self.hooks:
+                    hook(stage, run.stage_ms[stage], run)
+
+                if result is not None:
+                    result.setdefault('stage_ms', run.stage_ms)
+                    return result
+            return run.summary()
+        finally:
+            if self.config.block_resources:
+                release_resource_blocking(self.driver)
+
+
+def skip_stage(run):
+    """不执行任何操作"""
+    return None
+
+
+def fill_implementation(fast_fill, typing_mode):
+    """按脚本的FAST_FILL和TYPING_MODE选择填写阶段的实现"""
+    if fast_fill:
+        return 'batch'
+    return 'cdp' if typing_mode == 'cdp' else 'actions'
+
+
+# ==================== 元素操作 ====================
+
+def contains_chinese(text):
+    """检查是否包含中文"""
+    return bool(text) and bool(CHINESE_RE.search(text))
+
+
+def human_like_typing(element, text):
+    """模拟人类打字，逐个字符输入"""
+    element.clear()
+    for char in text:
+        element.send_keys(char)
+
+
+def mouse_click(driver, element):
+    """模拟鼠标移到元素上点击；DriverBackend（如CDP直连）没有ActionChains，由后端派发鼠标事件"""
+    if isinstance(driver, DriverBackend):
+        driver.click(element)
+    else:
+        ActionChains(driver).move_to_element(element).click().perform()
+
+
+def type_text(run, element, text):
+    """按typing_mode输入文字；cdp模式失败时改为逐字符输入"""
+    if run.config.typing_mode == 'cdp':
+        try:
+            insert_text(run.driver, element, text)
+            return
+        except Exception as e:
+            print(f"CDP输入失败，改为逐字符输入: {e}")
+    human_like_typing(element, text)
+
+
+def find_inputs_by_selectors(driver):
+    """逐个选择器查找可见的输入框（批量脚本不可用时使用）"""
+    input_elements = []
+    for selector in INPUT_SELECTORS:
+        try:
+            for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                try:
+                    if element.is_displayed() and element.is_enabled():
+                        input_elements.append(element)
+                except:
+                    continue
+        except:
+            continue
+    return input_elements
+
+
+def _xpath_label(driver, input_element):
+    # 方法1: 查找前面的label元素
+    for i in range(1, 6):
+        try:
+            label = input_element.find_element(By.XPATH, f".//preceding::label[{i}]")
+            text = label.text.strip()
+            if text and contains_chinese(text):
+                return text
+        except:
+            pass
+    return ""
+
+
+def _xpath_sibling(driver, input_element):
+    # 方法2: 查找前面的兄弟元素
+    for i in range(1, 6):
+        try:
+            sibling = input_element.find_element(By.XPATH, f".//preceding-sibling::*[{i}]")
+            text = sibling.text.strip()
+            if text and contains_chinese(text):
+                return text
+        except:
+            pass
+    return ""
+
+
+def _xpath_ancestor(driver, input_element):
+    # 方法3: 查找父元素中的文本
+    for i in range(1, 4):
+        try:
+            ancestor = input_element.find_element(By.XPATH, f".//ancestor::*[{i}]")
+            for line in ancestor.text.strip().split('\n'):
+                line = line.strip()
+                if line and contains_chinese(line) and len(line) < 50:
+                    return line
+        except:
+            continue
+    return ""
+
+
+def _xpath_placeholder(driver, input_element):
+    # 方法4: 检查placeholder
+    placeholder = input_element.get_attribute("placeholder")
+    if placeholder and contains_chinese(placeholder):
+        return placeholder
+    return ""
+
+
+def _xpath_text_node(driver, input_element):
+    # 方法5: 查找前面最近的文本节点（preceding是反向轴，[1]为离输入框最近的一个，与page_scan中的规则一致）
+    try:
+        text = driver.execute_script("""
+        var iterator = document.evaluate('.//preceding::text()[normalize-space()][1]', arguments[0],
+                                         null, XPathResult.ANY_TYPE, null);
+        var node = iterator.iterateNext();
+        return node ? node.textContent.trim() : '';
+        """, input_element)
+        if text and contains_chinese(text):
+            return text
+    except:
+        pass
+    return ""
+
+
+# 与page_scan.LABEL_METHODS一一对应
+XPATH_LABEL_METHODS = {
+    'label': _xpath_label,
+    'sibling': _xpath_sibling,
+    'ancestor': _xpath_ancestor,
+    'placeholder': _xpath_placeholder,
+    'text_node': _xpath_text_node,
+}
+
+
+def resolve_label_xpath(driver, input_element, order=LABEL_METHODS):
+    """按order逐个方法查找输入框附近的中文文字，未列出的方法在前面都没找到时补充尝试；返回 (文字, 方法名)"""
+    rest = [method for method in LABEL_METHODS if method not in order]
+    try:
+        for method in list(order) + rest:
+            text = XPATH_LABEL_METHODS[method](driver, input_element)
+            if text:
+                return text, method
+    except Exception as e:
+        print(f"提取文本时出错: {e}")
+    return "", ""
+
+
+def extract_chinese_near_input(driver, input_element, order=LABEL_METHODS):
+    """逐个元素查找输入框上方附近的中文文字（批量提取失败时使用）"""
+    return resolve_label_xpath(driver, input_element, order)[0]
+
+
+def find_initial_button(driver):
+    """查找初始按钮（如"开始"、"进入"等）：一次往返查找，失败时逐个选择器查找"""
+    print("查找初始按钮...")
+    try:
+        button = driver.execute_script(FIND_START_BUTTON_JS, START_BUTTON_SELECTOR)
+        if button is not None:
+            print("找到按钮")
+        return button
+    except Exception as e:
+        print(f"批量查找初始按钮失败，改为逐个查找: {e}")
+
+    for selector in INITIAL_BUTTON_SELECTORS:
+        try:
+            for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                try:
+                    if element.is_displayed() and element.is_enabled():
+                        text = element.text.strip() or element.get_attribute("value") or element.get_attribute("placeholder") or ""
+                        if text and len(text) < 50:  # 只检查短文本
+                            print(f"找到按钮: '{text}' (选择器: {selector})")
+                            return element
+                except:
+                    continue
+        except:
+            continue
+    return None
+
+
+def get_button_info(button_element, selector_used):
+    """获取按钮的详细信息"""
+    button_info = {
+        'element': button_element,
+        'tag_name': button_element.tag_name,
+        'text': button_element.text.strip(),
+        'selector_used': selector_used,
+        'attributes': {},
+    }
+
+    try:
+        for attr in ['id', 'class', 'type', 'value', 'name']:
+            value = button_element.get_attribute(attr)
+            if value:
+                button_info['attributes'][attr] = value
+    except:
+        pass
+
+    return button_info
+
+
+def _looks_like_submit(text):
+    return bool(text) and any(word in text.lower() for word in SUBMIT_WORDS)
+
+
+def scan_submit_buttons(driver):
+    """逐个选择器查找所有可能的提交按钮，返回 {'all_buttons', 'submit_buttons'}"""
+    all_buttons = []
+    found_buttons = []
+
+    for selector in SUBMIT_BUTTON_SELECTORS:
+        try:
+            for button in driver.find_elements(By.CSS_SELECTOR, selector):
+                try:
+                    if not (button.is_displayed() and button.is_enabled()):
+                        continue
+                    button_info = get_button_info(button, selector)
+                    all_buttons.append(button_info)
+                    # 通过文本或value属性判断是否是提交按钮
+                    if _looks_like_submit(button_info['text'] or button_info['attributes'].get('value', '')):
+                        found_buttons.append(button_info)
+                        print(f"  发现提交按钮: '{button_info['text'] or button_info['attributes'].get('value')}'")
+                except Exception as e:
+                    print(f"  处理按钮时出错: {e}")
+        except Exception as e:
+            print(f"使用选择器 '{selector}' 时出错: {e}")
+
+    # 如果没有找到，尝试通过文本查找
+    if not found_buttons:
+        print("通过CSS选择器未找到提交按钮，尝试通过文本查找...")
+        for xpath in SUBMIT_TEXT_XPATHS:
+            try:
+                for element in driver.find_elements(By.XPATH, xpath):
+                    try:
+                        if element.is_displayed() and element.is_enabled():
+                            button_info = get_button_info(element, f"XPath: {xpath}")
+                            found_buttons.append(button_info)
+                            print(f"通过文本找到按钮: '{button_info['text']}'")
+                    except:
+                        continue
+            except:
+                continue
+
+    return {'all_buttons': all_buttons, 'submit_buttons': found_buttons}
+
+
+def find_clickable_buttons(driver):
+    """查找页面中所有可点击的按钮（button、input按钮和role=button的元素）"""
+    buttons = driver.find_elements(By.TAG_NAME, "button")
+    for btn_type in ['submit', 'button', 'reset']:
+        buttons.extend(driver.find_elements(By.CSS_SELECTOR, f'input[type="{btn_type}"]'))
+    buttons.extend(driver.find_elements(By.CSS_SELECTOR, '[role="button"]'))
+
+    clickable_buttons = []
+    for btn in buttons:
+        try:
+            if btn.is_displayed() and btn.is_enabled():
+                clickable_buttons.append(btn)
+        except:
+            continue
+    return clickable_buttons
+
+
+def get_page_info(driver):
+    """获取当前页面信息"""
+    info = {}
+    try:
+        info["标题"] = driver.title
+        info["URL"] = driver.current_url
+
+        # 查找页面中的中文文本
+        chinese_matches = CHINESE_PHRASE_RE.findall(driver.page_source)
+        info["中文短语数量"] = len(chinese_matches)
+        info["中文示例"] = list(set(chinese_matches))[:5]
+
+        info["表单数量"] = len(driver.find_elements(By.TAG_NAME, "form"))
+    except Exception as e:
+        info["错误"] = str(e)
+    return info
+
+
+def report_flagged(results):
+    """显示verify_fields结果中未填写或未通过校验的输入框，返回其序号列表（从1开始）"""
+    unfilled_list = [i + 1 for i in flagged_fields(results)]
+    if unfilled_list:
+        details = [f"#{i}（{results[i - 1]['error']}）" if results[i - 1].get('error') else f"#{i}"
+                   for i in unfilled_list]
+        print(f"⚠ 以下输入框未填写或未通过校验: {', '.join(details)}")
+    else:
+        print("✓ 所有输入框均已填写")
+    return unfilled_list
+
+
+def find_unfilled_inputs(driver, input_elements):
+    """一次往返检查所有输入框是否已填写且没有校验错误标记，返回需要补填的输入框序号列表（从1开始）"""
+    return report_flagged(verify_fields(driver, input_elements))
+
+
+def check_inputs_filled(driver, input_elements):
+    """检查所有输入框是否已填写"""
+    return not find_unfilled_inputs(driver, input_elements)
+
+
+# ==================== 阶段：打开网页 ====================
+
+def open_navigate(run):
+    """打开网页，输入框或初始按钮出现即返回；需要时询问用户并预装提交脚本"""
+    print(f"打开网页: {run.url}")
+    try:
+        run.driver.get(run.url)
+        wait_for_survey_ready(run.driver, run.config.ready_timeout)
+        print("✓ 网页打开成功")
+    except Exception as e:
+        print(f"打开网页失败: {e}")
+        return {'success': False, 'error': '打开网页失败'}
+
+    if run.config.confirm is not None:
+        with span('user_confirm'):
+            confirmed = run.config.confirm()
+        if not confirmed:
+            return {'success': False, 'error': '用户选择退出程序'}
+
+    # 预装提交模式：之后的刷新和跳转中，表单一出现就由页面内脚本完成填写和提交
+    if run.config.armed_submit and run.arm_submit_script():
+        print("✓ 已预装填写提交脚本，表单出现后将在页面内直接填写并提交")
+    return None
+
+
+# ==================== 阶段：等待开放 ====================
+
+def _create_http_poller(driver):
+    """创建与浏览器共用会话的HTTP轮询器"""
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        return SurveyHttpPoller(driver.current_url, user_agent=user_agent,
+                                cookie_header=cookies_from_driver(driver))
+    except Exception as e:
+        print(f"创建HTTP轮询器失败，使用浏览器刷新: {e}")
+        return None
+
+
+def _ensure_scheduler(run, poller=None, idle_interval=None):
+    """从"问卷尚未开始"页面解析开放时间并估计服务器时钟偏差
+
+    每次运行只解析一次（页面上没有开放时间时也记下结果），避免等待期间每次轮询都重新读取page_source
+    """
+    config = run.config
+    if run.scheduler is None:
+        run.scheduler = scheduler_from_driver(run.driver, poller, config.open_lead_time, config.tight_poll_interval,
+                                              idle_interval or config.refresh_interval)
+    run.scheduler.idle_interval = idle_interval or config.refresh_interval
+    return run.scheduler
+
+
+def wait_initial_button(run):
+    """等待初始按钮出现（无限刷新），点击后刷新页面；预装脚本已提交时直接返回其结果"""
+    print("等待初始按钮出现...")
+    config = run.config
+    poller = _create_http_poller(run.driver) if config.http_prepoll else None
+
+    while True:
+        run.reload_profile()  # 等待期间配置文件被修改时重新加载
+
+        # 问卷直接显示表单时，预装脚本在页面加载时就已运行（可能已提交），不再查找或点击开始按钮
+        if run.armed_script_id is not None:
+            payload = read_payload_result(run.driver)
+            if payload and payload.get('state') != 'armed':
+                if poller is not None:
+                    poller.close()
+                return _collect_armed_result(run)
+
+        button = find_initial_button(run.driver)
+        if button:
+            try:
+                print("点击初始按钮...")
+                mouse_click(run.driver, button)
+                time.sleep(1)  # 等待按钮点击后的响应
+                run.refresh()
+                print("✓ 初始按钮已点击，页面已刷新")
+                break
+            except Exception as e:
+                print(f"点击按钮时出错: {e}")
+                run.refresh()
+                continue
+
+        idle_interval = config.http_poll_interval if poller is not None else config.refresh_interval
+        scheduler = _ensure_scheduler(run, poller, idle_interval)
+        if poller is not None:
+            # 问卷未开放期间只发HTTP请求，状态变化后再刷新浏览器
+            print("未找到初始按钮，使用HTTP轮询等待问卷开放...")
+            if not poller.wait_until_open(config.http_poll_interval, scheduler=scheduler):
+                print("HTTP轮询不可用，改为浏览器刷新")
+                poller.close()
+                poller = None
+        else:
+            # 开放前休眠，临近开放时间再频繁刷新
+            scheduler.sleep_until_window()
+
+        print("未找到初始按钮，刷新页面...")
+        run.refresh()
+
+    if poller is not None:
+        poller.close()
+
+    # 预装脚本在表单出现时已完成提交，则无需再查找和填写
+    if run.armed_script_id is not None:
+        wait_for_survey_ready(run.driver, config.ready_timeout, wait_button=False)
+        return _collect_armed_result(run)
+    return None
+
+
+def _collect_armed_result(run):
+    """读取预装脚本的执行结果并移除脚本；已在页面内提交时返回结果摘要，否则返回None"""
+    result = wait_payload_result(run.driver)
+    disarm_payload(run.driver, run.armed_script_id)
+    if not result or result.get('state') != 'submitted':
+        state = result.get('state') if result else '未运行'
+        print(f"预装脚本未完成提交（状态: {state}），改用普通流程")
+        return None
+
+    print(f"✓ 预装脚本已在页面内填写 {result['filled']}/{result['total']} 个输入框，"
+          f"并点击按钮 '{result.get('button', '')}'（页面内用时 {result.get('elapsedMs', 0):.1f} 毫秒）")
+    for i, field in enumerate(result.get('fields', []), 1):
+        print(f"  输入框 #{i}: '{field['label']}' -> '{field['value']}'")
+
+    monitor = SubmitMonitor(run.driver)
+    monitor.adopt(result['url'])
+    outcome = monitor.wait_for_outcome(run.config.submit_timeout)
+    print(f"提交结果: {outcome['outcome']} - {outcome['reason']} (用时 {outcome['elapsed']} 秒)")
+
+    return {
+        'success': True,
+        'total_inputs': result['total'],
+        'filled_count': result['filled'],
+        'button_found': True,
+        'button_clicked': True,
+        'submit_outcome': outcome,
+    }
+
+
+# ==================== 阶段：查找输入框 ====================
+
+def _before_next_attempt(run):
+    """未找到输入框时，按retry_mode准备下一次尝试"""
+    if run.config.retry_mode == 'reopen':
+        time.sleep(run.config.refresh_interval)  # 下一次尝试会重新打开网页，无需额外刷新
+        return
+    if run.config.retry_mode == 'schedule':
+        # 问卷尚未开放时休眠到开放前，避免开放前的无效刷新
+        _ensure_scheduler(run).sleep_until_window()
+    run.refresh()
+
+
+def _discover_with_retry(run, find):
+    """持续刷新直到找到输入框；find(driver)返回 (输入框列表, 稳定定位列表或None)"""
+    config = run.config
+    print("开始查找输入框...")
+
+    for attempt in range(1, config.max_retries + 1):
+        print(f"尝试 #{attempt}/{config.max_retries}")
+        run.reload_profile()  # 等待期间配置文件被修改时重新加载
+
+        try:
+            # 等待输入框渲染，出现即返回，避免不必要的刷新；首次之后最多等待一个刷新间隔，
+            # 问卷未开放时仍按刷新间隔轮询（refresh/schedule模式下run.refresh()已等待过，不再重复等待）
+            ready_timeout = config.ready_timeout if attempt == 1 else config.refresh_interval
+            if config.retry_mode == 'reopen':
+                print(f"打开网页: {run.url}")
+                run.driver.get(run.url)
+                wait_for_survey_ready(run.driver, ready_timeout, wait_button=False)
+            elif attempt == 1:
+                wait_for_survey_ready(run.driver, ready_timeout, wait_button=False)
+            with span('input_discovery'):
+                input_elements, locators = find(run.driver)
+
+            if input_elements:
+                print(f"✓ 找到 {len(input_elements)} 个输入框")
+                run.inputs = input_elements
+                run.field_locators = locators
+                if locators is None:
+                    try:
+                        run.field_locators = field_locators(run.driver, input_elements)
+                    except Exception as e:
+                        print(f"计算输入框定位失败: {e}")
+                return None
+
+            print("未找到输入框，准备刷新...")
+            if attempt < config.max_retries:
+                _before_next_attempt(run)
+
+        except Exception as e:
+            print(f"尝试 #{attempt} 失败: {e}")
+            if attempt < config.max_retries:
+                time.sleep(config.refresh_interval)
+
+    print(f"✗ 经过 {config.max_retries} 次尝试仍未找到输入框")
+    return {'success': False, 'error': '未找到输入框'}
+
+
+def _find_inputs_batch(driver):
+    """一次往返完成查找、可见性判断和稳定定位，失败时逐个选择器查找"""
+    try:
+        items = discover_inputs(driver)
+        return [item['element'] for item in items], [item.get('locator') for item in items]
+    except Exception as e:
+        print(f"批量查找输入框失败，改为逐个查找: {e}")
+    return find_inputs_by_selectors(driver), None
+
+
+def find_input_elements(driver):
+    """查找页面中所有可见的输入框"""
+    return _find_inputs_batch(driver)[0]
+
+
+def discover_batch(run):
+    return _discover_with_retry(run, _find_inputs_batch)
+
+
+def discover_selectors(run):
+    return _discover_with_retry(run, lambda driver: (find_inputs_by_selectors(driver), None))
+
+
+# ==================== 阶段：提取标签 ====================
+
+def _use_structure_cache(run):
+    """计算问卷结构指纹并查找缓存；命中时直接使用缓存的标签和关键字，返回True"""
+    if not run.config.structure_cache:
+        return False
+    try:
+        structure = scan_structure(run.driver, run.inputs)
+        structure['url'] = run.driver.current_url
+    except Exception as e:
+        print(f"计算问卷结构指纹失败: {e}")
+        return False
+
+    run.structure = structure
+    run.cached_plan = StructureCache().lookup(structure['url'], structure['fingerprint'], run.profile.answers)
+    if not run.cached_plan:
+        return False
+
+    print(f"✓ 命中问卷结构缓存（保存于 {run.cached_plan.get('saved_at')}），跳过标签提取和按钮查找")
+    run.fields = run.cached_plan['fields']
+    run.labels = [field.get('label', '') for field in run.fields]
+    return True
+
+
+def _label_order(run):
+    """按该问卷域名和模板的历史统计确定标签提取方法的顺序，未开启统计时为默认顺序"""
+    if not run.config.label_stats:
+        return list(LABEL_METHODS)
+    order, pruned = LabelStats().order(run.url)
+    if pruned:
+        print(f"按历史统计只尝试: {' > '.join(order)}（其余方法仅在未找到时补充尝试）")
+    elif order != list(LABEL_METHODS):
+        print(f"按历史统计调整标签提取顺序: {' > '.join(order)}")
+    return order
+
+
+def _extract_labels(run, batch, elements, order):
+    """batch(run, elements, order)一次往返返回 [{'text', 'method'}, ...]；失败或为None时逐个输入框提取
+
+    返回与elements一一对应的 [(文字, 命中的方法), ...]
+    """
+    if batch is not None:
+        try:
+            results = batch(run, elements, order)
+            if len(results) == len(elements):
+                return [(item['text'], item.get('method', '')) for item in results]
+        except Exception as e:
+            print(f"批量提取文本失败，改为逐个提取: {e}")
+    return [resolve_label_xpath(run.driver, element, order) for element in elements]
+
+
+def _retry_unmatched_labels(run, batch, resolved):
+    """按统计顺序提取的文字未能匹配字典的输入框，再按默认顺序提取一次，能匹配时换用新结果
+
+    统计顺序中靠后或被跳过的方法因此仍有机会命中，不会因为靠前的方法总能取到（错误的）文字而一直得不到统计
+    """
+    matcher = run.profile.matcher
+    unmatched = [i for i, (text, _) in enumerate(resolved) if not (text and matcher.match(text))]
+    if not unmatched:
+        return resolved
+
+    retried = _extract_labels(run, batch, [run.inputs[i] for i in unmatched], list(LABEL_METHODS))
+    resolved = list(resolved)
+    for i, (text, method) in zip(unmatched, retried):
+        if text and matcher.match(text):
+            resolved[i] = (text, method)
+    return resolved
+
+
+def _resolve_labels(run, batch=None, ordered=True):
+    """提取所有输入框的标签文字
+
+    ordered为True时按历史统计的方法顺序提取，并记下各输入框命中的方法
+    """
+    if _use_structure_cache(run):
+        return None
+
+    order = _label_order(run) if ordered else list(LABEL_METHODS)
+    resolved = _extract_labels(run, batch, run.inputs, order)
+    if ordered and order != list(LABEL_METHODS):
+        resolved = _retry_unmatched_labels(run, batch, resolved)
+
+    run.labels = [text for text, _ in resolved]
+    if ordered:
+        run.label_methods = [method for _, method in resolved]
+    return None
+
+
+def labels_dom(run):
+    """沿DOM查找（label、兄弟元素、父元素、placeholder、前面的文本节点），一次往返"""
+    return _resolve_labels(run, lambda run, elements, order: extract_labels_batch(run.driver, elements, order))
+
+
+def labels_geometric(run):
+    """按页面坐标取输入框上方/左侧最近且能匹配字典的中文文字"""
+    return _resolve_labels(run, lambda run, elements, order: extract_labels_geometric(run.driver, elements,
+                                                                                      run.profile.matcher),
+                           ordered=False)
+
+
+def labels_xpath(run):
+    """逐个输入框用XPath查找（每个输入框多次往返）"""
+    return _resolve_labels(run)
+
+
+# ==================== 阶段：填写 ====================
+
+def _plan_values(run):
+    """按标签匹配字典，返回 [(输入框, 填写内容), ...]；不填写的输入框不在列表中"""
+    profile = run.profile
+    pending_fills = []
+
+    if run.fields is not None:
+        # 结构缓存命中：直接按缓存的关键字取答案
+        print(f"按缓存方案填写 {len(run.fields)} 个输入框")
+        for i, (element, field) in enumerate(zip(run.inputs, run.fields)):
+            key = field.get('key')
+            value = profile.answers[key] if key is not None else profile.default_value
+            print(f"输入框 #{i + 1}: '{field.get('label', '')}' -> '{value}'")
+            pending_fills.append((element, value))
+        run.planned_values = [value for _, value in pending_fills]
+        return pending_fills
+
+    print(f"开始填写输入框，字典大小: {len(profile.answers)}")
+    run.fields = []
+    run.planned_values = [None] * len(run.inputs)
+    for i, (element, text) in enumerate(zip(run.inputs, run.labels)):
+        match = profile.matcher.match(text) if text else None
+        run.fields.append({'label': text, 'key': match[0] if match else None})
+        if text:
+            print(f"输入框 #{i + 1}: 找到文本 '{text}'")
+        else:
+            print(f"输入框 #{i + 1}: 未找到附近中文文本")
+
+        if match:
+            print(f"  ✓ 填写: '{match[1]}' (匹配: '{match[0]}')")
+            pending_fills.append((element, match[1]))
+            run.planned_values[i] = match[1]
+        elif run.config.fill_unmatched:
+            print(f"  ⚠ 未找到匹配项，填写默认值")
+            pending_fills.append((element, profile.default_value))
+            run.planned_values[i] = profile.default_value
+        else:
+            print(f"  ⚠ 未找到匹配项")
+    return pending_fills
+
+
+def _rebind_pending(run, pending_fills):
+    """元素失效时按定位重新获取所有输入框，返回换成新元素的pending_fills；未能全部找回时返回None"""
+    positions = {id(element): i for i, element in enumerate(run.inputs)}
+    if not run.rebind_inputs():
+        return None
+    return [(run.inputs[positions[id(element)]], value) for element, value in pending_fills]
+
+
+def _fill_each(run, pending_fills, write):
+    """逐个输入框调用write(run, element, value)，返回写入失败的数量
+
+    元素失效说明页面已重新渲染，之前写入的内容可能一并丢失：重新定位后从头重新写入全部输入框（只重来一次）
+    """
+    pending_fills = list(pending_fills)
+    for attempt in range(2):
+        failed = 0
+        for k, (element, value) in enumerate(pending_fills):
+            try:
+                write(run, element, value)
+            except StaleElementReferenceException as e:
+                if not attempt:
+                    break
+                print(f"输入框写入失败: {e}")
+                failed += 1
+            except Exception as e:
+                print(f"输入框写入失败: {e}")
+                failed += 1
+        else:
+            return failed
+
+        print("输入框已失效，按定位重新获取后重新写入全部输入框...")
+        rebound = _rebind_pending(run, pending_fills)
+        if rebound is None:
+            return failed + len(pending_fills) - k
+        pending_fills = rebound
+
+
+def _finish_fill(run, pending_fills, failed_count):
+    if failed_count:
+        print(f"⚠ 有 {failed_count} 个输入框写入失败")
+    run.filled_count = len(pending_fills) - failed_count
+    print(f"填写完成，共填写 {run.filled_count} 个输入框")
+    return None
+
+
+def fill_batch(run):
+    """一次往返写入所有输入框；页面拒绝时按typing_mode重试，脚本失败时逐个输入"""
+    pending_fills = _plan_values(run)
+    if not pending_fills:
+        return _finish_fill(run, pending_fills, 0)
+
+    try:
+        try:
+            results = fill_values_batch(run.driver, pending_fills)
+        except StaleElementReferenceException:
+            # 页面刷新或重新渲染后元素失效：一次往返按定位重新获取，而不是重新查找
+            print("输入框已失效，按定位重新获取...")
+            pending_fills = _rebind_pending(run, pending_fills) or pending_fills
+            results = fill_values_batch(run.driver, pending_fills)
+        rejected = [item for item, ok in zip(pending_fills, results) if not ok]
+        if rejected and run.config.typing_mode == 'cdp':
+            # 页面不接受脚本直接写入的值时，改用CDP真实输入重试
+            print(f"{len(rejected)} 个输入框未接受快速写入，改用CDP输入")
+            results = insert_text_batch(run.driver, rejected)
+        return _finish_fill(run, pending_fills, len([ok for ok in results if not ok]))
+    except Exception as e:
+        print(f"快速填写失败，改为逐个输入: {e}")
+
+    return _finish_fill(run, pending_fills, _fill_each(run, pending_fills, type_text))
+
+
+def _write_actions(run, element, value):
+    """模拟人类点击和打字"""
+    mouse_click(run.driver, element)
+    time.sleep(0.1)  # 极短延迟
+    human_like_typing(element, value)
+
+
+def _write_send_keys(run, element, value):
+    element.clear()
+    element.send_keys(value)
+
+
+def fill_actions(run):
+    """逐个输入框模拟点击并逐字符输入"""
+    pending_fills = _plan_values(run)
+    return _finish_fill(run, pending_fills, _fill_each(run, pending_fills, _write_actions))
+
+
+def fill_cdp(run):
+    """逐个输入框用CDP Input.insertText一次输入整段文字（聚焦由页面内脚本完成）"""
+    pending_fills = _plan_values(run)
+    return _finish_fill(run, pending_fills, _fill_each(run, pending_fills, type_text))
+
+
+def fill_send_keys(run):
+    """逐个输入框清空后send_keys"""
+    pending_fills = _plan_values(run)
+    return _finish_fill(run, pending_fills, _fill_each(run, pending_fills, _write_send_keys))
+
+
+# ==================== 阶段：查找提交按钮 ====================
+
+def _verify_inputs(run):
+    """一次往返检查输入框，元素失效时按定位重新获取后再检查
+
+    返回与run.inputs一一对应的 [{'value', 'error'}, ...]，检查失败时返回None
+    """
+    try:
+        try:
+            results = verify_fields(run.driver, run.inputs)
+        except StaleElementReferenceException:
+            print("输入框已失效，按定位重新获取...")
+            if not run.rebind_inputs():
+                return None
+            results = verify_fields(run.driver, run.inputs)
+    except Exception as e:
+        print(f"检查输入框失败: {e}")
+        return None
+    report_flagged(results)
+    return results
+
+
+def _planned_value(run, i):
+    """第i个输入框（从0开始）按计划应填写的内容；未匹配字典且不填写默认值（fill_unmatched为False）时为None"""
+    planned = run.planned_values or []
+    if i < len(planned) and planned[i] is not None:
+        return planned[i]
+    return run.profile.default_value if run.config.fill_unmatched else None
+
+
+def _refill_fields(run, indices):
+    """只对indices（从0开始）中的输入框重新写入按字典计划的内容，一次往返写入，返回仍未写入的数量
+
+    没有计划内容的输入框（未匹配字典且不填写默认值）保持原样
+    """
+    pending_fills = []
+    for i in indices:
+        value = _planned_value(run, i)
+        if value is None:
+            print(f"输入框 #{i + 1} 未匹配字典，不补填")
+            continue
+        print(f"补充填写输入框 #{i + 1}: '{value}'")
+        pending_fills.append((run.inputs[i], value))
+    if not pending_fills:
+        return 0
+
+    try:
+        results = fill_values_batch(run.driver, pending_fills)
+    except Exception as e:
+        print(f"批量补填失败，改为逐个输入: {e}")
+        return _fill_each(run, pending_fills, _write_send_keys)
+    rejected = [item for item, ok in zip(pending_fills, results) if not ok]
+    return _fill_each(run, rejected, _write_send_keys) if rejected else 0
+
+
+def _check_before_submit(run):
+    """按pre_submit_check检查输入框是否已填写，返回是否可以提交"""
+    mode = run.config.pre_submit_check
+    if mode == 'none' or not run.inputs:
+        return True
+
+    results = _verify_inputs(run)
+    unfilled = flagged_fields(results) if results else []
+    if not unfilled:
+        return True
+    if mode != 'refill':
+        print("⚠ 部分输入框未填写，但仍尝试提交...")
+        return True
+
+    print("部分输入框未填写，按字典补充填写...")
+    if _refill_fields(run, unfilled):
+        print("输入框未全部填写，不点击提交按钮")
+        return False
+    return True
+
+
+def locate_scored(run):
+    """先按结构缓存的定位查找，再一次往返对候选按钮评分，最后按问卷星常用的ID/类名/文字查找"""
+    if not _check_before_submit(run):
+        return None
+    print("查找提交按钮...")
+    driver = run.driver
+    cached_locator = run.cached_plan['submit'] if run.cached_plan else None
+
+    button_info = None
+    if cached_locator:
+        try:
+            button = driver.find_element(By.CSS_SELECTOR, cached_locator)
+            if button.is_displayed() and button.is_enabled():
+                button_info = get_button_info(button, f"缓存: {cached_locator}")
+        except:
+            print("缓存的按钮定位已失效，重新查找")
+
+    if button_info is None:
+        try:
+            button_info = locate_submit_button(driver)
+        except Exception as e:
+            print(f"评分查找提交按钮失败，改为逐个查找: {e}")
+
+    fallbacks = [(By.ID, "ctlNext", "ID: ctlNext"),
+                 (By.CLASS_NAME, "submitbtn", "CLASS: submitbtn"),
+                 (By.XPATH, "//div[contains(text(), '提交')]", "XPATH: //div[contains(text(), '提交')]")]
+    for by, value, description in fallbacks:
+        if button_info is not None:
+            break
+        try:
+            button = driver.find_element(by, value)
+            if button.is_displayed() and button.is_enabled():
+                button_info = get_button_info(button, description)
+        except:
+            pass
+
+    if button_info is None:
+        print("未找到提交按钮")
+        return None
+
+    print(f"✓ 找到提交按钮: '{button_info['text']}'")
+    # 点击前记下按钮定位（点击后页面跳转，元素失效），供结构缓存保存
+    if run.structure is not None:
+        button_info['locator'] = cached_locator or element_locator(driver, button_info['element'])
+    run.button_info = button_info
+    run.buttons_found = 1
+    return None
+
+
+def locate_scored_scan(run):
+    """一次往返评分查找，找不到时逐个选择器和文字查找，最后退回第一个可点击的按钮"""
+    if not _check_before_submit(run):
+        return None
+    print("查找提交按钮...")
+
+    try:
+        best_button = locate_submit_button(run.driver)
+    except Exception as e:
+        print(f"评分查找提交按钮失败: {e}")
+        best_button = None
+    if best_button:
+        print(f"找到提交按钮: '{best_button['text']}' (得分 {best_button['score']:.0f}, {best_button['selector_used']})")
+        run.button_info, run.buttons_found = best_button, 1
+        return None
+
+    buttons_result = scan_submit_buttons(run.driver)
+    if buttons_result['submit_buttons']:
+        candidates = buttons_result['submit_buttons']
+        print(f"找到 {len(candidates)} 个可能的提交按钮")
+        for i, button_info in enumerate(candidates):
+            print(f"  按钮 #{i + 1}: '{button_info['text']}' <{button_info['tag_name']}> {button_info['selector_used']}")
+    else:
+        candidates = buttons_result['all_buttons']
+        print(f"未找到提交按钮，尝试点击第一个可点击的按钮（共 {len(candidates)} 个）")
+
+    if candidates:
+        run.button_info, run.buttons_found = candidates[0], len(candidates)
+    else:
+        print("未找到任何可点击的按钮")
+    return None
+
+
+def locate_first_button(run):
+    """第一个可点击的按钮"""
+    if not _check_before_submit(run):
+        return None
+    print("查找页面中的按钮...")
+    try:
+        clickable_buttons = find_clickable_buttons(run.driver)
+    except Exception as e:
+        print(f"查找按钮时出错: {e}")
+        return None
+
+    print(f"找到 {len(clickable_buttons)} 个可点击按钮")
+    if clickable_buttons:
+        button = clickable_buttons[0]
+        info = get_button_info(button, '第一个可点击的按钮')
+        info['text'] = info['text'] or info['attributes'].get('value') or '无文本按钮'
+        run.button_info, run.buttons_found = info, len(clickable_buttons)
+    else:
+        print("未找到可点击的按钮")
+    return None
+
+
+# ==================== 阶段：提交 ====================
+
+def _click_submit(run, click, fallback_script):
+    """解除资源屏蔽、开始监听提交结果后调用click(driver, element)，失败时用fallback_script点击"""
+    button_info = run.button_info
+    if button_info is None:
+        return None
+    button_element = button_info['element']
+
+    print(f"准备点击按钮: '{button_info['text']}'")
+    print(f"按钮信息: 标签={button_info['tag_name']}, ID={button_info['attributes'].get('id', '无')}, "
+          f"类名={button_info['attributes'].get('class', '无')}")
+    print(f"使用选择器: {button_info['selector_used']}")
+
+    monitor = None
+    try:
+        # 提交前解除资源屏蔽，保证验证码等资源正常加载
+        release_resource_blocking(run.driver)
+
+        # 记录点击前状态，并开始监听提交结果
+        monitor = SubmitMonitor(run.driver)
+        monitor.arm()
+
+        if run.config.click_delay:
+            time.sleep(run.config.click_delay)
+        print("正在点击按钮...")
+        click(run.driver, button_element)
+        print("✓ 按钮点击成功")
+    except Exception as e:
+        print(f"点击按钮时出错: {e}")
+        try:
+            print("尝试使用JavaScript点击...")
+            run.driver.execute_script(fallback_script, button_element)
+            print("JavaScript点击成功")
+        except Exception as e2:
+            print(f"JavaScript点击也失败: {e2}")
+            run.click_result = {'success': False, 'error': str(e), 'page_changed': False}
+            return None
+
+    # 等待提交结果：提交请求返回或页面出现完成/错误提示即返回
+    outcome = monitor.wait_for_outcome(run.config.submit_timeout) if monitor is not None else None
+    if outcome:
+        print(f"提交结果: {outcome['outcome']} - {outcome['reason']} (用时 {outcome['elapsed']} 秒)")
+
+    # 未通过校验：只补填被标记的输入框后重新提交
+    for _ in range(run.config.resubmit_attempts):
+        if not outcome or outcome['outcome'] != OUTCOME_VALIDATION_ERROR:
+            break
+        retry_outcome = _resubmit_flagged(run, monitor, click, fallback_script, button_element)
+        if retry_outcome is None:
+            break
+        outcome = retry_outcome
+
+    run.click_result = {
+        'success': True,
+        'page_changed': bool(outcome) and outcome['url'] != monitor.before_url,
+        'before_url': monitor.before_url if monitor is not None else None,
+        'after_url': outcome['url'] if outcome else None,
+        'outcome': outcome,
+    }
+    return None
+
+
+def _resubmit_flagged(run, monitor, click, fallback_script, button_element):
+    """提交被校验拦截后，一次往返找出空白或被标记的输入框，按字典补填后再次点击；无需或无法补填时返回None"""
+    print("提交未通过校验，检查被标记的输入框...")
+    results = _verify_inputs(run)
+    flagged = flagged_fields(results) if results else []
+    if not flagged:
+        print("被标记的题目不是已找到的输入框（可能是选择题等），请手动处理")
+        return None
+
+    # 只补填空白或内容与计划不同的输入框；内容已是计划内容仍被标记的（如格式不符合要求），重新写入同样的内容也无法通过
+    refill = [i for i in flagged
+              if _planned_value(run, i) is not None and results[i].get('value') != _planned_value(run, i)]
+    if not refill:
+        print("被标记的输入框已是字典中的内容或不应填写，重新提交也无法通过，请手动处理")
+        return None
+    if _refill_fields(run, refill) == len(refill):
+        print("补填失败，不再重新提交")
+        return None
+
+    print("重新点击提交按钮...")
+    monitor.arm()
+    try:
+        click(run.driver, button_element)
+    except Exception as e:
+        print(f"点击按钮时出错: {e}")
+        try:
+            run.driver.execute_script(fallback_script, button_element)
+        except Exception as e2:
+            print(f"JavaScript点击也失败: {e2}")
+            return None
+
+    outcome = monitor.wait_for_outcome(run.config.submit_timeout)
+    print(f"提交结果: {outcome['outcome']} - {outcome['reason']} (用时 {outcome['elapsed']} 秒)")
+    return outcome
+
+
+def _click_actions(driver, element):
+    driver.execute_script("arguments[0].scrollIntoView();", element)
+    mouse_click(driver, element)
+
+
+def _click_js(driver, element):
+    """脚本点击，避免一些点击拦截"""
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();", element)
+
+
+def _click_plain(driver, element):
+    element.click()
+
+
+def submit_actions(run):
+    """滚动到按钮后用ActionChains模拟鼠标点击"""
+    return _click_submit(run, _click_actions, JS_CLICK)
+
+
+def submit_js(run):
+    """页面内脚本点击"""
+    return _click_submit(run, _click_js, DISPATCH_CLICK_JS)
+
+
+def submit_plain(run):
+    """WebElement.click()"""
+    return _click_submit(run, _click_plain, JS_CLICK)
+
+
+# ==================== 阶段：确认结果 ====================
+
+def _save_structure_cache(run):
+    """首次解析该问卷时保存填写方案和提交按钮定位"""
+    if run.structure is None or run.cached_plan or run.fields is None:
+        return
+    submit_locator = run.button_info.get('locator') if run.button_info else None
+    fields = [dict(field, locator=locator) for field, locator in zip(run.fields, run.structure['locators'])]
+    StructureCache().store(run.structure['url'], run.structure['fingerprint'], fields, submit_locator,
+                           run.profile.answers)
+    print("✓ 已保存问卷结构缓存")
+
+
+def _save_label_stats(run):
+    """把本次各输入框命中的标签提取方法计入统计；提取到的文字未匹配字典的输入框不算命中"""
+    if not run.config.label_stats or not run.label_methods or not run.fields:
+        return
+    methods = [method if field.get('key') is not None else ''
+               for method, field in zip(run.label_methods, run.fields)]
+    stats = LabelStats()
+    stats.record(run.url, methods)
+    stats.save()
+
+
+def confirm_outcome(run):
+    """显示按钮识别和提交结果，保存结构缓存和标签统计"""
+    _save_structure_cache(run)
+    _save_label_stats(run)
+
+    print("\n按钮识别结果:")
+    if run.button_info is None:
+        print(f"  找到按钮: 否")
+        return None
+
+    click_result = run.click_result or {}
+    print(f"  找到按钮: 是（候选 {run.buttons_found} 个）")
+    print(f"  按钮文本: '{run.button_info['text']}'")
+    print(f"  按钮点击: {'成功' if click_result.get('success') else '失败'}")
+    outcome = click_result.get('outcome')
+    if outcome:
+        print(f"  提交结果: {outcome['outcome']} ({outcome['reason']})")
+    if click_result.get('page_changed'):
+        print(f"  页面跳转: {click_result['before_url']} -> {click_result['after_url']}")
+    return None
+
+
+def confirm_page_info(run):
+    """在提交结果之外显示当前页面的标题、地址和中文短语"""
+    confirm_outcome(run)
+    run.page_info = get_page_info(run.driver)
+
+    print("\n页面信息:")
+    for key, value in run.page_info.items():
+        if key == "中文示例":
+            print(f"  {key}:")
+            for i, text in enumerate(value, 1):
+                print(f"    {i}. {text}")
+        else:
+            print(f"  {key}: {value}")
+    return None
+
+
+# 阶段 -> {实现名称: 函数}
+STAGE_IMPLEMENTATIONS = {
+    'open': {'navigate': open_navigate, 'none': skip_stage},
+    'wait_open': {'initial_button': wait_initial_button, 'none': skip_stage},
+    'discover': {'batch': discover_batch, 'selectors': discover_selectors},
+    'labels': {'dom': labels_dom, 'geometric': labels_geometric, 'xpath': labels_xpath},
+    'fill': {'batch': fill_batch, 'cdp': fill_cdp, 'actions': fill_actions, 'send_keys': fill_send_keys},
+    'locate_submit': {'scored': locate_scored, 'scored_scan': locate_scored_scan, 'first_button': locate_first_button},
+    'submit': {'actions': submit_actions, 'js': submit_js, 'plain': submit_plain},
+    'confirm': {'outcome': confirm_outcome, 'page_info': confirm_page_info},
+}
+
+
+# ==================== 分步接口 ====================
+
+class AutofillSteps:
+    """各脚本EdgeAutoFiller原有的公开方法：每个方法执行流程中对应的阶段，共享同一次运行的状态
+
+    open_webpage / open_and_find_inputs 开始新的一次运行；传入的输入框与当前状态不同时换用传入的输入框
+    """
+
+    def __init__(self, driver, config, profile_store):
+        self.driver = driver
+        self.pipeline = AutofillPipeline(driver, config, profile_store)
+        self.state = None
+
+    def _stage(self, stage):
+        if self.state is None:
+            raise RuntimeError("请先调用open_webpage或open_and_find_inputs打开网页")
+        return self.pipeline.run_stage(self.state, stage)
+
+    def _use_inputs(self, input_elements):
+        state = self.state
+        if input_elements is None or list(input_elements) == state.inputs:
+            return
+        state.inputs = list(input_elements)
+        state.field_locators = None
+        state.labels = state.label_methods = state.fields = state.planned_values = None
+        state.structure = state.cached_plan = None
+
+    def run(self, url):
+        """执行一次完整的填写流程，返回结果摘要"""
+        return self.pipeline.run(url)
+
+    def open_webpage(self, url):
+        """打开网页，返回是否成功"""
+        self.state = self.pipeline.start(url)
+        return self._stage('open') is None
+
+    def refresh_webpage(self):
+        """刷新网页，返回是否成功"""
+        return self.state.refresh()
+
+    def wait_for_initial_button(self):
+        """等待并点击初始按钮，返回是否可以继续查找输入框（预装脚本已提交时为False）"""
+        return self._stage('wait_open') is None
+
+    def find_inputs_with_retry(self):
+        """持续刷新直到找到输入框，返回输入框列表，未找到时为空列表"""
+        if self._stage('discover') is not None:
+            return []
+        return self.state.inputs
+
+    def open_and_find_inputs(self, url):
+        """打开网页并持续刷新直到找到输入框"""
+        if not self.open_webpage(url) or not self.wait_for_initial_button():
+            return []
+        return self.find_inputs_with_retry()
+
+    def find_input_elements(self):
+        return find_input_elements(self.driver)
+
+    def extract_chinese_near_input(self, input_element):
+        return extract_chinese_near_input(self.driver, input_element)
+
+    def contains_chinese(self, text):
+        return contains_chinese(text)
+
+    def extract_all_labels(self, input_elements):
+        """提取所有输入框附近的中文文字，返回与输入框一一对应的列表"""
+        self._use_inputs(input_elements)
+        self._stage('labels')
+        return self.state.labels
+
+    def fill_inputs_using_dict(self, input_elements):
+        """使用字典自动填写输入框，返回成功填写的数量"""
+        self._use_inputs(input_elements)
+        if self.state.labels is None and self.state.fields is None:
+            self._stage('labels')
+        self._stage('fill')
+        return self.state.filled_count
+
+    def check_inputs_filled(self, input_elements):
+        """检查所有输入框是否已填写"""
+        return check_inputs_filled(self.driver, input_elements)
+
+    def find_and_click_submit_button(self, input_elements=None):
+        """查找并点击提交按钮，返回 {'button_found', 'buttons_found', 'button_clicked', 'button_info', 'click_result'}"""
+        self._use_inputs(input_elements)
+        if self._stage('locate_submit') is None:
+            self._stage('submit')
+        state = self.state
+        return {
+            'button_found': state.button_info is not None,
+            'buttons_found': state.buttons_found,
+            'button_clicked': bool((state.click_result or {}).get('success')),
+            'button_info': state.button_info,
+            'click_result': state.click_result,
+        }
+
+    def find_and_click_button(self):
+        """查找并点击第一个可点击的按钮，返回是否点击成功"""
+        return self.find_and_click_submit_button()['button_clicked']
+
+    def confirm_result(self):
+        """确认提交结果（保存结构缓存和标签统计），返回本次运行的结果摘要"""
+        return self._stage('confirm') or self.state.summary()
+
+    def get_page_info(self):
+        return get_page_info(self.driver)
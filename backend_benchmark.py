@@ -0,0 +1,110 @@
+"""
+浏览器后端基准测试
+功能：在本地模拟问卷星服务器上，用solve脚本实际运行的填写流程（QR_URL_solve.EdgeAutoFiller / AutofillPipeline）
+      分别测试SeleniumBackend和CdpBackend：单次脚本往返延迟，以及不同题目数下从打开网页到服务器收到提交的耗时p50/p95
+
+运行: python backend_benchmark.py [--sizes 5 50 500] [--runs 5] [--backends selenium cdp] [--browser 浏览器路径]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+import QR_URL_solve
+from driver_backend import CdpBackend, SeleniumBackend
+from e2e_benchmark import DEFAULT_SIZES, clear_state_files, create_headless_chrome, isolated_state_files, percentile
+from mock_wjx_server import MockWjxServer
+
+ROUND_TRIPS = 200
+
+
+def create_backend(name, chromedriver_path=None, browser_path=None):
+    if name == 'cdp':
+        return CdpBackend.launch(browser_path, headless=True, extra_args=['--disable-gpu', '--no-sandbox'])
+    return SeleniumBackend(create_headless_chrome(chromedriver_path))
+
+
+def measure_round_trip(backend, count=ROUND_TRIPS):
+    """连续执行count次最简单的脚本，返回每次往返的毫秒数列表"""
+    backend.navigate('about:blank')
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        backend.eval("return 1;")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def benchmark_backend(server, backend, sizes, runs, verbose=False):
+    """在backend上运行solve脚本的完整流程（冷启动：不读写结构缓存，每次清空标签统计）"""
+    QR_URL_solve.STRUCTURE_CACHE = False
+    latencies = measure_round_trip(backend)
+    report = {'round_trip_p50_ms': percentile(latencies, 50), 'round_trip_p95_ms': percentile(latencies, 95),
+              'sizes': {}}
+    print(f"{backend.name:<10}往返延迟 p50 {report['round_trip_p50_ms']:.3f}ms  p95 {report['round_trip_p95_ms']:.3f}ms")
+
+    for size in sizes:
+        times, failures = [], 0
+        for run in range(runs):
+            survey_id = f"{backend.name}-{size}-{run}-{int(time.time() * 1000)}"
+            url = server.add_survey(survey_id, fields=size, require_start=True)
+            backend.navigate('about:blank')
+            clear_state_files()
+            output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            started = time.time()
+            with output:
+                try:
+                    summary = QR_URL_solve.EdgeAutoFiller(None, backend).run(url)
+                except Exception as e:
+                    summary = {'success': False, 'error': str(e)}
+            submissions = server.submissions_for(survey_id)
+            if submissions:
+                times.append(submissions[0]['time'] - started)
+            else:
+                failures += 1
+                print(f"  {backend.name} {size}题 第{run + 1}次未提交: {summary.get('error', '服务器未收到提交')}")
+
+        report['sizes'][size] = {'runs': runs, 'submitted': len(times), 'failures': failures,
+                                 'p50': percentile(times, 50), 'p95': percentile(times, 95), 'times': times}
+        p50 = f"{report['sizes'][size]['p50']:.3f}s" if times else '-'
+        p95 = f"{report['sizes'][size]['p95']:.3f}s" if times else '-'
+        print(f"{backend.name:<10}{size:>6}题  提交 {len(times)}/{runs}  p50 {p50:>9}  p95 {p95:>9}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Selenium与CDP直连后端的对比测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='问卷题目数')
+    parser.add_argument('--runs', type=int, default=5, help='每种题目数运行次数')
+    parser.add_argument('--backends', nargs='+', default=['selenium', 'cdp'], choices=['selenium', 'cdp'],
+                        help='要测试的后端')
+    parser.add_argument('--chromedriver', default=None, help='chromedriver路径（selenium后端）')
+    parser.add_argument('--browser', default=None, help='Chromium/Edge路径（cdp后端，默认自动查找）')
+    parser.add_argument('--json', default=None, help='把结果写入该JSON文件')
+    parser.add_argument('--verbose', action='store_true', help='显示填写流程的输出')
+    args = parser.parse_args()
+
+    server = MockWjxServer().start()
+    print(f"模拟问卷星服务器: {server.base_url}")
+    report = {}
+    try:
+        with isolated_state_files():
+            for name in args.backends:
+                backend = create_backend(name, args.chromedriver, args.browser)
+                try:
+                    report[name] = benchmark_backend(server, backend, args.sizes, args.runs, args.verbose)
+                finally:
+                    backend.quit()
+    finally:
+        server.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
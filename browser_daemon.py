@@ -0,0 +1,235 @@
+"""
+浏览器守护进程
+功能：常驻后台持有一个已启动的Edge浏览器，通过本地HTTP接收填写任务，
+      各脚本以客户端模式提交任务，省去每次启动msedgedriver和Edge的数秒时间
+
+启动守护进程: python browser_daemon.py [msedgedriver路径]
+脚本中将 USE_BROWSER_DAEMON 设为 True 即以客户端模式运行
+
+安全：启动时生成随机令牌写入仅当前用户可读的文件，请求须在 X-Daemon-Token 头中带上令牌；
+      只接受 Content-Type 为 application/json 的POST，拒绝带Origin头（网页发起）或Host不是本机的请求，
+      防止用户打开的网页借守护进程把个人答案填写到任意网址
+"""
+
+import hmac
+import importlib
+import json
+import os
+import secrets
+import sys
+import threading
+import traceback
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==================== 配置区域 ====================
+
+# 守护进程监听地址（仅本机）
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+
+# 访问令牌文件（用户目录下，仅当前用户可读写）
+TOKEN_FILE = os.path.join(os.path.expanduser('~'), '.browser_daemon_token')
+TOKEN_HEADER = 'X-Daemon-Token'
+
+# 允许的Host头（不含端口）
+ALLOWED_HOSTS = ('127.0.0.1', 'localhost')
+
+# 任务名称 -> 脚本模块
+JOB_SCRIPTS = {
+    'solve': 'QR_URL_solve',
+    'wait': 'QR_solve_wait',
+    'button': 'QR_URL_button',
+    'input': 'QR_URL_input',
+}
+
+
+# ==================== 守护进程 ====================
+
+class BrowserDaemon:
+    def __init__(self, driver_path):
+        """启动浏览器并预热"""
+        self.driver_path = driver_path
+        self.driver = None
+        self.job_lock = threading.Lock()  # 同一时间只执行一个任务
+        self.jobs_done = 0
+        self.start_browser()
+
+    def start_browser(self):
+        """启动浏览器（复用QR_URL_solve中的增强反检测初始化）"""
+        solve_module = importlib.import_module('QR_URL_solve')
+        self.driver = solve_module.init_edge_driver(self.driver_path)
+        self.driver.get('about:blank')
+
+    def ensure_browser(self):
+        """检查浏览器是否仍然可用，不可用时重新启动"""
+        try:
+            self.driver.execute_script('return 1;')
+        except Exception as e:
+            print(f"浏览器已失效，重新启动: {e}")
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.start_browser()
+
+    def run_job(self, job):
+        """执行一个填写任务，返回结果摘要"""
+        script = job.get('script', 'solve')
+        url = job.get('url', '')
+        if script not in JOB_SCRIPTS:
+            return {'success': False, 'error': f'未知任务类型: {script}'}
+        if not url:
+            return {'success': False, 'error': '缺少问卷URL'}
+
+        with self.job_lock:
+            self.ensure_browser()
+            # 每次重新加载脚本模块，使修改后的字典无需重启守护进程即可生效
+            module = importlib.reload(importlib.import_module(JOB_SCRIPTS[script]))
+            print(f"\n执行任务 #{self.jobs_done + 1}: {script} {url}")
+            try:
+                summary = module.run_autofill(self.driver, url)
+            except Exception as e:
+                traceback.print_exc()
+                summary = {'success': False, 'error': str(e)}
+            finally:
+                self.jobs_done += 1
+            return summary
+
+    def status(self):
+        return {'running': True, 'jobs_done': self.jobs_done, 'busy': self.job_lock.locked()}
+
+    def shutdown(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+def write_token(path=TOKEN_FILE):
+    """生成新的随机令牌并写入仅当前用户可读写的文件，返回令牌"""
+    token = secrets.token_hex(32)
+    try:
+        os.remove(path)  # 重新创建，确保权限不沿用旧文件
+    except FileNotFoundError:
+        pass
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token)
+    return token
+
+
+def read_token(path=TOKEN_FILE):
+    """读取守护进程的令牌，文件不存在时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def make_handler(daemon, server_holder, token):
+    class DaemonRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _rejected(self, require_json=False):
+            """检查来源和令牌，不通过时回复错误并返回True"""
+            host = (self.headers.get('Host') or '').rsplit(':', 1)[0].strip('[]').lower()
+            if self.headers.get('Origin') is not None or host not in ALLOWED_HOSTS:
+                self._send_json(403, {'error': '拒绝来自网页或非本机地址的请求'})
+                return True
+            if not hmac.compare_digest(self.headers.get(TOKEN_HEADER) or '', token):
+                self._send_json(403, {'error': '令牌无效'})
+                return True
+            content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+            if require_json and content_type != 'application/json':
+                self._send_json(415, {'error': '请求须为application/json'})
+                return True
+            return False
+
+        def do_GET(self):
+            if self._rejected():
+                return
+            if self.path == '/status':
+                self._send_json(200, daemon.status())
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self._rejected(require_json=True):
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send_json(400, {'error': '请求不是合法的JSON'})
+                return
+
+            if self.path == '/job':
+                self._send_json(200, daemon.run_job(payload))
+            elif self.path == '/shutdown':
+                self._send_json(200, {'stopping': True})
+                threading.Thread(target=server_holder[0].shutdown, daemon=True).start()
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return DaemonRequestHandler
+
+
+def serve(driver_path, host=DAEMON_HOST, port=DAEMON_PORT):
+    """启动守护进程，阻塞直到收到 /shutdown 或键盘中断"""
+    daemon = BrowserDaemon(driver_path)
+    token = write_token()
+    server_holder = []
+    server = ThreadingHTTPServer((host, port), make_handler(daemon, server_holder, token))
+    server_holder.append(server)
+    print(f"✓ 浏览器守护进程已启动: http://{host}:{port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n用户中断，守护进程退出")
+    finally:
+        server.server_close()
+        daemon.shutdown()
+        try:
+            os.remove(TOKEN_FILE)
+        except OSError:
+            pass
+
+
+# ==================== 客户端 ====================
+
+def submit_job(script, url, host=DAEMON_HOST, port=DAEMON_PORT, timeout=None):
+    """向守护进程提交填写任务并等待结果；守护进程未启动时抛出ConnectionError"""
+    token = read_token()
+    if token is None:
+        raise ConnectionError(f"未找到守护进程令牌文件 {TOKEN_FILE}，守护进程可能未启动")
+    request = urllib.request.Request(
+        f"http://{host}:{port}/job",
+        data=json.dumps({'script': script, 'url': url}).encode('utf-8'),
+        headers={'Content-Type': 'application/json', TOKEN_HEADER: token},
+        method='POST',
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        raise ConnectionError(f"浏览器守护进程拒绝请求（HTTP {e.code}），请重新启动守护进程") from e
+    except urllib.error.URLError as e:
+        raise ConnectionError(f"无法连接浏览器守护进程: {e.reason}") from e
+
+
+if __name__ == "__main__":
+    driver_arg = sys.argv[1] if len(sys.argv) > 1 else importlib.import_module('QR_URL_solve').EDGE_DRIVER_PATH
+    serve(driver_arg)
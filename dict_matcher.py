@@ -0,0 +1,85 @@
+"""
+字典多模式匹配器
+功能：将INPUT_MAPPING_DICT编译为Aho-Corasick自动机，一次扫描找出文本中出现的所有关键字，
+      按"最长关键字优先"选出匹配结果，匹配耗时与字典大小无关
+"""
+
+from collections import deque
+
+
+class KeywordMatcher:
+    def __init__(self, mapping):
+        """根据 关键字 -> 填写内容 的字典编译自动机（加载时执行一次）"""
+        self.mapping = dict(mapping)
+        self._goto = [{}]      # 状态转移表
+        self._fail = [0]       # 失配指针
+        self._output = [[]]    # 每个状态结束的关键字
+
+        for key in self.mapping:
+            if key:
+                self._add_keyword(key)
+        self._build_fail_links()
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def _add_keyword(self, key):
+        """将关键字插入字典树"""
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(key)
+
+    def _build_fail_links(self):
+        """广度优先构建失配指针，并合并后缀状态的输出"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text):
+        """返回文本中所有命中的关键字，每项为 (起始位置, 结束位置, 关键字)，按结束位置排序"""
+        hits = []
+        if not text:
+            return hits
+
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for key in self._output[state]:
+                hits.append((index - len(key) + 1, index + 1, key))
+        return hits
+
+    def export_tables(self):
+        """导出自动机（可JSON序列化），供页面内脚本按同一规则匹配：
+        goto为各状态的 字符 -> 下一状态，fail为失配指针，output为各状态结束的 [关键字, 长度]"""
+        return {
+            'goto': self._goto,
+            'fail': self._fail,
+            'output': [[[key, len(key)] for key in keys] for keys in self._output],
+        }
+
+    def match(self, text):
+        """返回最佳匹配 (关键字, 填写内容)：最长关键字优先，长度相同时取最先出现的；无匹配返回None"""
+        best = None
+        for start, end, key in self.find_all(text):
+            if best is None or len(key) > len(best[2]) or (len(key) == len(best[2]) and start < best[0]):
+                best = (start, end, key)
+        if best is None:
+            return None
+        return best[2], self.mapping[best[2]]
@@ -0,0 +1,750 @@
+"""
+浏览器后端
+功能：把打开网页、查找元素、执行脚本、填写和点击抽象为统一接口，提供两种实现：
+      - SeleniumBackend：现有方式，Python -> Selenium HTTP -> msedgedriver -> CDP -> 浏览器
+      - CdpBackend：用asyncio直接通过websocket与Edge/Chromium的DevTools协议通信，省去驱动程序这一跳
+
+两种后端都提供各工具模块用到的Selenium兼容方法（execute_script、execute_async_script、
+execute_cdp_cmd、current_url等），page_scan / page_ready / fast_fill / submit_monitor 可直接使用
+"""
+
+import asyncio
+import base64
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+from fast_fill import fill_values_batch
+from page_scan import _JS_HELPERS
+
+# 未指定浏览器路径时依次查找
+BROWSER_CANDIDATES = [
+    'msedge', 'microsoft-edge', 'microsoft-edge-stable', 'chromium', 'chromium-browser', 'google-chrome', 'chrome',
+    'C:/Program Files (x86)/Microsoft/Edge/Application/msedge.exe',
+    'C:/Program Files/Microsoft/Edge/Application/msedge.exe',
+    'C:/Program Files/Google/Chrome/Application/chrome.exe',
+]
+
+COMMAND_TIMEOUT = 30  # 单条CDP命令的超时（秒）
+
+
+class CdpError(RuntimeError):
+    """CDP命令返回错误或页面脚本抛出异常"""
+
+
+# ==================== 统一接口 ====================
+
+class DriverBackend:
+    """浏览器后端接口：navigate / query / eval / eval_async / fill / click / cdp"""
+
+    name = 'base'
+
+    def __init__(self):
+        self._script_timeout = 30
+
+    def navigate(self, url):
+        raise NotImplementedError
+
+    def reload(self):
+        raise NotImplementedError
+
+    def query(self, selector):
+        """按CSS选择器查找元素，返回元素列表（文档顺序）"""
+        raise NotImplementedError
+
+    def eval(self, script, *args):
+        """执行Selenium风格的脚本（用arguments取参数、return返回结果），元素可作为参数和返回值"""
+        raise NotImplementedError
+
+    def eval_async(self, script, *args, timeout=None):
+        """执行异步脚本：最后一个参数为回调，调用它即返回结果"""
+        raise NotImplementedError
+
+    def fill(self, pending_fills):
+        """一次往返写入 [(输入框, 内容), ...]，返回每个输入框是否写入成功"""
+        return fill_values_batch(self, pending_fills)
+
+    def click(self, element):
+        raise NotImplementedError
+
+    def cdp(self, method, params=None):
+        """发送CDP命令"""
+        raise NotImplementedError
+
+    @property
+    def current_url(self):
+        return self.eval("return location.href;")
+
+    @property
+    def page_source(self):
+        return self.eval("return document.documentElement.outerHTML;")
+
+    @property
+    def title(self):
+        return self.eval("return document.title;")
+
+    def quit(self):
+        pass
+
+    # ---------- Selenium兼容方法 ----------
+
+    def get(self, url):
+        self.navigate(url)
+
+    def refresh(self):
+        self.reload()
+
+    def execute_script(self, script, *args):
+        return self.eval(script, *args)
+
+    def execute_async_script(self, script, *args):
+        return self.eval_async(script, *args, timeout=self._script_timeout)
+
+    def set_script_timeout(self, seconds):
+        self._script_timeout = seconds
+
+    def execute_cdp_cmd(self, method, params):
+        return self.cdp(method, params)
+
+
+class SeleniumBackend(DriverBackend):
+    """现有的Selenium实现；未定义的属性直接转给driver，可以当作driver使用"""
+
+    name = 'selenium'
+
+    def __init__(self, driver):
+        super().__init__()
+        self.driver = driver
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+    def navigate(self, url):
+        self.driver.get(url)
+
+    def reload(self):
+        self.driver.refresh()
+
+    def query(self, selector):
+        from selenium.webdriver.common.by import By
+        return self.driver.find_elements(By.CSS_SELECTOR, selector)
+
+    def eval(self, script, *args):
+        return self.driver.execute_script(script, *args)
+
+    def eval_async(self, script, *args, timeout=None):
+        # 超时未变时不再往返设置（execute_async_script每次都会传入当前超时）
+        if timeout is not None and timeout != self._script_timeout:
+            self.set_script_timeout(timeout)
+        return self.driver.execute_async_script(script, *args)
+
+    def click(self, element):
+        element.click()
+
+    def cdp(self, method, params=None):
+        return self.driver.execute_cdp_cmd(method, params or {})
+
+    @property
+    def current_url(self):
+        return self.driver.current_url
+
+    @property
+    def page_source(self):
+        return self.driver.page_source
+
+    def set_script_timeout(self, seconds):
+        super().set_script_timeout(seconds)
+        self.driver.set_script_timeout(seconds)
+
+    def quit(self):
+        self.driver.quit()
+
+
+# ==================== websocket（RFC 6455客户端，仅用于本机DevTools） ====================
+
+class _WebSocket:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, url):
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+        reader, writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = parts.path + (f"?{parts.query}" if parts.query else '')
+        writer.write((f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        await writer.drain()
+        response = await reader.readuntil(b'\r\n\r\n')
+        status_line = response.split(b'\r\n', 1)[0]
+        if status_line.split()[1:2] != [b'101']:
+            writer.close()
+            raise ConnectionError(f"websocket握手失败: {status_line.decode(errors='replace')}")
+        return cls(reader, writer)
+
+    def _frame(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = bytes([0x80 | opcode, 0x80 | length])
+        elif length < 65536:
+            header = bytes([0x80 | opcode, 0x80 | 126]) + length.to_bytes(2, 'big')
+        else:
+            header = bytes([0x80 | opcode, 0x80 | 127]) + length.to_bytes(8, 'big')
+        mask = os.urandom(4)
+        if length:
+            # 整数异或，避免逐字节循环
+            repeated = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(length, 'big')
+        return header + mask + payload
+
+    async def send(self, text):
+        self.writer.write(self._frame(0x1, text.encode('utf-8')))
+        await self.writer.drain()
+
+    async def recv(self):
+        """读取一条完整消息（合并分片，自动回复ping）"""
+        chunks = []
+        while True:
+            first, second = await self.reader.readexactly(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = int.from_bytes(await self.reader.readexactly(2), 'big')
+            elif length == 127:
+                length = int.from_bytes(await self.reader.readexactly(8), 'big')
+            mask = await self.reader.readexactly(4) if second & 0x80 else None
+            payload = await self.reader.readexactly(length) if length else b''
+            if mask:
+                repeated = (mask * (length // 4 + 1))[:length]
+                payload = (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(length, 'big')
+
+            if opcode == 0x8:
+                raise ConnectionError("DevTools连接已关闭")
+            if opcode == 0x9:
+                self.writer.write(self._frame(0xA, payload))
+                continue
+            if opcode == 0xA:
+                continue
+            chunks.append(payload)
+            if first & 0x80:
+                return b''.join(chunks).decode('utf-8')
+
+    async def close(self):
+        try:
+            self.writer.write(self._frame(0x8, b''))
+            await self.writer.drain()
+        except Exception:
+            pass
+        self.writer.close()
+
+
+# ==================== CDP会话（asyncio） ====================
+
+# 在页面内执行Selenium风格脚本：元素参数/返回值通过页面内的句柄表传递
+_EVAL_HEAD = r"""
+(function (args, isAsync) {
+    var ids = window.__cdpHandleIds || (window.__cdpHandleIds = new Map());
+    var handles = window.__cdpHandles || (window.__cdpHandles = []);
+    function unwrap(v) {
+        if (Array.isArray(v)) return v.map(unwrap);
+        if (v && typeof v === 'object') {
+            if ('__cdp_handle' in v) return handles[v.__cdp_handle];
+            var out = {};
+            for (var k in v) out[k] = unwrap(v[k]);
+            return out;
+        }
+        return v;
+    }
+    function wrap(v) {
+        if (v instanceof Node) {
+            var id = ids.get(v);
+            if (id === undefined) { id = handles.length; handles.push(v); ids.set(v, id); }
+            return {__cdp_handle: id};
+        }
+        if (Array.isArray(v) || v instanceof NodeList || v instanceof HTMLCollection) {
+            return Array.prototype.map.call(v, wrap);
+        }
+        if (v && typeof v === 'object' && Object.prototype.toString.call(v) === '[object Object]') {
+            var out = {};
+            for (var k in v) out[k] = wrap(v[k]);
+            return out;
+        }
+        return v === undefined ? null : v;
+    }
+    var fn = function () {
+"""
+_EVAL_TAIL = r"""
+    };
+    var params = unwrap(args);
+    if (!isAsync) return wrap(fn.apply(window, params));
+    return new Promise(function (resolve) {
+        params.push(function (value) { resolve(wrap(value)); });
+        fn.apply(window, params);
+    });
+})"""
+
+
+
+def _eval_expression(script, args, is_async):
+    return (_EVAL_HEAD + script + _EVAL_TAIL
+            + f"({json.dumps(args, ensure_ascii=False)}, {'true' if is_async else 'false'})")
+
+
+def _eval_value(result):
+    if 'exceptionDetails' in result:
+        details = result['exceptionDetails']
+        raise CdpError(details.get('exception', {}).get('description') or details.get('text', '脚本执行出错'))
+    return result.get('result', {}).get('value')
+
+
+CLICK_POINT_JS = r"""
+var el = arguments[0];
+el.scrollIntoView({block: 'center'});
+var rect = el.getBoundingClientRect();
+return [rect.left + rect.width / 2, rect.top + rect.height / 2];
+"""
+
+# ElementHandle.clear / send_keys：清空输入框；聚焦并把光标移到末尾，之后的Input.insertText追加到原内容之后
+CLEAR_FIELD_JS = r"""
+var el = arguments[0];
+el.value = '';
+el.dispatchEvent(new Event('input', {bubbles: true}));
+"""
+
+FOCUS_END_JS = r"""
+var el = arguments[0];
+el.focus();
+try { el.setSelectionRange(el.value.length, el.value.length); } catch (e) {}
+return document.activeElement === el;
+"""
+
+# find_element(s)：arguments[0]为CSS选择器或XPath（arguments[1]为True），arguments[2]为起点元素（默认整个文档）
+FIND_ELEMENTS_JS = r"""
+var query = arguments[0], isXpath = arguments[1], root = arguments[2] || document;
+if (!isXpath) return Array.prototype.slice.call(root.querySelectorAll(query));
+var result = document.evaluate(query, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var nodes = [];
+for (var i = 0; i < result.snapshotLength; i++) {
+    if (result.snapshotItem(i).nodeType === 1) nodes.push(result.snapshotItem(i));
+}
+return nodes;
+"""
+
+ELEMENT_STATE_JS = _JS_HELPERS + r"""
+var el = arguments[0];
+return {tag: el.tagName.toLowerCase(), text: (el.innerText || '').trim(), displayed: isVisible(el), enabled: isEnabled(el)};
+"""
+
+# performance日志中要记录的Network事件（SubmitMonitor._check_network读取这些事件）
+NETWORK_LOG_EVENTS = ('Network.responseReceived', 'Network.loadingFinished', 'Network.loadingFailed')
+
+
+def _css_query(by, value):
+    """把Selenium的By查找方式换成 (查询, 是否为XPath)"""
+    quoted = value.replace('\\', '\\\\').replace('"', '\\"')
+    queries = {
+        'css selector': value,
+        'tag name': value,
+        'id': f'[id="{quoted}"]',
+        'name': f'[name="{quoted}"]',
+        'class name': '.' + '.'.join(value.split()),
+    }
+    if by == 'xpath':
+        return value, True
+    if by not in queries:
+        raise CdpError(f"CDP后端不支持的查找方式: {by}")
+    return queries[by], False
+
+
+class ElementHandle:
+    """CdpBackend中的元素引用（页面内句柄表的下标），页面跳转后失效"""
+
+    def __init__(self, backend, handle_id):
+        self.backend = backend
+        self.id = handle_id
+
+    def __eq__(self, other):
+        return isinstance(other, ElementHandle) and other.id == self.id and other.backend is self.backend
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"ElementHandle({self.id})"
+
+    def click(self):
+        self.backend.click(self)
+
+    def get_attribute(self, name):
+        return self.backend.eval("return arguments[0].getAttribute(arguments[1]);", self, name)
+
+    # ---------- 与WebElement相同的方法，流程中逐个元素的查找、判断和输入可直接使用 ----------
+
+    def _state(self):
+        return self.backend.eval(ELEMENT_STATE_JS, self)
+
+    @property
+    def tag_name(self):
+        return self._state()['tag']
+
+    @property
+    def text(self):
+        return self._state()['text']
+
+    def is_displayed(self):
+        return self._state()['displayed']
+
+    def is_enabled(self):
+        return self._state()['enabled']
+
+    def find_elements(self, by, value):
+        return self.backend.find_elements(by, value, root=self)
+
+    def find_element(self, by, value):
+        return self.backend.find_element(by, value, root=self)
+
+    def clear(self):
+        self.backend.eval(CLEAR_FIELD_JS, self)
+
+    def send_keys(self, text):
+        if not self.backend.eval(FOCUS_END_JS, self):
+            raise CdpError("输入框无法获得焦点")
+        self.backend.cdp('Input.insertText', {'text': text})
+
+
+class AsyncCdpSession:
+    """连接到一个页面的DevTools websocket，按id分发命令结果，按方法名分发事件"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self._next_id = 0
+        self._pending = {}
+        self._waiters = {}  # 事件方法名 -> [future]
+        self._listeners = {}  # 事件方法名 -> 回调，每次事件都调用
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def connect(cls, ws_url):
+        session = cls(await _WebSocket.connect(ws_url))
+        await session.send('Page.enable')
+        await session.send('Runtime.enable')
+        return session
+
+    async def send(self, method, params=None, timeout=COMMAND_TIMEOUT):
+        self._next_id += 1
+        message_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.websocket.send(json.dumps({'id': message_id, 'method': method, 'params': params or {}}))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def wait_event(self, method):
+        """在触发动作之前调用，返回事件发生时完成的future"""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(method, []).append(future)
+        return future
+
+    def on(self, method, callback):
+        """登记事件回调（在事件循环中调用，不能阻塞）；callback为None时取消"""
+        if callback is None:
+            self._listeners.pop(method, None)
+        else:
+            self._listeners[method] = callback
+
+    async def _read_loop(self):
+        try:
+            while True:
+                message = json.loads(await self.websocket.recv())
+                if 'id' in message:
+                    future = self._pending.get(message['id'])
+                    if future is None or future.done():
+                        continue
+                    if 'error' in message:
+                        future.set_exception(CdpError(message['error'].get('message', str(message['error']))))
+                    else:
+                        future.set_result(message.get('result', {}))
+                else:
+                    method, params = message.get('method'), message.get('params', {})
+                    for future in self._waiters.pop(method, []):
+                        if not future.done():
+                            future.set_result(params)
+                    if method in self._listeners:
+                        self._listeners[method](params)
+        except (asyncio.CancelledError, Exception) as e:
+            error = e if isinstance(e, ConnectionError) else ConnectionError(f"DevTools连接中断: {e}")
+            for future in list(self._pending.values()) + [f for fs in self._waiters.values() for f in fs]:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def navigate(self, url, timeout=COMMAND_TIMEOUT):
+        loaded = self.wait_event('Page.loadEventFired')
+        result = await self.send('Page.navigate', {'url': url})
+        if result.get('errorText'):
+            raise CdpError(f"打开网页失败: {result['errorText']}")
+        await asyncio.wait_for(loaded, timeout)
+
+    async def reload(self, timeout=COMMAND_TIMEOUT):
+        loaded = self.wait_event('Page.loadEventFired')
+        await self.send('Page.reload')
+        await asyncio.wait_for(loaded, timeout)
+
+    async def evaluate(self, script, args, is_async=False, timeout=COMMAND_TIMEOUT):
+        """执行Selenium风格脚本；args中的元素须已编码为 {'__cdp_handle': id}"""
+        result = await self.send('Runtime.evaluate', {
+            'expression': _eval_expression(script, args, is_async), 'returnByValue': True, 'awaitPromise': is_async,
+        }, timeout=timeout)
+        return _eval_value(result)
+
+    async def close(self):
+        self._reader_task.cancel()
+        await self.websocket.close()
+
+
+# ==================== CDP后端（同步接口） ====================
+
+def find_browser_binary():
+    """查找Edge/Chromium可执行文件，找不到时返回None"""
+    for candidate in BROWSER_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    return None
+
+
+def launch_browser(binary=None, headless=False, extra_args=(), timeout=15):
+    """以远程调试模式启动浏览器（端口自动分配），返回 (进程, 临时用户目录, 调试端口)"""
+    binary = binary or find_browser_binary()
+    if not binary:
+        raise FileNotFoundError("未找到Edge/Chromium浏览器，请指定浏览器路径")
+
+    profile_dir = tempfile.mkdtemp(prefix='cdp_profile_')
+    command = [binary, '--remote-debugging-port=0', f'--user-data-dir={profile_dir}',
+               '--no-first-run', '--no-default-browser-check']
+    if headless:
+        command.append('--headless=new')
+    command.extend(extra_args)
+    command.append('about:blank')
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # 浏览器启动后把实际端口写入用户目录下的DevToolsActivePort
+    port_file = os.path.join(profile_dir, 'DevToolsActivePort')
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"浏览器启动失败（退出码 {process.returncode}）")
+        try:
+            with open(port_file, 'r') as f:
+                first_line = f.readline().strip()
+            if first_line:
+                return process, profile_dir, int(first_line)
+        except (OSError, ValueError):
+            pass
+        time.sleep(0.05)
+    process.terminate()
+    raise TimeoutError("等待浏览器调试端口超时")
+
+
+def page_websocket_url(port, host='127.0.0.1'):
+    """取第一个页面标签的DevTools websocket地址，没有时新建一个"""
+    with urllib.request.urlopen(f"http://{host}:{port}/json/list", timeout=5) as response:
+        targets = json.load(response)
+    for target in targets:
+        if target.get('type') == 'page' and target.get('webSocketDebuggerUrl'):
+            return target['webSocketDebuggerUrl']
+    request = urllib.request.Request(f"http://{host}:{port}/json/new?about:blank", method='PUT')
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.load(response)['webSocketDebuggerUrl']
+
+
+class CdpBackend(DriverBackend):
+    """直接通过DevTools websocket控制浏览器；asyncio事件循环在后台线程运行，对外提供同步接口"""
+
+    name = 'cdp'
+
+    def __init__(self, ws_url, process=None, profile_dir=None):
+        super().__init__()
+        self.process = process
+        self.profile_dir = profile_dir
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self.session = self._run(AsyncCdpSession.connect(ws_url), COMMAND_TIMEOUT)
+        self._network_log = None  # 首次读取performance日志后开始记录Network事件
+        self._network_log_lock = threading.Lock()
+
+    @classmethod
+    def launch(cls, binary=None, headless=False, extra_args=()):
+        """启动浏览器并连接到它的第一个页面"""
+        process, profile_dir, port = launch_browser(binary, headless, extra_args)
+        try:
+            return cls(page_websocket_url(port), process, profile_dir)
+        except Exception:
+            process.terminate()
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            raise
+
+    @classmethod
+    def connect(cls, port, host='127.0.0.1'):
+        """连接到已用 --remote-debugging-port 启动的浏览器"""
+        return cls(page_websocket_url(port, host))
+
+    def _run(self, coroutine, timeout):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout + 1)
+
+    def execute(self, method, params=None):
+        """所有CDP命令的统一出口（与Selenium的driver.execute相同，耗时追踪在此拦截）
+
+        超时为单条命令超时加上脚本超时，异步脚本自身负责在脚本超时内返回
+        """
+        timeout = COMMAND_TIMEOUT + self._script_timeout
+        return self._run(self.session.send(method, params, timeout), timeout)
+
+    # ---------- 编码元素句柄 ----------
+
+    def _encode(self, value):
+        if isinstance(value, ElementHandle):
+            return {'__cdp_handle': value.id}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._encode(item) for key, item in value.items()}
+        return value
+
+    def _decode(self, value):
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        if isinstance(value, dict):
+            if len(value) == 1 and '__cdp_handle' in value:
+                return ElementHandle(self, value['__cdp_handle'])
+            return {key: self._decode(item) for key, item in value.items()}
+        return value
+
+    # ---------- 接口实现 ----------
+
+    async def _register_event(self, method):
+        return self.session.wait_event(method)
+
+    def _until_loaded(self, method, params=None):
+        """发送导航类命令并等待页面load事件（先登记事件，避免错过）"""
+        loaded = self._run(self._register_event('Page.loadEventFired'), COMMAND_TIMEOUT)
+        result = self.execute(method, params)
+        if result.get('errorText'):
+            raise CdpError(f"打开网页失败: {result['errorText']}")
+        self._run(asyncio.wait_for(loaded, COMMAND_TIMEOUT), COMMAND_TIMEOUT)
+
+    def navigate(self, url):
+        self._until_loaded('Page.navigate', {'url': url})
+
+    def reload(self):
+        self._until_loaded('Page.reload')
+
+    def query(self, selector):
+        return self.eval("return document.querySelectorAll(arguments[0]);", selector) or []
+
+    def _evaluate(self, script, args, is_async):
+        result = self.execute('Runtime.evaluate', {
+            'expression': _eval_expression(script, self._encode(list(args)), is_async),
+            'returnByValue': True, 'awaitPromise': is_async,
+        })
+        return self._decode(_eval_value(result))
+
+    def eval(self, script, *args):
+        return self._evaluate(script, args, False)
+
+    def eval_async(self, script, *args, timeout=None):
+        if timeout is not None:
+            self.set_script_timeout(timeout)
+        return self._evaluate(script, args, True)
+
+    def click(self, element):
+        """在元素中心派发真实的鼠标按下/抬起事件"""
+        x, y = self.eval(CLICK_POINT_JS, element)
+        for event_type in ('mouseMoved', 'mousePressed', 'mouseReleased'):
+            self.execute('Input.dispatchMouseEvent', {'type': event_type, 'x': x, 'y': y,
+                                                      'button': 'left', 'clickCount': 1})
+
+    def cdp(self, method, params=None):
+        return self.execute(method, params)
+
+    def set_request_filter(self, should_block):
+        """用Fetch拦截所有请求，should_block(url, resource_type)为True的请求直接失败；None表示取消拦截"""
+        if should_block is None:
+            self.session.on('Fetch.requestPaused', None)
+            self.execute('Fetch.disable')
+            return
+
+        session = self.session
+
+        def on_paused(params):
+            request_id = params['requestId']
+            if should_block(params['request']['url'], params.get('resourceType')):
+                command = session.send('Fetch.failRequest', {'requestId': request_id, 'errorReason': 'BlockedByClient'})
+            else:
+                command = session.send('Fetch.continueRequest', {'requestId': request_id})
+            # 在读取循环之外等待结果；页面跳转后请求已失效时的错误可以忽略
+            asyncio.ensure_future(command).add_done_callback(lambda task: task.exception())
+
+        session.on('Fetch.requestPaused', on_paused)
+        self.execute('Fetch.enable', {'patterns': [{'urlPattern': '*', 'requestStage': 'Request'}]})
+
+    # ---------- Selenium兼容方法（WebDriver中流程用到的其余部分） ----------
+
+    def find_elements(self, by, value, root=None):
+        query, is_xpath = _css_query(by, value)
+        return self.eval(FIND_ELEMENTS_JS, query, is_xpath, root) or []
+
+    def find_element(self, by, value, root=None):
+        elements = self.find_elements(by, value, root)
+        if not elements:
+            raise CdpError(f"未找到元素: {by}={value}")
+        return elements[0]
+
+    def get_cookies(self):
+        return self.execute('Network.getCookies', {'urls': [self.current_url]}).get('cookies', [])
+
+    def _record_network_event(self, method, params):
+        entry = {'message': json.dumps({'message': {'method': method, 'params': params}}),
+                 'timestamp': int(time.time() * 1000)}
+        with self._network_log_lock:
+            self._network_log.append(entry)
+
+    def get_log(self, log_type):
+        """只提供performance日志中的Network事件，条目格式与Selenium相同；首次调用时开始记录并返回空列表
+
+        Network域需由调用方用Network.enable开启（SubmitMonitor.arm），未开启时没有事件
+        """
+        if log_type != 'performance':
+            raise NotImplementedError(f"CDP后端不提供{log_type}日志")
+        with self._network_log_lock:
+            if self._network_log is None:
+                self._network_log = []
+                for method in NETWORK_LOG_EVENTS:
+                    self.session.on(method, lambda params, method=method: self._record_network_event(method, params))
+            entries, self._network_log = self._network_log, []
+        return entries
+
+    def quit(self):
+        try:
+            self._run(self.session.close(), 5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
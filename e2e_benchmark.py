@@ -0,0 +1,186 @@
+"""
+端到端基准测试
+功能：启动本地模拟问卷星服务器（mock_wjx_server.py），用无头Chromium运行各脚本现有的填写流程，
+      统计从开始运行到服务器收到提交的耗时（time-to-submit），按题目数给出p50/p95
+
+运行: python e2e_benchmark.py [--sizes 5 50 500] [--runs 5] [--scripts solve wait button] [--warm]
+需要安装selenium和Chromium/Chrome；chromedriver可由selenium自动获取，或用 --chromedriver 指定
+结构缓存、标签统计和耗时追踪文件都写到临时目录，不影响脚本目录下的文件
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import label_stats
+import structure_cache
+from mock_wjx_server import MockWjxServer
+
+# 脚本名称 -> 模块
+BENCH_SCRIPTS = {
+    'solve': 'QR_URL_solve',
+    'wait': 'QR_solve_wait',
+    'button': 'QR_URL_button',
+    'input': 'QR_URL_input',
+}
+
+DEFAULT_SIZES = [5, 50, 500]
+DEFAULT_SCRIPTS = ['solve', 'wait', 'button']  # input脚本无法点击div提交按钮，默认不测
+
+
+def create_headless_chrome(chromedriver_path=None):
+    """创建无头Chromium，并开启performance日志（提交结果检测需要）"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--window-size=1920,1080')
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    service = Service(executable_path=chromedriver_path) if chromedriver_path else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_page_load_timeout(30)
+    return driver
+
+
+def percentile(values, pct):
+    """线性插值的百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@contextlib.contextmanager
+def isolated_state_files():
+    """把结构缓存和标签统计文件指向临时目录，返回该目录；结束时恢复并删除"""
+    saved = structure_cache.CACHE_FILE, label_stats.STATS_FILE
+    with tempfile.TemporaryDirectory(prefix='e2e_benchmark_') as state_dir:
+        structure_cache.CACHE_FILE = os.path.join(state_dir, 'survey_structure_cache.json')
+        label_stats.STATS_FILE = os.path.join(state_dir, 'label_method_stats.json')
+        try:
+            yield state_dir
+        finally:
+            structure_cache.CACHE_FILE, label_stats.STATS_FILE = saved
+
+
+def clear_state_files():
+    """删除上一次运行留下的结构缓存和标签统计，使每次运行都是冷启动"""
+    for path in (structure_cache.CACHE_FILE, label_stats.STATS_FILE):
+        with contextlib.suppress(OSError):
+            os.remove(path)
+
+
+def run_once(module, driver, url, verbose=False):
+    """运行一次脚本的填写流程，返回 (开始时间, 流程摘要)"""
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        started = time.time()
+        try:
+            summary = module.run_autofill(driver, url)
+        except Exception as e:
+            summary = {'success': False, 'error': str(e)}
+    return started, summary
+
+
+def benchmark_script(server, driver, script, sizes, runs, warm=False, verbose=False, state_dir=None):
+    """对一个脚本在各题目数下各运行runs次，返回 {题目数: 统计结果}
+
+    warm为True时每种题目数只使用一份问卷：先运行一次（不计入结果）写入结构缓存和标签统计，之后各次都命中缓存；
+    否则每次运行使用新问卷并清空缓存和统计
+    """
+    module = importlib.import_module(BENCH_SCRIPTS[script])
+    if hasattr(module, 'STRUCTURE_CACHE') and not warm:
+        module.STRUCTURE_CACHE = False  # 默认测冷启动，不读写结构缓存
+    if state_dir and hasattr(module, 'TRACE_FILE'):
+        module.TRACE_FILE = os.path.join(state_dir, f"trace_{script}.json")
+
+    def new_survey(run):
+        survey_id = f"{script}-{size}-{run}-{int(time.time() * 1000)}"
+        # solve流程需要先点击"开始作答"入口
+        return survey_id, server.add_survey(survey_id, fields=size, require_start=(script == 'solve'))
+
+    results = {}
+    for size in sizes:
+        times, failures = [], 0
+        if warm:
+            survey_id, url = new_survey('warm')
+            driver.delete_all_cookies()
+            driver.get('about:blank')
+            run_once(module, driver, url, verbose)
+        for run in range(runs):
+            if not warm:
+                clear_state_files()
+                survey_id, url = new_survey(run)
+            driver.delete_all_cookies()
+            driver.get('about:blank')
+
+            started, summary = run_once(module, driver, url, verbose)
+            submissions = [item for item in server.submissions_for(survey_id) if item['time'] >= started]
+            if submissions:
+                times.append(submissions[0]['time'] - started)
+            else:
+                failures += 1
+                print(f"  {script} {size}题 第{run + 1}次未提交: {summary.get('error', '服务器未收到提交')}")
+
+        results[size] = {
+            'runs': runs,
+            'submitted': len(times),
+            'failures': failures,
+            'p50': percentile(times, 50),
+            'p95': percentile(times, 95),
+            'times': times,
+        }
+        p50 = f"{results[size]['p50']:.3f}s" if times else '-'
+        p95 = f"{results[size]['p95']:.3f}s" if times else '-'
+        print(f"{script:<8}{size:>6}题  提交 {len(times)}/{runs}  p50 {p50:>9}  p95 {p95:>9}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟问卷星的端到端基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='问卷题目数')
+    parser.add_argument('--runs', type=int, default=5, help='每种题目数运行次数')
+    parser.add_argument('--scripts', nargs='+', default=DEFAULT_SCRIPTS, choices=sorted(BENCH_SCRIPTS),
+                        help='要测试的脚本')
+    parser.add_argument('--chromedriver', default=None, help='chromedriver路径（默认由selenium自动获取）')
+    parser.add_argument('--warm', action='store_true', help='每种题目数重复使用同一份问卷并保留结构缓存（测热启动）')
+    parser.add_argument('--json', default=None, help='把结果写入该JSON文件')
+    parser.add_argument('--verbose', action='store_true', help='显示脚本自身的输出')
+    args = parser.parse_args()
+
+    server = MockWjxServer().start()
+    driver = create_headless_chrome(args.chromedriver)
+    print(f"模拟问卷星服务器: {server.base_url}")
+    print(f"{'脚本':<6}{'题目数':>8}  结果")
+
+    report = {}
+    try:
+        with isolated_state_files() as state_dir:
+            for script in args.scripts:
+                report[script] = benchmark_script(server, driver, script, args.sizes, args.runs, warm=args.warm,
+                                                  verbose=args.verbose, state_dir=state_dir)
+    finally:
+        driver.quit()
+        server.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+快速填写工具
+功能：一次execute_script写入所有输入框的值，并触发问卷星校验监听的input/change/blur事件；
+      另提供CDP输入方式：由浏览器通过Input.insertText插入整段文字，产生真实的输入事件
+"""
+
+# ==================== 页面内脚本 ====================
+
+# arguments[0]为 [[输入框, 内容], ...]，返回每个输入框是否写入成功
+FILL_VALUES_JS = r"""
+function fire(el, type, EventClass) {
+    el.dispatchEvent(new EventClass(type, {bubbles: type !== 'focus' && type !== 'blur', cancelable: true}));
+}
+function setNativeValue(el, value) {
+    // 使用原型上的setter，保证React/Vue等框架能感知到值的变化
+    var proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    var descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+    if (descriptor && descriptor.set) {
+        descriptor.set.call(el, value);
+    } else {
+        el.value = value;
+    }
+}
+var results = [];
+var items = arguments[0] || [];
+for (var i = 0; i < items.length; i++) {
+    var el = items[i][0], value = items[i][1];
+    try {
+        fire(el, 'focus', FocusEvent);
+        fire(el, 'focusin', FocusEvent);
+        setNativeValue(el, value);
+        fire(el, 'input', Event);
+        fire(el, 'keyup', KeyboardEvent);
+        fire(el, 'change', Event);
+        fire(el, 'blur', FocusEvent);
+        fire(el, 'focusout', FocusEvent);
+        results.push(el.value === value);
+    } catch (e) {
+        results.push(false);
+    }
+}
+return results;
+"""
+
+# CDP输入前聚焦并全选输入框，插入的文字会替换原有内容；返回是否已获得焦点
+FOCUS_FIELD_JS = r"""
+var el = arguments[0];
+el.scrollIntoView({block: 'center'});
+el.focus();
+if (typeof el.select === 'function') el.select();
+return document.activeElement === el;
+"""
+
+# 输入结束：让当前焦点离开以触发change/blur，并返回各输入框的当前值供核对
+FINISH_TYPING_JS = r"""
+var active = document.activeElement;
+if (active && active !== document.body) active.blur();
+var values = [];
+var items = arguments[0] || [];
+for (var i = 0; i < items.length; i++) values.push(items[i] ? items[i].value : null);
+return values;
+"""
+
+
+# ==================== 工具函数 ====================
+
+def fill_values_batch(driver, pending_fills):
+    """一次往返写入所有输入框
+
+    pending_fills为 [(输入框, 内容), ...]，返回与之对应的写入结果列表（True/False）
+    """
+    if not pending_fills:
+        return []
+    items = [[element, value] for element, value in pending_fills]
+    return driver.execute_script(FILL_VALUES_JS, items) or [False] * len(items)
+
+
+def insert_text(driver, element, text):
+    """通过CDP Input.insertText输入整段文字：浏览器产生真实的beforeinput/input事件，
+    每个输入框只需一次execute_script和一次CDP调用（逐字符send_keys需要每个字符一次往返）
+
+    需要Chromium内核的浏览器（Edge/Chrome），失败时抛出异常
+    """
+    if not driver.execute_script(FOCUS_FIELD_JS, element):
+        raise RuntimeError("输入框无法获得焦点")
+    driver.execute_cdp_cmd('Input.insertText', {'text': text})
+
+
+def insert_text_batch(driver, pending_fills):
+    """依次用CDP输入所有输入框，最后让焦点离开以触发change/blur
+
+    pending_fills为 [(输入框, 内容), ...]，返回与之对应的结果列表（True/False）
+    """
+    if not pending_fills:
+        return []
+    inserted = []
+    for element, value in pending_fills:
+        try:
+            insert_text(driver, element, value)
+            inserted.append(True)
+        except Exception:
+            inserted.append(False)
+    values = driver.execute_script(FINISH_TYPING_JS, [element for element, _ in pending_fills]) or []
+    return [ok and i < len(values) and values[i] == value
+            for i, (ok, (_, value)) in enumerate(zip(inserted, pending_fills))]
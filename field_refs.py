@@ -0,0 +1,45 @@
+"""
+输入框稳定引用
+功能：为每个输入框保存稳定的CSS定位（问卷星题目id如 #q1、唯一的name，或从题目容器起的简短路径），
+      页面刷新、重新打开或局部重新渲染使WebElement失效后，一次execute_script按定位重新获取所有输入框，
+      无需重新查找、提取标签和匹配字典
+"""
+
+from page_scan import _JS_FIELD_LOCATOR, _JS_HELPERS
+
+# ==================== 页面内脚本 ====================
+
+# arguments[0]: 输入框元素列表，返回与之一一对应的定位
+FIELD_LOCATORS_JS = _JS_FIELD_LOCATOR + r"""
+var elements = arguments[0] || [];
+var locators = [];
+for (var i = 0; i < elements.length; i++) {
+    try { locators.push(fieldLocator(elements[i])); } catch (e) { locators.push(null); }
+}
+return locators;
+"""
+
+# arguments[0]: 定位列表，返回与之一一对应的元素，找不到或不可见、不可用时为null
+REBIND_FIELDS_JS = _JS_HELPERS + r"""
+var locators = arguments[0] || [];
+var elements = [];
+for (var i = 0; i < locators.length; i++) {
+    var el = null;
+    try { el = locators[i] ? document.querySelector(locators[i]) : null; } catch (e) {}
+    elements.push(el && isVisible(el) && isEnabled(el) ? el : null);
+}
+return elements;
+"""
+
+
+# ==================== 工具函数 ====================
+
+def field_locators(driver, input_elements):
+    """一次往返计算各输入框的稳定定位（批量查找之外的查找方式使用），无法定位的为None"""
+    return driver.execute_script(FIELD_LOCATORS_JS, list(input_elements)) or []
+
+
+def rebind_fields(driver, locators):
+    """一次往返按定位重新获取输入框，返回与locators一一对应的元素列表，找不到的为None"""
+    elements = driver.execute_script(REBIND_FIELDS_JS, list(locators)) or []
+    return elements + [None] * (len(locators) - len(elements))
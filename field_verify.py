@@ -0,0 +1,55 @@
+"""
+提交前后的输入框检查
+功能：一次execute_script读取所有输入框的当前值和问卷星的校验错误标记（题目下方的错误提示、aria-invalid、
+      浏览器自带的格式校验），找出空白或被标记的输入框，供流程只对这些输入框按字典补填后重新提交
+"""
+
+from page_scan import _JS_HELPERS
+from submit_monitor import VALIDATION_ERROR_SELECTOR
+
+# ==================== 页面内脚本 ====================
+
+# arguments[0]: 输入框元素列表，arguments[1]: 校验错误提示的选择器
+VERIFY_FIELDS_JS = _JS_HELPERS + r"""
+var elements = arguments[0] || [], errorSelector = arguments[1];
+var QUESTION_SELECTOR = '.field, .div_question, [topic], fieldset, li';
+
+function errorText(el) {
+    if (el.getAttribute('aria-invalid') === 'true') return '页面标记为无效';
+    if (el.value && el.validity && !el.validity.valid) return el.validationMessage || '格式不正确';
+    var question = el.closest(QUESTION_SELECTOR);
+    if (!question) return '';
+    var nodes = question.querySelectorAll(errorSelector);
+    for (var i = 0; i < nodes.length; i++) {
+        var text = isVisible(nodes[i]) ? textOf(nodes[i]) : '';
+        if (text) return text.slice(0, 50);
+    }
+    return '';
+}
+
+var results = [];
+for (var k = 0; k < elements.length; k++) {
+    var el = elements[k];
+    if (!el || !el.isConnected) {
+        results.push({value: '', error: '输入框已不在页面中'});
+        continue;
+    }
+    results.push({value: el.value || '', error: errorText(el)});
+}
+return results;
+"""
+
+
+# ==================== 工具函数 ====================
+
+def verify_fields(driver, input_elements):
+    """一次往返读取所有输入框的值和校验错误标记
+
+    返回与input_elements一一对应的列表，每项为 {'value': 当前值, 'error': 错误提示，没有时为空字符串}
+    """
+    return driver.execute_script(VERIFY_FIELDS_JS, list(input_elements), VALIDATION_ERROR_SELECTOR) or []
+
+
+def flagged_fields(results):
+    """返回需要补填的输入框序号（从0开始）：值为空或带有校验错误标记"""
+    return [i for i, item in enumerate(results) if not (item.get('value') or '').strip() or item.get('error')]
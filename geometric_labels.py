@@ -0,0 +1,155 @@
+"""
+按页面坐标就近匹配标签
+功能：一次execute_script导出所有输入框和所有可见中文文本节点的位置，
+      再按"输入框上方或左侧、距离不超过上限"的规则就近分配标签，
+      代替逐个输入框沿DOM轴查找；有NumPy时向量化计算，否则用纯Python
+"""
+
+import bisect
+
+from page_scan import _JS_HELPERS, extract_labels_batch
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 标签与输入框的最大距离（像素）
+MAX_DISTANCE = 200
+# 判断"上方/左侧"时允许的重叠（像素），应对行高和内边距造成的微小重叠
+OVERLAP_TOLERANCE = 4
+# 每个输入框保留的候选文字数，有匹配器时依次尝试
+CANDIDATES = 3
+
+# 导出位置：坐标为页面坐标 [left, top, right, bottom]
+DUMP_RECTS_JS = _JS_HELPERS + r"""
+var inputs = arguments[0];
+var sx = window.scrollX, sy = window.scrollY;
+function box(r) { return [r.left + sx, r.top + sy, r.right + sx, r.bottom + sy]; }
+
+var inputRects = [];
+for (var i = 0; i < inputs.length; i++) inputRects.push(box(inputs[i].getBoundingClientRect()));
+
+var SKIP = {SCRIPT: 1, STYLE: 1, NOSCRIPT: 1, TEXTAREA: 1, OPTION: 1, SELECT: 1, TEMPLATE: 1};
+var visibleCache = new Map();
+var texts = [], rects = [];
+var walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+var range = document.createRange();
+var node;
+while ((node = walker.nextNode())) {
+    var text = node.nodeValue.trim();
+    if (!text || text.length >= 50 || !hasChinese(text)) continue;
+    var parent = node.parentElement;
+    if (!parent || SKIP[parent.tagName]) continue;
+    var visible = visibleCache.get(parent);
+    if (visible === undefined) { visible = isVisible(parent); visibleCache.set(parent, visible); }
+    if (!visible) continue;
+    range.selectNodeContents(node);
+    var r = range.getBoundingClientRect();
+    if (r.width === 0 || r.height === 0) continue;
+    texts.push(text);
+    rects.push(box(r));
+}
+return {inputs: inputRects, texts: texts, rects: rects};
+"""
+
+
+def dump_rects(driver, input_elements):
+    """一次往返导出输入框和中文文本节点的位置"""
+    return driver.execute_script(DUMP_RECTS_JS, list(input_elements))
+
+
+def _nearest_numpy(input_rects, text_rects, max_distance, candidates):
+    inputs = np.asarray(input_rects, dtype=float).reshape(-1, 4)
+    texts = np.asarray(text_rects, dtype=float).reshape(-1, 4)
+    order = np.argsort(texts[:, 3], kind='stable')
+    texts = texts[order]
+    bottoms = texts[:, 3]
+    # 按文字底边排序后二分出每个输入框的候选窗口：底边在 [输入框顶边 - 上限, 输入框底边 + 上限]
+    starts = np.searchsorted(bottoms, inputs[:, 1] - max_distance, side='left')
+    ends = np.searchsorted(bottoms, inputs[:, 3] + max_distance, side='right')
+
+    result = []
+    for (left, top, right, bottom), start, end in zip(inputs, starts, ends):
+        window = texts[start:end]
+        if not len(window):
+            result.append([])
+            continue
+        t_left, t_top, t_right, t_bottom = window.T
+        above = t_bottom <= top + OVERLAP_TOLERANCE
+        beside = (t_right <= left + OVERLAP_TOLERANCE) & (t_top < bottom) & (t_bottom > top)
+        dx = np.maximum(0.0, np.maximum(t_left - right, left - t_right))
+        dy = np.where(above, np.maximum(0.0, top - t_bottom), 0.0)
+        distance = np.hypot(dx, dy)
+        valid = (above | beside) & (distance <= max_distance)
+        indices = np.flatnonzero(valid)
+        nearest = indices[np.argsort(distance[indices], kind='stable')[:candidates]]
+        result.append([int(order[start + i]) for i in nearest])
+    return result
+
+
+def _nearest_python(input_rects, text_rects, max_distance, candidates):
+    order = sorted(range(len(text_rects)), key=lambda i: text_rects[i][3])
+    bottoms = [text_rects[i][3] for i in order]
+
+    result = []
+    for left, top, right, bottom in input_rects:
+        start = bisect.bisect_left(bottoms, top - max_distance)
+        end = bisect.bisect_right(bottoms, bottom + max_distance)
+        scored = []
+        for position in range(start, end):
+            index = order[position]
+            t_left, t_top, t_right, t_bottom = text_rects[index]
+            above = t_bottom <= top + OVERLAP_TOLERANCE
+            beside = t_right <= left + OVERLAP_TOLERANCE and t_top < bottom and t_bottom > top
+            if not (above or beside):
+                continue
+            dx = max(0.0, t_left - right, left - t_right)
+            dy = max(0.0, top - t_bottom) if above else 0.0
+            distance = (dx * dx + dy * dy) ** 0.5
+            if distance <= max_distance:
+                scored.append((distance, position, index))
+        scored.sort()
+        result.append([index for _, _, index in scored[:candidates]])
+    return result
+
+
+def nearest_texts(input_rects, text_rects, max_distance=MAX_DISTANCE, candidates=CANDIDATES):
+    """为每个输入框返回距离由近到远的候选文字下标（最多candidates个）"""
+    if not input_rects:
+        return []
+    if not text_rects:
+        return [[] for _ in input_rects]
+    if np is not None:
+        return _nearest_numpy(input_rects, text_rects, max_distance, candidates)
+    return _nearest_python(input_rects, text_rects, max_distance, candidates)
+
+
+def extract_labels_geometric(driver, input_elements, matcher=None, max_distance=MAX_DISTANCE, fallback=True):
+    """按坐标就近提取所有输入框的标签，返回格式与page_scan.extract_labels_batch相同
+
+    传入matcher（KeywordMatcher）时，在候选文字中选最近的一个能匹配字典的；
+    fallback为True时，没有候选文字的输入框再用DOM规则批量提取一次（例如只有placeholder的情况）
+    """
+    input_elements = list(input_elements)
+    dump = dump_rects(driver, input_elements)
+    texts = dump['texts']
+    nearest = nearest_texts(dump['inputs'], dump['rects'], max_distance)
+
+    results = []
+    missing = []
+    for i, (element, indices) in enumerate(zip(input_elements, nearest)):
+        text = ''
+        if indices:
+            text = texts[indices[0]]
+            if matcher is not None:
+                text = next((texts[j] for j in indices if matcher.match(texts[j])), text)
+        else:
+            missing.append(i)
+        results.append({'element': element, 'text': text, 'method': 'geometric' if text else ''})
+
+    if fallback and missing:
+        for i, item in zip(missing, extract_labels_batch(driver, [input_elements[i] for i in missing])):
+            results[i]['text'] = item['text']
+            results[i]['method'] = item['method']
+    return results
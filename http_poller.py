@@ -0,0 +1,191 @@
+"""
+HTTP预轮询工具
+功能：问卷开放前用轻量HTTP请求（长连接 + 条件请求）轮询问卷页面，
+      从原始HTML判断"尚未开放" -> "已开放"的变化，只在状态变化时才让浏览器刷新
+"""
+
+import gzip
+import http.client
+import time
+import zlib
+from urllib.parse import urljoin, urlsplit
+
+# 问卷尚未开放时页面中出现的文字
+NOT_OPEN_MARKERS = [
+    "问卷尚未开始",
+    "尚未开始",
+    "未到开始时间",
+    "暂未开放",
+    "尚未开放",
+    "即将开始",
+]
+
+# 问卷已开放时页面中出现的特征
+OPEN_MARKERS = [
+    'id="ctlNext"',
+    "submitbtn",
+    'id="divQuestion"',
+    "开始作答",
+    "<textarea",
+    'type="text"',
+]
+
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0')
+
+
+def classify_survey_html(html):
+    """根据HTML判断问卷状态：'not_open'、'open' 或 'unknown'"""
+    if not html:
+        return 'unknown'
+    for marker in NOT_OPEN_MARKERS:
+        if marker in html:
+            return 'not_open'
+    for marker in OPEN_MARKERS:
+        if marker in html:
+            return 'open'
+    return 'unknown'
+
+
+def cookies_from_driver(driver):
+    """把浏览器中的Cookie拼成请求头，使HTTP轮询与浏览器使用同一会话"""
+    try:
+        return '; '.join(f"{c['name']}={c['value']}" for c in driver.get_cookies())
+    except Exception:
+        return ''
+
+
+class SurveyHttpPoller:
+    def __init__(self, url, user_agent=DEFAULT_USER_AGENT, cookie_header='', timeout=10):
+        """创建轮询器，连接在多次请求之间复用"""
+        self.url = url
+        self.user_agent = user_agent
+        self.cookie_header = cookie_header
+        self.timeout = timeout
+
+        self.connection = None
+        self._conn_key = None
+        self.etag = None
+        self.last_modified = None
+        self.last_html = ''
+        self.last_state = 'unknown'
+        self.last_response = None  # 最近一次响应 (状态码, 响应头字典)
+        self.request_count = 0
+
+    def close(self):
+        """关闭长连接"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+            self._conn_key = None
+
+    def _get_connection(self, scheme, netloc):
+        """获取（必要时新建）到目标主机的长连接"""
+        key = (scheme, netloc)
+        if self.connection is None or self._conn_key != key:
+            self.close()
+            conn_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            self.connection = conn_class(netloc, timeout=self.timeout)
+            self._conn_key = key
+        return self.connection
+
+    def _build_headers(self):
+        headers = {
+            'User-Agent': self.user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'zh-CN,zh;q=0.9',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        }
+        if self.cookie_header:
+            headers['Cookie'] = self.cookie_header
+        # 条件请求：页面未变化时服务器返回304，不必重新下载和解析
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def _request(self, url):
+        """发送一次GET请求，连接断开时重连重试一次"""
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        for retry in range(2):
+            conn = self._get_connection(parts.scheme, parts.netloc)
+            try:
+                conn.request('GET', path, headers=self._build_headers())
+                response = conn.getresponse()
+                body = response.read()
+                self.request_count += 1
+                return response, body
+            except (http.client.HTTPException, ConnectionError, OSError):
+                self.close()
+                if retry:
+                    raise
+
+    @staticmethod
+    def _decode_body(response, body):
+        encoding = (response.getheader('Content-Encoding') or '').lower()
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'deflate':
+            body = zlib.decompress(body)
+        charset = response.headers.get_content_charset() or 'utf-8'
+        return body.decode(charset, errors='replace')
+
+    def poll_once(self):
+        """请求一次问卷页面，返回状态 'not_open'、'open' 或 'unknown'"""
+        url = self.url
+        for _ in range(3):  # 最多跟随3次重定向
+            response, body = self._request(url)
+            self.last_response = (response.status, dict(response.getheaders()))
+
+            if response.status in (301, 302, 303, 307, 308) and response.getheader('Location'):
+                url = urljoin(url, response.getheader('Location'))
+                self.etag = self.last_modified = None
+                continue
+
+            if response.status == 304:
+                # 页面未变化，沿用上一次的状态
+                return self.last_state
+
+            self.etag = response.getheader('ETag')
+            self.last_modified = response.getheader('Last-Modified')
+            self.last_html = self._decode_body(response, body)
+            self.last_state = classify_survey_html(self.last_html)
+            return self.last_state
+
+        return 'unknown'
+
+    def wait_until_open(self, interval=0.5, max_errors=5, scheduler=None):
+        """轮询直到问卷不再显示"尚未开放"
+
+        传入scheduler（open_scheduler.OpenTimeScheduler）时由它决定轮询间隔，否则固定interval秒；
+        返回True表示状态已变化（或无法判断），应交给浏览器刷新；
+        连续出错max_errors次返回False，调用方应退回浏览器刷新方式
+        """
+        errors = 0
+        while True:
+            try:
+                state = self.poll_once()
+                errors = 0
+            except Exception as e:
+                errors += 1
+                print(f"HTTP轮询出错 ({errors}/{max_errors}): {e}")
+                if errors >= max_errors:
+                    return False
+                time.sleep(interval)
+                continue
+
+            if state != 'not_open':
+                print(f"✓ HTTP轮询检测到问卷状态: {state}（共请求 {self.request_count} 次）")
+                return True
+
+            if scheduler is not None:
+                # 距开放较远时每30秒轮询一次即可，同时保持连接
+                time.sleep(min(scheduler.next_delay(), 30.0))
+            else:
+                time.sleep(interval)
@@ -0,0 +1,212 @@
+"""
+标签提取基准测试
+功能：在合成问卷（survey_generator.py）上分别测量五种标签提取方法的准确率和每个输入框的耗时，
+      既测页面内JS版本（page_scan）和按坐标就近匹配（geometric_labels），也测extract_chinese_near_input中逐个WebDriver探测的版本，
+      作为调整方法顺序的依据
+
+运行: python label_benchmark.py [--fields 100] [--seed 1] [--decoy-rate 0.3] [--skip-webdriver]
+      或 python label_benchmark.py --html synthetic_surveys/survey_100_1.html
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+from selenium.webdriver.common.by import By
+
+from dict_matcher import KeywordMatcher
+from e2e_benchmark import create_headless_chrome, percentile
+from geometric_labels import extract_labels_geometric
+from mock_wjx_server import FIELD_TOPICS
+from page_scan import LABEL_METHODS, probe_label_method
+from survey_generator import load_truth, write_survey
+
+# 判断准确与否时使用的字典：题目关键字 -> 自身
+TOPIC_MATCHER = KeywordMatcher({topic: topic for topic in FIELD_TOPICS})
+
+CHINESE_RE = re.compile(r'[\u4e00-\u9fff]')
+
+
+def _has_chinese(text):
+    return bool(text and CHINESE_RE.search(text))
+
+
+# ==================== WebDriver逐个探测版本 ====================
+# 与各脚本extract_chinese_near_input中的方法1-5一一对应
+
+def webdriver_label(driver, element):
+    for i in range(1, 6):
+        try:
+            text = element.find_element(By.XPATH, f".//preceding::label[{i}]").text.strip()
+            if _has_chinese(text):
+                return text
+        except Exception:
+            pass
+    return ''
+
+
+def webdriver_sibling(driver, element):
+    for i in range(1, 6):
+        try:
+            text = element.find_element(By.XPATH, f".//preceding-sibling::*[{i}]").text.strip()
+            if _has_chinese(text):
+                return text
+        except Exception:
+            pass
+    return ''
+
+
+def webdriver_ancestor(driver, element):
+    for i in range(1, 4):
+        try:
+            text = element.find_element(By.XPATH, f".//ancestor::*[{i}]").text.strip()
+            for line in text.split('\n'):
+                line = line.strip()
+                if line and _has_chinese(line) and len(line) < 50:
+                    return line
+        except Exception:
+            continue
+    return ''
+
+
+def webdriver_placeholder(driver, element):
+    placeholder = element.get_attribute("placeholder")
+    return placeholder if _has_chinese(placeholder) else ''
+
+
+def webdriver_text_node(driver, element):
+    script = """
+    var iterator = document.evaluate('.//preceding::text()[normalize-space()][1]', arguments[0],
+                                     null, XPathResult.ANY_TYPE, null);
+    var node = iterator.iterateNext();
+    return node ? node.textContent.trim() : '';
+    """
+    try:
+        text = driver.execute_script(script, element)
+        return text if _has_chinese(text) else ''
+    except Exception:
+        return ''
+
+
+WEBDRIVER_METHODS = {
+    'label': webdriver_label,
+    'sibling': webdriver_sibling,
+    'ancestor': webdriver_ancestor,
+    'placeholder': webdriver_placeholder,
+    'text_node': webdriver_text_node,
+}
+
+
+# ==================== 统计 ====================
+
+def score(texts, latencies_ms, truth):
+    """texts与truth一一对应；返回命中率、准确率、精确率和耗时统计"""
+    hits = correct = 0
+    for text, expected in zip(texts, truth):
+        if not text:
+            continue
+        hits += 1
+        match = TOPIC_MATCHER.match(text)
+        if match and match[0] == expected['key']:
+            correct += 1
+    total = len(truth)
+    return {
+        'hit_rate': hits / total if total else 0.0,
+        'accuracy': correct / total if total else 0.0,
+        'precision': correct / hits if hits else 0.0,
+        'mean_ms': sum(latencies_ms) / len(latencies_ms) if latencies_ms else 0.0,
+        'p95_ms': percentile(latencies_ms, 95) or 0.0,
+    }
+
+
+def accuracy_by_placement(texts, truth):
+    """按标签位置分组的准确率，看出每种方法擅长哪种写法"""
+    groups = {}
+    for text, expected in zip(texts, truth):
+        group = groups.setdefault(expected['placement'], [0, 0])
+        group[1] += 1
+        match = TOPIC_MATCHER.match(text) if text else None
+        if match and match[0] == expected['key']:
+            group[0] += 1
+    return {placement: correct / total for placement, (correct, total) in groups.items()}
+
+
+def benchmark_page(driver, html_path, skip_webdriver=False):
+    """在一个合成问卷上测量所有方法，返回结果字典"""
+    truth = load_truth(html_path)
+    driver.get('file://' + os.path.abspath(html_path))
+    elements = [driver.find_element(By.ID, item['id']) for item in truth]
+
+    report = {'page': html_path, 'fields': len(truth), 'in_page': {}, 'webdriver': {}}
+    for method in list(LABEL_METHODS) + [None]:
+        name = method or 'cascade'
+        results = probe_label_method(driver, elements, method)
+        texts = [item['text'] for item in results]
+        report['in_page'][name] = score(texts, [item['ms'] for item in results], truth)
+        report['in_page'][name]['by_placement'] = accuracy_by_placement(texts, truth)
+
+    # 按坐标就近匹配：一次导出全部位置，耗时按输入框平均
+    start = time.perf_counter()
+    results = extract_labels_geometric(driver, elements, fallback=False)
+    per_input_ms = (time.perf_counter() - start) * 1000 / max(len(elements), 1)
+    texts = [item['text'] for item in results]
+    report['in_page']['geometric'] = score(texts, [per_input_ms] * len(texts), truth)
+    report['in_page']['geometric']['by_placement'] = accuracy_by_placement(texts, truth)
+
+    if not skip_webdriver:
+        for method, probe in WEBDRIVER_METHODS.items():
+            texts, latencies = [], []
+            for element in elements:
+                start = time.perf_counter()
+                texts.append(probe(driver, element))
+                latencies.append((time.perf_counter() - start) * 1000)
+            report['webdriver'][method] = score(texts, latencies, truth)
+            report['webdriver'][method]['by_placement'] = accuracy_by_placement(texts, truth)
+    return report
+
+
+def print_report(report):
+    print(f"\n{report['page']}（{report['fields']}题）")
+    for section, title in (('in_page', '页面内JS'), ('webdriver', 'WebDriver逐个探测')):
+        if not report[section]:
+            continue
+        print(f"  {title}:")
+        print(f"    {'方法':<12}{'命中率':>8}{'准确率':>8}{'精确率':>8}{'平均耗时':>12}{'p95':>10}")
+        for name, stats in report[section].items():
+            print(f"    {name:<12}{stats['hit_rate']:>9.1%}{stats['accuracy']:>9.1%}{stats['precision']:>9.1%}"
+                  f"{stats['mean_ms']:>11.3f}ms{stats['p95_ms']:>8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='标签提取方法的准确率与耗时基准测试')
+    parser.add_argument('--html', nargs='*', default=None, help='已生成的合成问卷（默认现场生成）')
+    parser.add_argument('--fields', type=int, default=100, help='现场生成时的题目数')
+    parser.add_argument('--seed', type=int, default=1, help='现场生成时的随机种子')
+    parser.add_argument('--decoy-rate', type=float, default=0.3, help='现场生成时的干扰比例')
+    parser.add_argument('--out', default='synthetic_surveys', help='现场生成的输出目录')
+    parser.add_argument('--skip-webdriver', action='store_true', help='不测WebDriver逐个探测版本（题目多时很慢）')
+    parser.add_argument('--chromedriver', default=None, help='chromedriver路径')
+    parser.add_argument('--json', default=None, help='把结果写入该JSON文件')
+    args = parser.parse_args()
+
+    pages = args.html or [write_survey(args.out, args.fields, args.seed, args.decoy_rate)]
+    driver = create_headless_chrome(args.chromedriver)
+    reports = []
+    try:
+        for page in pages:
+            report = benchmark_page(driver, page, args.skip_webdriver)
+            print_report(report)
+            reports.append(report)
+    finally:
+        driver.quit()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+标签提取方法统计
+功能：按问卷域名和模板记录每个输入框的标签由哪种方法（label / sibling / ancestor / placeholder / text_node）找到
+      （找到的文字能匹配字典才计为命中），保存到本地；下次运行时先尝试历史上命中最多的方法，样本足够且某方法占绝对多数时不再尝试很少命中的方法
+      （这些方法只在前面的方法都没找到时补充尝试），每个输入框的提取耗时随运行次数增加而下降
+"""
+
+import json
+import os
+from urllib.parse import urlsplit
+
+from page_scan import LABEL_METHODS
+
+# 统计文件（与脚本放在同一目录）
+STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'label_method_stats.json')
+
+# 至少统计这么多个输入框后才开始跳过方法
+MIN_SAMPLES = 20
+# 命中最多的方法占比达到该值时视为可信
+CONFIDENCE = 0.9
+# 可信后占比低于该值的方法移到补充尝试
+KEEP_SHARE = 0.05
+# 样本超过该数后计数减半，让统计跟上模板的变化
+MAX_SAMPLES = 1000
+
+
+def template_key(url):
+    """域名 + 第一段路径作为模板键，如 v.wjx.cn/vm（问卷星的 /vm、/jq、/vj 等对应不同的页面模板）"""
+    parts = urlsplit(url or '')
+    segments = [segment for segment in parts.path.split('/') if segment]
+    template = segments[0] if len(segments) > 1 else ''
+    return f"{parts.netloc.lower()}/{template}"
+
+
+class LabelStats:
+    def __init__(self, path=None):
+        """加载统计文件（默认STATS_FILE），文件不存在或损坏时从空统计开始"""
+        self.path = path or STATS_FILE
+        self.entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def order(self, url):
+        """返回 (方法顺序, 是否已跳过部分方法)；按命中次数从多到少，次数相同时保持默认顺序
+
+        跳过的方法不在返回的顺序中，调用方应在前面的方法都没找到时再按默认顺序补充尝试
+        """
+        entry = self.entries.get(template_key(url))
+        if not entry:
+            return list(LABEL_METHODS), False
+
+        wins = entry.get('wins', {})
+        order = sorted(LABEL_METHODS, key=lambda method: (-wins.get(method, 0), LABEL_METHODS.index(method)))
+        resolved = sum(wins.get(method, 0) for method in LABEL_METHODS)
+        if resolved < MIN_SAMPLES or wins.get(order[0], 0) < resolved * CONFIDENCE:
+            return order, False
+
+        kept = [method for method in order if wins.get(method, 0) >= resolved * KEEP_SHARE]
+        return kept, len(kept) < len(order)
+
+    def record(self, url, methods):
+        """记录一次提取结果：methods与输入框一一对应，为命中的方法名，未找到或文字未匹配字典时为空字符串"""
+        if not methods:
+            return
+        entry = self.entries.setdefault(template_key(url), {'wins': {}, 'misses': 0})
+        wins = entry['wins']
+        for method in methods:
+            if method in LABEL_METHODS:
+                wins[method] = wins.get(method, 0) + 1
+            else:
+                entry['misses'] = entry.get('misses', 0) + 1
+
+        if sum(wins.values()) > MAX_SAMPLES:
+            entry['wins'] = {method: count // 2 for method, count in wins.items()}
+            entry['misses'] = entry.get('misses', 0) // 2
+
+    def save(self):
+        """先写临时文件再替换，避免中途退出留下损坏的统计"""
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"保存标签统计失败: {e}")
@@ -0,0 +1,231 @@
+"""
+本地模拟问卷星服务器
+功能：在本机提供与问卷星结构相似的问卷页面，用于基准测试和调试，不必访问真实的wjx.cn
+      - 提交按钮为 div#ctlNext.submitbtn（不是button元素）
+      - 题目标签有 label / 兄弟元素 / placeholder 三种写法，可混合
+      - 可配置"问卷尚未开始"阶段和"开始作答"入口页
+      - 提交接口记录每次提交的内容和时间，供基准测试计算耗时
+
+单独运行: python mock_wjx_server.py [题目数] [开放延迟秒数]
+"""
+
+import html
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# 题目文字循环使用这些关键字（与各脚本的默认字典一致）
+FIELD_TOPICS = ["学校", "姓名", "名字", "学院", "班级", "学号", "电话", "联系方式", "寝室"]
+
+LAYOUTS = ('label', 'sibling', 'placeholder')
+
+# 问卷星页面显示北京时间
+SURVEY_TIMEZONE = timezone(timedelta(hours=8))
+
+# ==================== 页面模板 ====================
+
+_PAGE_HEAD = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+.field {{ margin: 12px 0; }}
+.errorMessage {{ color: red; display: none; }}
+.submitbtn {{ display: inline-block; padding: 8px 40px; background: #1ea0fa; color: #fff; cursor: pointer; }}
+</style></head><body>
+"""
+
+_NOT_OPEN_PAGE = _PAGE_HEAD + """
+<div id="divTip">问卷尚未开始，本问卷将于 {open_text} 开始，请届时再来填写。</div>
+</body></html>
+"""
+
+_START_PAGE = _PAGE_HEAD + """
+<div id="divDesc">{title}<br>欢迎参加本次问卷调查。</div>
+<div class="button" id="divStart" onclick="document.cookie='started_{survey_id}=1; path=/'; location.reload();">开始作答</div>
+</body></html>
+"""
+
+_FORM_SCRIPT = """
+<script>
+document.getElementById('ctlNext').addEventListener('click', function () {
+    var inputs = document.querySelectorAll('#divQuestion input, #divQuestion textarea');
+    var answers = [], missing = false;
+    for (var i = 0; i < inputs.length; i++) {
+        var tip = document.getElementById('err' + (i + 1));
+        if (!inputs[i].value.trim()) { tip.style.display = 'block'; missing = true; }
+        else { tip.style.display = 'none'; }
+        answers.push((i + 1) + '$' + inputs[i].value);
+    }
+    if (missing) return;
+    var xhr = new XMLHttpRequest();
+    xhr.open('POST', '/joinnew/processjq.ashx?curid=' + encodeURIComponent('{survey_id}'));
+    xhr.setRequestHeader('Content-Type', 'application/x-www-form-urlencoded');
+    xhr.onload = function () {
+        if (xhr.responseText.indexOf('10') === 0) location.href = xhr.responseText.split('\\u3012')[1];
+    };
+    xhr.send('submitdata=' + encodeURIComponent(answers.join('}')));
+});
+</script>
+"""
+
+_COMPLETE_PAGE = _PAGE_HEAD + """
+<div id="divComplete">答卷已经提交，感谢您的参与！</div>
+</body></html>
+"""
+
+
+def render_field(index, topic, layout):
+    """生成一道填空题，layout决定题目文字与输入框的关系"""
+    name = f"q{index}"
+    title = f"{index}. {topic}"
+    if layout == 'label':
+        body = f'<label for="{name}">{title}</label><input type="text" id="{name}" name="{name}">'
+    elif layout == 'sibling':
+        body = f'<div class="field-label">{title}</div><input type="text" id="{name}" name="{name}">'
+    else:
+        body = f'<input type="text" id="{name}" name="{name}" placeholder="请输入{topic}">'
+    return (f'<div class="field ui-field-contain" topic="{index}">{body}'
+            f'<div class="errorMessage" id="err{index}">请填写此项</div></div>')
+
+
+def render_form(survey):
+    fields = []
+    for i in range(1, survey['fields'] + 1):
+        layout = survey['layout'] if survey['layout'] in LAYOUTS else LAYOUTS[(i - 1) % len(LAYOUTS)]
+        fields.append(render_field(i, FIELD_TOPICS[(i - 1) % len(FIELD_TOPICS)], layout))
+    return (_PAGE_HEAD.format(title=html.escape(survey['title']))
+            + '<div id="divQuestion">' + '\n'.join(fields) + '</div>\n'
+            + '<div id="ctlNext" class="submitbtn mainBgColor">提交</div>\n'
+            + _FORM_SCRIPT.replace('{survey_id}', survey['id'])
+            + '</body></html>')
+
+
+# ==================== 服务器 ====================
+
+class MockWjxServer:
+    def __init__(self, host='127.0.0.1', port=0):
+        """port为0时自动选择空闲端口"""
+        self.surveys = {}
+        self.submissions = []  # [{'survey_id', 'time', 'answers'}]
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_survey(self, survey_id, fields=5, layout='mixed', open_delay=0.0, require_start=False):
+        """添加问卷并返回其URL
+
+        layout为 label / sibling / placeholder 或 mixed（三种轮换）；
+        open_delay秒之前显示"问卷尚未开始"；require_start为True时先显示"开始作答"入口页
+        """
+        with self.lock:
+            self.surveys[survey_id] = {
+                'id': survey_id,
+                'title': f"模拟问卷 {survey_id}（{fields}题）",
+                'fields': fields,
+                'layout': layout,
+                'open_at': time.time() + open_delay,
+                'require_start': require_start,
+            }
+        return f"{self.base_url}/vm/{survey_id}.aspx"
+
+    def submissions_for(self, survey_id):
+        with self.lock:
+            return [item for item in self.submissions if item['survey_id'] == survey_id]
+
+    def start(self):
+        """在后台线程中运行"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # ---------- 请求处理 ----------
+
+    def render_survey(self, survey_id, cookies):
+        survey = self.surveys.get(survey_id)
+        if survey is None:
+            return 404, '<html><body>问卷不存在</body></html>'
+        if time.time() < survey['open_at']:
+            open_text = datetime.fromtimestamp(survey['open_at'], SURVEY_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+            return 200, _NOT_OPEN_PAGE.format(title=html.escape(survey['title']), open_text=open_text)
+        if survey['require_start'] and cookies.get(f"started_{survey_id}") != '1':
+            return 200, _START_PAGE.format(title=html.escape(survey['title']), survey_id=survey_id)
+        return 200, render_form(survey)
+
+    def record_submission(self, survey_id, body):
+        data = parse_qs(body).get('submitdata', [''])[0]
+        answers = [item.split('$', 1)[-1] for item in data.split('}')] if data else []
+        with self.lock:
+            self.submissions.append({'survey_id': survey_id, 'time': time.time(), 'answers': answers})
+        return f"10〒/wjx/join/complete.aspx?activityid={survey_id}"
+
+
+def _make_handler(server):
+    class MockWjxHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type='text/html; charset=utf-8'):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _cookies(self):
+            cookies = {}
+            for part in (self.headers.get('Cookie') or '').split(';'):
+                if '=' in part:
+                    key, value = part.strip().split('=', 1)
+                    cookies[key] = value
+            return cookies
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path.startswith('/vm/') and parts.path.endswith('.aspx'):
+                survey_id = parts.path[len('/vm/'):-len('.aspx')]
+                self._send(*server.render_survey(survey_id, self._cookies()))
+            elif parts.path == '/wjx/join/complete.aspx':
+                self._send(200, _COMPLETE_PAGE.format(title='提交成功'))
+            elif parts.path == '/submissions':
+                self._send(200, json.dumps(server.submissions, ensure_ascii=False), 'application/json')
+            else:
+                self._send(404, '<html><body>not found</body></html>')
+
+        def do_POST(self):
+            parts = urlsplit(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length).decode('utf-8', errors='replace')
+            if parts.path == '/joinnew/processjq.ashx':
+                survey_id = parse_qs(parts.query).get('curid', [''])[0]
+                self._send(200, server.record_submission(survey_id, body), 'text/plain; charset=utf-8')
+            else:
+                self._send(404, 'not found', 'text/plain')
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockWjxHandler
+
+
+if __name__ == "__main__":
+    field_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    mock = MockWjxServer(port=8080)
+    url = mock.add_survey('demo', fields=field_count, open_delay=delay, require_start=True)
+    print(f"模拟问卷: {url}")
+    print(f"提交记录: {mock.base_url}/submissions")
+    try:
+        mock.httpd.serve_forever()
+    except KeyboardInterrupt:
+        mock.stop()
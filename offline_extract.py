@@ -0,0 +1,426 @@
+"""
+离线提取引擎
+功能：不启动浏览器，直接对保存下来的页面源码（driver.page_source）运行与page_scan相同的
+      输入框查找、标签提取（label -> 兄弟元素 -> 父元素 -> placeholder -> 前面的文本节点）和字典匹配，
+      输出填写方案；用于快速调整填写配置（profile.toml）和提取规则，或批量检查大量存档的问卷页面
+
+解析器优先使用lxml，其次html5lib，都未安装时使用标准库html.parser（较慢，容错较差）
+
+运行: python offline_extract.py 页面1.html [页面2.html 或 目录 ...] [--dict 字典.json | --profile 配置.toml] [--json 输出.json]
+"""
+
+import argparse
+import bisect
+import glob
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ElementTree
+from html.parser import HTMLParser
+
+from dict_matcher import KeywordMatcher
+from page_scan import LABEL_METHODS
+from profile_store import DEFAULT_VALUE, PROFILE_FILE, ProfileStore
+
+CHINESE_RE = re.compile(r'[\u4e00-\u9fff]')
+
+# 与page_scan.INPUT_SELECTOR一致的输入框类型（空字符串表示没有type属性）
+INPUT_TYPES = {'text', 'password', 'email', 'number', 'tel', 'search', 'url', ''}
+
+# innerText中会换行的块级元素
+BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset', 'figure',
+              'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav',
+              'ol', 'p', 'pre', 'section', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul'}
+SKIP_TEXT_TAGS = {'script', 'style', 'noscript', 'template', 'head', 'title'}
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source',
+             'track', 'wbr'}
+
+HIDDEN_STYLE_RE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden', re.I)
+
+# 提交按钮文字评分（与page_scan.LOCATE_SUBMIT_JS相同）
+SUBMIT_TEXT_RULES = [(re.compile(r'^\s*提交\s*$'), 100), (re.compile('提交'), 60), (re.compile('下一步'), 50),
+                     (re.compile('确认'), 40), (re.compile('submit', re.I), 40)]
+
+
+def has_chinese(text):
+    return bool(text and CHINESE_RE.search(text))
+
+
+# ==================== HTML解析 ====================
+
+class _StdlibTreeBuilder(HTMLParser):
+    """标准库解析器：构建ElementTree，自动处理空元素和未闭合的标签"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = ElementTree.Element('html')
+        self.stack = [self.root]
+
+    def _append_text(self, text):
+        parent = self.stack[-1]
+        if len(parent):
+            parent[-1].tail = (parent[-1].tail or '') + text
+        else:
+            parent.text = (parent.text or '') + text
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'html':
+            self.root.attrib.update({k: v or '' for k, v in attrs})
+            return
+        element = ElementTree.SubElement(self.stack[-1], tag, {k: v or '' for k, v in attrs})
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        ElementTree.SubElement(self.stack[-1], tag, {k: v or '' for k, v in attrs})
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self._append_text(data)
+
+
+def parse_html(source):
+    """解析HTML，返回 (根元素, 解析器名称)；元素均支持ElementTree接口"""
+    try:
+        import lxml.html
+        return lxml.html.document_fromstring(source), 'lxml'
+    except ImportError:
+        pass
+    try:
+        import html5lib
+        return html5lib.parse(source, treebuilder='etree', namespaceHTMLElements=False), 'html5lib'
+    except ImportError:
+        pass
+    builder = _StdlibTreeBuilder()
+    builder.feed(source)
+    builder.close()
+    return builder.root, 'html.parser'
+
+
+# ==================== 文档模型 ====================
+
+class OfflineDocument:
+    """对解析后的树建立父节点、文档顺序和文本节点序列，供各提取方法使用"""
+
+    def __init__(self, root):
+        self.root = root
+        self.parent = {}
+        self.position = {}   # 元素 -> 开始标签在事件序列中的位置
+        self.texts = []      # [(位置, 文本)]，文档顺序
+        self._inner_text = {}
+        self._hidden = {}
+        self._walk(root, None, [0])
+        self.text_positions = [pos for pos, _ in self.texts]
+        self.labels = [el for el in self.elements() if el.tag == 'label']
+        self.label_positions = [self.position[el] for el in self.labels]
+
+    def _walk(self, element, parent, counter):
+        self.parent[element] = parent
+        self.position[element] = counter[0]
+        counter[0] += 1
+        if element.text and element.tag not in SKIP_TEXT_TAGS:
+            self.texts.append((counter[0], element.text))
+            counter[0] += 1
+        for child in element:
+            if isinstance(child.tag, str):
+                self._walk(child, element, counter)
+            if child.tail and element.tag not in SKIP_TEXT_TAGS:
+                self.texts.append((counter[0], child.tail))
+                counter[0] += 1
+
+    def elements(self):
+        return sorted((el for el in self.position), key=self.position.get)
+
+    def is_hidden(self, element):
+        """根据hidden属性和内联样式判断是否隐藏（无法计算外部样式表）"""
+        if element is None:
+            return False
+        if element not in self._hidden:
+            hidden = (element.get('hidden') is not None
+                      or bool(HIDDEN_STYLE_RE.search(element.get('style') or ''))
+                      or (element.tag == 'input' and (element.get('type') or '').lower() == 'hidden'))
+            self._hidden[element] = hidden or self.is_hidden(self.parent.get(element))
+        return self._hidden[element]
+
+    def inner_text(self, element):
+        """近似innerText：跳过隐藏元素和脚本，块级元素前后换行"""
+        if element not in self._inner_text:
+            parts = []
+            self._collect_text(element, parts, top=True)
+            lines = [re.sub(r'[ \t\r\f\v]+', ' ', line).strip() for line in ''.join(parts).split('\n')]
+            self._inner_text[element] = '\n'.join(line for line in lines if line)
+        return self._inner_text[element]
+
+    def _collect_text(self, element, parts, top=False):
+        if element.tag in SKIP_TEXT_TAGS:
+            return
+        # 与浏览器一致：元素本身隐藏时innerText退化为textContent
+        if not top and self.is_hidden(element):
+            return
+        if element.tag == 'br':
+            parts.append('\n')
+            return
+        block = element.tag in BLOCK_TAGS
+        if block:
+            parts.append('\n')
+        if element.text:
+            parts.append(element.text.replace('\n', ' '))
+        for child in element:
+            if isinstance(child.tag, str):
+                self._collect_text(child, parts)
+            if child.tail:
+                parts.append(child.tail.replace('\n', ' '))
+        if block:
+            parts.append('\n')
+
+    def is_ancestor(self, ancestor, element):
+        node = self.parent.get(element)
+        while node is not None:
+            if node is ancestor:
+                return True
+            node = self.parent.get(node)
+        return False
+
+    def find_inputs(self):
+        """与page_scan.discover_inputs相同的输入框（可见、可用），文档顺序"""
+        inputs = []
+        for element in self.elements():
+            if element.tag == 'textarea' or (element.tag == 'input' and
+                                             (element.get('type') or '').lower() in INPUT_TYPES):
+                if element.get('disabled') is None and not self.is_hidden(element):
+                    inputs.append(element)
+        return inputs
+
+
+# ==================== 标签提取方法 ====================
+# 与page_scan._JS_RESOLVE_LABEL中的LABEL_METHODS一一对应
+
+def label_by_label(doc, element):
+    index = bisect.bisect_left(doc.label_positions, doc.position[element])
+    checked = 0
+    for i in range(index - 1, -1, -1):
+        label = doc.labels[i]
+        if doc.is_ancestor(label, element):
+            continue
+        text = doc.inner_text(label)
+        if has_chinese(text):
+            return text
+        checked += 1
+        if checked >= 5:
+            break
+    return ''
+
+
+def label_by_sibling(doc, element):
+    parent = doc.parent.get(element)
+    if parent is None:
+        return ''
+    siblings = [child for child in parent if isinstance(child.tag, str)]
+    index = siblings.index(element)
+    for sibling in reversed(siblings[max(0, index - 5):index]):
+        text = doc.inner_text(sibling)
+        if has_chinese(text):
+            return text
+    return ''
+
+
+def label_by_ancestor(doc, element):
+    ancestor = doc.parent.get(element)
+    for _ in range(3):
+        if ancestor is None:
+            break
+        for line in doc.inner_text(ancestor).split('\n'):
+            line = line.strip()
+            if line and has_chinese(line) and len(line) < 50:
+                return line
+        ancestor = doc.parent.get(ancestor)
+    return ''
+
+
+def label_by_placeholder(doc, element):
+    placeholder = element.get('placeholder')
+    return placeholder if has_chinese(placeholder) else ''
+
+
+def label_by_text_node(doc, element):
+    index = bisect.bisect_left(doc.text_positions, doc.position[element])
+    for i in range(index - 1, -1, -1):
+        text = doc.texts[i][1].strip()
+        if text:
+            return text if has_chinese(text) else ''
+    return ''
+
+
+OFFLINE_LABEL_METHODS = {
+    'label': label_by_label,
+    'sibling': label_by_sibling,
+    'ancestor': label_by_ancestor,
+    'placeholder': label_by_placeholder,
+    'text_node': label_by_text_node,
+}
+
+
+def resolve_label(doc, element, order=LABEL_METHODS):
+    """按顺序尝试各方法，返回 (文字, 方法名)"""
+    for method in order:
+        text = OFFLINE_LABEL_METHODS[method](doc, element)
+        if text:
+            return text, method
+    return '', ''
+
+
+def locate_submit(doc):
+    """按page_scan.LOCATE_SUBMIT_JS的规则给候选按钮评分（静态页面无法计算位置分）"""
+    best = None
+    for element in doc.elements():
+        if doc.is_hidden(element) or element.get('disabled') is not None:
+            continue
+        tag = element.tag
+        element_id = element.get('id') or ''
+        cls = element.get('class') or ''
+        input_type = (element.get('type') or '').lower()
+        text = doc.inner_text(element) or element.get('value') or ''
+        candidate = (element_id == 'ctlNext' or 'submitbtn' in cls.split() or tag == 'button'
+                     or (tag == 'input' and input_type in ('submit', 'button'))
+                     or element.get('role') == 'button'
+                     or re.search(r'submit|next|ctl_Next', element_id) is not None
+                     or (tag in ('div', 'a', 'span') and re.search(r'submit|btn', cls) is not None)
+                     or (len(element) == 0 and re.search(r'提交|下一步|确认|submit', text, re.I) is not None))
+        if not candidate:
+            continue
+
+        score = 0
+        for pattern, points in SUBMIT_TEXT_RULES:
+            if pattern.search(text):
+                score += points
+                break
+        if element_id == 'ctlNext':
+            score += 80
+        elif re.search(r'submit|next', element_id, re.I):
+            score += 30
+        if 'submitbtn' in cls.split():
+            score += 60
+        elif re.search('submit', cls, re.I):
+            score += 20
+        elif re.search('btn', cls, re.I):
+            score += 5
+        if tag in ('button', 'input') and input_type == 'submit':
+            score += 10
+        if len(text) > 20:
+            score -= 40
+
+        if best is None or score > best['score']:
+            locator = f"#{element_id}" if element_id else tag + ''.join(f".{c}" for c in cls.split())
+            best = {'locator': locator, 'tag': tag, 'text': text[:50], 'score': score}
+    return best if best and best['score'] >= 40 else None
+
+
+# ==================== 填写方案 ====================
+
+class OfflineExtractor:
+    def __init__(self, mapping, default_value="默认填写", order=LABEL_METHODS):
+        """mapping为 关键字 -> 填写内容 的字典，匹配器只编译一次，可反复用于多个页面"""
+        self.mapping = mapping
+        self.matcher = KeywordMatcher(mapping)
+        self.default_value = default_value
+        self.order = tuple(order)
+
+    def plan(self, source):
+        """对页面源码生成填写方案"""
+        start = time.perf_counter()
+        root, parser = parse_html(source)
+        parsed = time.perf_counter()
+        doc = OfflineDocument(root)
+
+        fields = []
+        for index, element in enumerate(doc.find_inputs(), 1):
+            text, method = resolve_label(doc, element, self.order)
+            match = self.matcher.match(text) if text else None
+            fields.append({
+                'index': index,
+                'tag': element.tag,
+                'id': element.get('id') or '',
+                'name': element.get('name') or '',
+                'label': text,
+                'method': method,
+                'key': match[0] if match else None,
+                'value': match[1] if match else self.default_value,
+            })
+        end = time.perf_counter()
+
+        return {
+            'parser': parser,
+            'fields': fields,
+            'matched': sum(1 for field in fields if field['key'] is not None),
+            'submit': locate_submit(doc),
+            'parse_ms': (parsed - start) * 1000,
+            'extract_ms': (end - parsed) * 1000,
+        }
+
+
+def plan_from_driver(driver, mapping):
+    """对浏览器当前页面的源码生成填写方案（只读取一次page_source）"""
+    return OfflineExtractor(mapping).plan(driver.page_source)
+
+
+def _expand_paths(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.htm*'))))
+        else:
+            files.append(path)
+    return files
+
+
+def _load_mapping(args):
+    """返回 (答案字典, 默认填写值)"""
+    if args.dict:
+        with open(args.dict, 'r', encoding='utf-8') as f:
+            return json.load(f), DEFAULT_VALUE
+    profile = ProfileStore(args.profile).profile
+    return profile.answers, profile.default_value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线对保存的问卷页面生成填写方案')
+    parser.add_argument('paths', nargs='+', help='HTML文件或包含HTML文件的目录')
+    parser.add_argument('--dict', default=None, help='JSON格式的字典文件（关键字 -> 填写内容，优先于--profile）')
+    parser.add_argument('--profile', default=PROFILE_FILE, help='填写配置文件（默认使用各脚本共用的profile.toml）')
+    parser.add_argument('--json', default=None, help='把所有方案写入该JSON文件')
+    parser.add_argument('--quiet', action='store_true', help='只显示每个页面的汇总')
+    args = parser.parse_args()
+
+    mapping, default_value = _load_mapping(args)
+    extractor = OfflineExtractor(mapping, default_value)
+    files = _expand_paths(args.paths)
+    plans = {}
+    total_start = time.perf_counter()
+    for path in files:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            plan = extractor.plan(f.read())
+        plans[path] = plan
+        submit = plan['submit']['locator'] if plan['submit'] else '未找到'
+        print(f"{path}: {plan['matched']}/{len(plan['fields'])} 个输入框匹配，提交按钮 {submit}，"
+              f"解析 {plan['parse_ms']:.2f} 毫秒 + 提取 {plan['extract_ms']:.2f} 毫秒（{plan['parser']}）")
+        if not args.quiet:
+            for field in plan['fields']:
+                key = field['key'] if field['key'] is not None else '未匹配'
+                print(f"  #{field['index']} '{field['label']}' [{field['method'] or '-'}] -> {key}: '{field['value']}'")
+    print(f"共 {len(files)} 个页面，用时 {(time.perf_counter() - total_start):.3f} 秒")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(plans, f, ensure_ascii=False, indent=2)
+        print(f"方案已写入: {args.json}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+开放时间调度工具
+功能：从"问卷尚未开始"页面解析开放时间，用HTTP Date头估计服务器时钟偏差（NTP方式，多次采样），
+      开放前长时间休眠，临近开放再密集轮询，既不频繁打扰服务器，又能在开放后第一时间进入
+"""
+
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from http_poller import SurveyHttpPoller, cookies_from_driver
+
+# 问卷星页面显示的是北京时间
+SURVEY_TIMEZONE = timezone(timedelta(hours=8))
+
+# 匹配 2025-12-04 08:00、2025/12/4 8:00:00、2025年12月4日 08:00 等格式
+OPEN_TIME_PATTERN = re.compile(
+    r'(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*日?\s*'
+    r'(\d{1,2})\s*[:：时点]\s*(\d{1,2})(?:\s*[:：分]\s*(\d{1,2}))?'
+)
+
+# 出现在开放时间前面的提示文字
+OPEN_TIME_HINTS = ["开始", "开放", "开启", "发布"]
+
+
+def parse_open_time(html):
+    """从页面中解析问卷开放时间，返回时间戳（秒），找不到返回None"""
+    if not html:
+        return None
+
+    candidates = []
+    for match in OPEN_TIME_PATTERN.finditer(html):
+        year, month, day, hour, minute, second = match.groups()
+        try:
+            moment = datetime(int(year), int(month), int(day), int(hour), int(minute),
+                              int(second or 0), tzinfo=SURVEY_TIMEZONE)
+        except ValueError:
+            continue
+        # 前面紧邻"开始"等提示文字的时间优先
+        context = html[max(0, match.start() - 20):match.start()]
+        hinted = any(hint in context for hint in OPEN_TIME_HINTS)
+        candidates.append((not hinted, match.start(), moment.timestamp()))
+
+    if not candidates:
+        return None
+    return min(candidates)[2]
+
+
+def _get_header(headers, name):
+    for key, value in headers.items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+def estimate_clock_offset(poller, samples=5):
+    """估计服务器时钟与本地时钟的偏差（服务器时间 - 本地时间，秒）
+
+    Date头只精确到秒：每次采样得到偏差所在区间 [Date - t1, Date + 1 - t0]，
+    各次采样错开不同的亚秒相位，取区间交集即可把误差缩小到远小于1秒。
+    返回 (偏差, 误差范围)，无法估计时返回 (0.0, None)
+    """
+    low, high = float('-inf'), float('inf')
+    midpoints = []
+
+    for i in range(samples):
+        if i:
+            time.sleep(1.0 / samples)
+        try:
+            t0 = time.time()
+            poller.poll_once()
+            t1 = time.time()
+        except Exception as e:
+            print(f"时钟采样失败: {e}")
+            continue
+
+        date_value = _get_header(poller.last_response[1], 'Date') if poller.last_response else None
+        if not date_value:
+            continue
+        try:
+            server_time = parsedate_to_datetime(date_value).timestamp()
+        except (TypeError, ValueError):
+            continue
+
+        low = max(low, server_time - t1)
+        high = min(high, server_time + 1 - t0)
+        midpoints.append(server_time + 0.5 - (t0 + t1) / 2)
+
+    if not midpoints:
+        return 0.0, None
+    if low <= high:
+        return (low + high) / 2, (high - low) / 2
+
+    # 区间不相交（网络抖动或时钟跳变），退回中位数
+    midpoints.sort()
+    return midpoints[len(midpoints) // 2], None
+
+
+class OpenTimeScheduler:
+    def __init__(self, open_time=None, clock_offset=0.0, lead_time=1.5,
+                 tight_interval=0.1, idle_interval=0.5, tight_window=60.0):
+        """open_time为服务器时钟下的开放时间戳；未知时按idle_interval固定间隔轮询
+
+        开放时间过后tight_window秒内密集轮询，超过后恢复idle_interval，避免时间解析有误时持续高频请求
+        """
+        self.open_time = open_time
+        self.clock_offset = clock_offset
+        self.lead_time = lead_time
+        self.tight_interval = tight_interval
+        self.idle_interval = idle_interval
+        self.tight_window = tight_window
+
+    def server_now(self):
+        """按估计的偏差换算出的服务器当前时间"""
+        return time.time() + self.clock_offset
+
+    def seconds_until_open(self):
+        if self.open_time is None:
+            return None
+        return self.open_time - self.server_now()
+
+    def in_tight_window(self):
+        """是否处于开放前lead_time秒到开放后tight_window秒之间的密集轮询区间"""
+        remaining = self.seconds_until_open()
+        return remaining is not None and -self.tight_window <= remaining <= self.lead_time
+
+    def next_delay(self):
+        """距离下一次轮询应等待的秒数：开放前休眠到提前量之内，之后密集轮询"""
+        remaining = self.seconds_until_open()
+        if remaining is None or remaining < -self.tight_window:
+            return self.idle_interval
+        if remaining > self.lead_time:
+            return remaining - self.lead_time
+        return self.tight_interval
+
+    def sleep_until_window(self, max_chunk=30.0):
+        """休眠到开放前lead_time秒；分段休眠以便随时中断并显示倒计时"""
+        while True:
+            remaining = self.seconds_until_open()
+            if remaining is None or remaining <= self.lead_time:
+                return
+            print(f"距离问卷开放还有 {remaining:.1f} 秒，等待中...")
+            time.sleep(min(max_chunk, remaining - self.lead_time))
+
+
+def build_scheduler(html, poller=None, lead_time=1.5, tight_interval=0.1, idle_interval=0.5):
+    """根据页面内容创建调度器；能解析到开放时间时用poller估计服务器时钟偏差"""
+    open_time = parse_open_time(html)
+    clock_offset = 0.0
+
+    if open_time is not None:
+        opening = datetime.fromtimestamp(open_time, SURVEY_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"✓ 解析到问卷开放时间: {opening}")
+        if poller is not None:
+            clock_offset, error = estimate_clock_offset(poller)
+            if error is not None:
+                print(f"✓ 服务器时钟偏差: {clock_offset:+.3f} 秒 (±{error:.3f})")
+            else:
+                print(f"服务器时钟偏差估计不确定，使用 {clock_offset:+.3f} 秒")
+
+    return OpenTimeScheduler(open_time, clock_offset, lead_time, tight_interval, idle_interval)
+
+
+def scheduler_from_driver(driver, poller=None, lead_time=1.5, tight_interval=0.1, idle_interval=0.5):
+    """根据浏览器当前页面创建调度器；未提供poller时临时创建一个用于时钟采样"""
+    try:
+        html = driver.page_source
+    except Exception:
+        html = ''
+
+    if parse_open_time(html) is None:
+        return OpenTimeScheduler(None, 0.0, lead_time, tight_interval, idle_interval)
+
+    own_poller = poller is None
+    if own_poller:
+        try:
+            poller = SurveyHttpPoller(driver.current_url,
+                                      user_agent=driver.execute_script("return navigator.userAgent;"),
+                                      cookie_header=cookies_from_driver(driver))
+        except Exception:
+            poller = None
+
+    try:
+        return build_scheduler(html, poller, lead_time, tight_interval, idle_interval)
+    finally:
+        if own_poller and poller is not None:
+            poller.close()
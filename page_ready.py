@@ -0,0 +1,130 @@
+"""
+页面就绪检测工具
+功能：在页面内安装MutationObserver，输入框或开始按钮一出现立即返回，代替固定等待和盲目刷新
+"""
+
+import time
+from contextlib import contextmanager
+
+from page_scan import INPUT_SELECTOR
+from tracing import span
+
+# WebDriver会话默认的脚本超时（秒），读取不到当前值时恢复为该值
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+# 等待页面就绪时每次页面内等待的最长秒数，留在默认脚本超时之内，等待前后无需修改脚本超时
+READY_SLICE_SECONDS = DEFAULT_SCRIPT_TIMEOUT - 5
+
+# 初始按钮选择器（与find_initial_button中的选择器一致）
+START_BUTTON_SELECTOR = ', '.join([
+    "button",
+    "input[type='button']",
+    "input[type='submit']",
+    "div[role='button']",
+    "a[role='button']",
+    ".btn",
+    ".button",
+    "input[value*='开始']",
+    "input[value*='进入']",
+    "input[value*='Start']",
+    "input[value*='Enter']",
+])
+
+# ==================== 页面内脚本 ====================
+
+# arguments: 输入框选择器, 按钮选择器(为空则不等待按钮), 超时毫秒, 回调
+WAIT_FOR_READY_JS = r"""
+var inputSelector = arguments[0], buttonSelector = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var finished = false, observer = null, timer = null;
+
+function isVisible(el) {
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden') return false;
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+function hasVisible(selector, needText) {
+    if (!selector) return false;
+    var nodes = document.querySelectorAll(selector);
+    for (var i = 0; i < nodes.length; i++) {
+        var el = nodes[i];
+        if (el.disabled || !isVisible(el)) continue;
+        if (!needText) return true;
+        var text = ((el.innerText || '').trim() || el.value || el.getAttribute('placeholder') || '');
+        if (text && text.length < 50) return true;
+    }
+    return false;
+}
+function check() {
+    if (finished) return;
+    var state = null;
+    if (hasVisible(inputSelector, false)) state = 'inputs';
+    else if (hasVisible(buttonSelector, true)) state = 'button';
+    if (state) finish(state);
+}
+function finish(state) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    if (timer) clearTimeout(timer);
+    done(state);
+}
+
+check();
+if (!finished) {
+    observer = new MutationObserver(check);
+    observer.observe(document.documentElement || document, {
+        childList: true, subtree: true, attributes: true,
+        attributeFilter: ['style', 'class', 'hidden', 'disabled']
+    });
+    timer = setTimeout(function () { finish('timeout'); }, timeoutMs);
+}
+"""
+
+
+# ==================== 工具函数 ====================
+
+def get_script_timeout(driver):
+    """读取当前会话的脚本超时（秒），读取失败时返回默认值"""
+    try:
+        return driver.timeouts.script
+    except Exception:
+        return getattr(driver, '_script_timeout', DEFAULT_SCRIPT_TIMEOUT)
+
+
+@contextmanager
+def script_timeout(driver, seconds):
+    """临时修改脚本超时，退出时恢复原值，避免影响之后的execute_async_script（如预装脚本结果的等待）"""
+    previous = get_script_timeout(driver)
+    driver.set_script_timeout(seconds)
+    try:
+        yield
+    finally:
+        try:
+            driver.set_script_timeout(previous)
+        except Exception:
+            pass
+
+
+def wait_for_survey_ready(driver, timeout=5, wait_inputs=True, wait_button=True):
+    """等待输入框或初始按钮出现
+
+    返回 'inputs'（出现输入框）、'button'（出现初始按钮）、'timeout'（超时）或 'error'（脚本执行失败，如页面跳转）；
+    每次刷新后都会调用，页面内计时器在READY_SLICE_SECONDS内结束，超过的部分分段等待，不再往返读取和修改脚本超时
+    """
+    input_selector = INPUT_SELECTOR if wait_inputs else ''
+    button_selector = START_BUTTON_SELECTOR if wait_button else ''
+    deadline = time.time() + timeout
+
+    with span('ready_wait'):
+        try:
+            while True:
+                remaining = max(0.0, deadline - time.time())
+                state = driver.execute_async_script(WAIT_FOR_READY_JS, input_selector, button_selector,
+                                                    int(min(remaining, READY_SLICE_SECONDS) * 1000)) or 'timeout'
+                if state != 'timeout' or remaining <= READY_SLICE_SECONDS:
+                    return state
+        except Exception as e:
+            print(f"等待页面就绪时出错: {e}")
+            return 'error'
@@ -0,0 +1,336 @@
+"""
+页面批量扫描工具
+功能：通过一次execute_script在页面内完成输入框查找与中文标签提取，减少WebDriver往返次数
+"""
+
+# ==================== 页面内脚本 ====================
+
+# 公共JS：中文检测、文本读取、可见性判断
+_JS_HELPERS = r"""
+var CHINESE_RE = /[\u4e00-\u9fff]/;
+function hasChinese(text) { return !!text && CHINESE_RE.test(text); }
+function textOf(node) { return ((node && (node.innerText || node.textContent)) || '').trim(); }
+function isVisible(el) {
+    if (!el || !el.isConnected) return false;
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden' || style.visibility === 'collapse') return false;
+    if (parseFloat(style.opacity) === 0) return false;
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+function isEnabled(el) { return !el.disabled; }
+"""
+
+# 稳定定位：页面刷新或重新渲染后仍能找回同一个输入框的CSS选择器
+# 唯一的id（问卷星填空题输入框为 #q1、#q2 ...）-> 唯一的name -> 从最近的带唯一id的祖先（如题目容器 #div3）起的nth-of-type路径
+_JS_FIELD_LOCATOR = r"""
+function isUniqueSelector(selector) {
+    try { return document.querySelectorAll(selector).length === 1; } catch (e) { return false; }
+}
+function fieldLocator(el) {
+    var tag = el.tagName.toLowerCase();
+    if (el.id && isUniqueSelector('#' + CSS.escape(el.id))) return '#' + CSS.escape(el.id);
+    var name = el.getAttribute('name');
+    if (name) {
+        var byName = tag + '[name="' + name.replace(/\\/g, '\\\\').replace(/"/g, '\\"') + '"]';
+        if (isUniqueSelector(byName)) return byName;
+    }
+    var path = [], node = el;
+    while (node && node.parentElement && node !== document.body) {
+        var index = 1;
+        for (var sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+            if (sib.tagName === node.tagName) index++;
+        }
+        path.unshift(node.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+        node = node.parentElement;
+        if (node.id && isUniqueSelector('#' + CSS.escape(node.id))) {
+            path.unshift('#' + CSS.escape(node.id));
+            return path.join(' > ');
+        }
+    }
+    path.unshift('body');
+    return path.join(' > ');
+}
+"""
+
+# 输入框选择器（与各脚本find_input_elements中的选择器一致，合并为一条）
+INPUT_SELECTOR = ', '.join([
+    'input[type="text"]',
+    'input[type="password"]',
+    'input[type="email"]',
+    'input[type="number"]',
+    'input[type="tel"]',
+    'input[type="search"]',
+    'input[type="url"]',
+    'textarea',
+    'input:not([type])',
+])
+
+# 标签提取：优先级与extract_chinese_near_input相同
+# label -> 兄弟元素 -> 父元素 -> placeholder -> 前面的文本节点
+_JS_RESOLVE_LABEL = r"""
+function precedingLabels(input, limit) {
+    var result = [];
+    var labels = document.getElementsByTagName('label');
+    for (var i = labels.length - 1; i >= 0 && result.length < limit; i--) {
+        var lab = labels[i];
+        var pos = input.compareDocumentPosition(lab);
+        if ((pos & Node.DOCUMENT_POSITION_PRECEDING) && !(pos & Node.DOCUMENT_POSITION_CONTAINS)) {
+            result.push(lab);
+        }
+    }
+    return result;
+}
+function precedingTextNode(input) {
+    var walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, null);
+    walker.currentNode = input;
+    var node;
+    while ((node = walker.previousNode())) {
+        if (input.contains(node)) continue;
+        var text = node.textContent.trim();
+        if (text) return text;
+    }
+    return '';
+}
+// 各方法单独成函数，返回找到的中文文字或空字符串
+var LABEL_METHODS = {
+    // 方法1: 前面的label元素
+    label: function (input) {
+        var labels = precedingLabels(input, 5);
+        for (var i = 0; i < labels.length; i++) {
+            var text = textOf(labels[i]);
+            if (hasChinese(text)) return text;
+        }
+        return '';
+    },
+    // 方法2: 前面的兄弟元素
+    sibling: function (input) {
+        var sib = input.previousElementSibling;
+        for (var i = 0; sib && i < 5; i++, sib = sib.previousElementSibling) {
+            var text = textOf(sib);
+            if (hasChinese(text)) return text;
+        }
+        return '';
+    },
+    // 方法3: 父元素中的文本
+    ancestor: function (input) {
+        var anc = input.parentElement;
+        for (var i = 0; anc && i < 3; i++, anc = anc.parentElement) {
+            var lines = textOf(anc).split('\n');
+            for (var j = 0; j < lines.length; j++) {
+                var line = lines[j].trim();
+                if (line && hasChinese(line) && line.length < 50) return line;
+            }
+        }
+        return '';
+    },
+    // 方法4: placeholder
+    placeholder: function (input) {
+        var placeholder = input.getAttribute('placeholder');
+        return hasChinese(placeholder) ? placeholder : '';
+    },
+    // 方法5: 前面的文本节点
+    text_node: function (input) {
+        var text = precedingTextNode(input);
+        return hasChinese(text) ? text : '';
+    }
+};
+var DEFAULT_LABEL_ORDER = ['label', 'sibling', 'ancestor', 'placeholder', 'text_node'];
+
+function resolveLabel(input, order) {
+    order = order || DEFAULT_LABEL_ORDER;
+    for (var i = 0; i < order.length; i++) {
+        var text = LABEL_METHODS[order[i]](input);
+        if (text) return {text: text, method: order[i]};
+    }
+    return {text: '', method: ''};
+}
+"""
+
+# 标签提取方法名称（默认顺序）
+LABEL_METHODS = ('label', 'sibling', 'ancestor', 'placeholder', 'text_node')
+
+# 批量查找：一次组合选择器查询 + 页面内可见性判断，结果按文档顺序且不重复，同时给出各输入框的稳定定位
+DISCOVER_INPUTS_JS = _JS_HELPERS + _JS_FIELD_LOCATOR + r"""
+var nodes = document.querySelectorAll(arguments[0]);
+var results = [];
+for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    if (!isVisible(el) || !isEnabled(el)) continue;
+    var rect = el.getBoundingClientRect();
+    results.push({
+        element: el,
+        tag: el.tagName.toLowerCase(),
+        type: (el.getAttribute('type') || '').toLowerCase(),
+        name: el.getAttribute('name') || '',
+        id: el.id || '',
+        locator: fieldLocator(el),
+        rect: {x: rect.left + window.scrollX, y: rect.top + window.scrollY,
+               width: rect.width, height: rect.height}
+    });
+}
+return results;
+"""
+
+# 提交按钮候选选择器（合并QR_URL_button.find_submit_buttons中的选择器）
+SUBMIT_CANDIDATE_SELECTOR = ', '.join([
+    '#ctlNext',
+    '.submitbtn',
+    'div[class*="submit"]',
+    'div[class*="btn"]',
+    'div[id*="submit"]',
+    'div[id*="next"]',
+    'div[id*="ctl_Next"]',
+    'button',
+    'input[type="submit"]',
+    'input[type="button"]',
+    'a[class*="btn"]',
+    'span[class*="btn"]',
+    '[role="button"]',
+])
+
+# 提交按钮评分：文字、id/class特征、可见性和位置一次算完，只返回得分最高的一个
+LOCATE_SUBMIT_JS = _JS_HELPERS + r"""
+var candidates = Array.prototype.slice.call(document.querySelectorAll(arguments[0]));
+var minScore = arguments[1];
+// 文字中含提交类关键字的叶子元素（对应原来的文本XPath查找）
+var textNodes = document.querySelectorAll('div, span, a, button, input, label');
+for (var t = 0; t < textNodes.length; t++) {
+    var node = textNodes[t];
+    if (node.children.length === 0 && /提交|下一步|确认|submit/i.test(node.textContent || '')) candidates.push(node);
+}
+
+var TEXT_RULES = [[/^\s*提交\s*$/, 100], [/提交/, 60], [/下一步/, 50], [/确认/, 40], [/submit/i, 40]];
+var docHeight = Math.max(document.documentElement.scrollHeight, 1);
+var seen = [], best = null;
+
+for (var i = 0; i < candidates.length; i++) {
+    var el = candidates[i];
+    if (seen.indexOf(el) !== -1) continue;
+    seen.push(el);
+    if (!isVisible(el) || !isEnabled(el)) continue;
+
+    var text = textOf(el) || el.value || '';
+    var id = el.id || '', cls = (typeof el.className === 'string') ? el.className : '';
+    var score = 0, reasons = [];
+
+    for (var r = 0; r < TEXT_RULES.length; r++) {
+        if (TEXT_RULES[r][0].test(text)) { score += TEXT_RULES[r][1]; reasons.push('text'); break; }
+    }
+    if (id === 'ctlNext') { score += 80; reasons.push('id=ctlNext'); }
+    else if (/submit|next/i.test(id)) { score += 30; reasons.push('id'); }
+    if (/(^|\s)submitbtn(\s|$)/.test(cls)) { score += 60; reasons.push('class=submitbtn'); }
+    else if (/submit/i.test(cls)) { score += 20; reasons.push('class'); }
+    else if (/btn/i.test(cls)) { score += 5; }
+
+    var tag = el.tagName.toLowerCase();
+    var type = (el.getAttribute('type') || '').toLowerCase();
+    if ((tag === 'button' || tag === 'input') && type === 'submit') score += 10;
+    if (text.length > 20) score -= 40;  // 文字过长多半是包含按钮的容器
+
+    // 提交按钮一般位于页面下方
+    var rect = el.getBoundingClientRect();
+    var pageY = rect.top + window.scrollY;
+    score += Math.min(20, 20 * pageY / docHeight);
+
+    if (!best || score > best.score) {
+        best = {element: el, score: score, reasons: reasons, tag: tag, text: text.slice(0, 50),
+                id: id, cls: cls, type: type, value: el.value || '', name: el.getAttribute('name') || '',
+                rect: {x: rect.left + window.scrollX, y: pageY, width: rect.width, height: rect.height}};
+    }
+}
+return (best && best.score >= minScore) ? best : null;
+"""
+
+# 批量提取：arguments[0]为输入框列表（为空时在页面内自行查找可见输入框），
+# arguments[2]为方法顺序（为空时按默认顺序），顺序中没有的方法在前面都没找到时补充尝试
+EXTRACT_LABELS_JS = _JS_HELPERS + _JS_RESOLVE_LABEL + r"""
+var inputs = arguments[0];
+if (!inputs || !inputs.length) {
+    inputs = Array.prototype.filter.call(document.querySelectorAll(arguments[1]), function (el) {
+        return isVisible(el) && isEnabled(el);
+    });
+}
+var order = arguments[2] || DEFAULT_LABEL_ORDER;
+var rest = DEFAULT_LABEL_ORDER.filter(function (method) { return order.indexOf(method) < 0; });
+var results = [];
+for (var k = 0; k < inputs.length; k++) {
+    var resolved;
+    try {
+        resolved = resolveLabel(inputs[k], order);
+        if (!resolved.method && rest.length) resolved = resolveLabel(inputs[k], rest);
+    } catch (e) { resolved = {text: '', method: ''}; }
+    results.push({element: inputs[k], text: resolved.text, method: resolved.method});
+}
+return results;
+"""
+
+# 单个方法的测量：arguments[0]为输入框列表，arguments[1]为方法名（为空时按默认顺序完整提取）
+PROBE_LABEL_METHOD_JS = _JS_HELPERS + _JS_RESOLVE_LABEL + r"""
+var inputs = arguments[0], method = arguments[1];
+var results = [];
+for (var k = 0; k < inputs.length; k++) {
+    var start = performance.now(), text = '', used = '';
+    try {
+        if (method) { text = LABEL_METHODS[method](inputs[k]); used = text ? method : ''; }
+        else { var resolved = resolveLabel(inputs[k]); text = resolved.text; used = resolved.method; }
+    } catch (e) {}
+    results.push({text: text, method: used, ms: performance.now() - start});
+}
+return results;
+"""
+
+
+# ==================== 工具函数 ====================
+
+def discover_inputs(driver, selector=INPUT_SELECTOR):
+    """一次往返查找页面中所有可见且可用的输入框
+
+    返回列表（文档顺序），每项为 {'element', 'tag', 'type', 'name', 'id', 'locator', 'rect'}，
+    locator为稳定的CSS定位（见field_refs），rect为 {'x', 'y', 'width', 'height'}（页面坐标）
+    """
+    return driver.execute_script(DISCOVER_INPUTS_JS, selector) or []
+
+
+def locate_submit_button(driver, min_score=40):
+    """一次往返找出得分最高的提交按钮
+
+    返回与各脚本get_button_info相同结构的字典（另含score），找不到时返回None
+    """
+    best = driver.execute_script(LOCATE_SUBMIT_JS, SUBMIT_CANDIDATE_SELECTOR, min_score)
+    if not best:
+        return None
+
+    selector = f"#{best['id']}" if best['id'] else best['tag'] + ''.join(f".{c}" for c in best['cls'].split())
+    attributes = {'id': best['id'], 'class': best['cls'], 'type': best['type'],
+                  'value': best['value'], 'name': best['name']}
+    rect = best['rect']
+    return {
+        'element': best['element'],
+        'tag_name': best['tag'],
+        'text': best['text'].strip(),
+        'selector_used': f"JS评分: {selector} ({', '.join(best['reasons']) or '位置'})",
+        'attributes': {key: value for key, value in attributes.items() if value},
+        'location': {'x': rect['x'], 'y': rect['y']},
+        'size': {'width': rect['width'], 'height': rect['height']},
+        'score': best['score'],
+    }
+
+
+def probe_label_method(driver, input_elements, method=None):
+    """逐个输入框单独运行一种标签提取方法并计时（页面内），用于基准测试
+
+    method为LABEL_METHODS之一，None表示完整的默认顺序；返回 [{'text', 'method', 'ms'}, ...]
+    """
+    return driver.execute_script(PROBE_LABEL_METHOD_JS, list(input_elements), method) or []
+
+
+def extract_labels_batch(driver, input_elements=None, order=None):
+    """一次往返提取所有输入框附近的中文文字
+
+    order为方法顺序（LABEL_METHODS的子集或重排，None为默认顺序），未列出的方法在前面都没找到时补充尝试；
+    返回列表，每项为 {'element': 输入框, 'text': 中文文字, 'method': 命中的方法}，
+    method取值为 label / sibling / ancestor / placeholder / text_node，未找到时为空字符串
+    """
+    return driver.execute_script(EXTRACT_LABELS_JS, list(input_elements or []), INPUT_SELECTOR,
+                                 list(order) if order else None) or []
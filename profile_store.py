@@ -0,0 +1,135 @@
+"""
+填写配置（答案）存储
+功能：四个脚本共用一个配置文件（TOML或JSON），内容为 题目关键字 -> 填写内容 以及默认填写值；
+      首次加载时编译为匹配器并保存为二进制缓存（以文件修改时间和大小为键），之后直接读取缓存；
+      运行中配置文件被修改时自动重新加载，修改答案不需要重启浏览器
+
+配置文件格式（TOML）:
+    default_value = "默认填写"
+
+    [answers]
+    "姓名" = "张三"
+    "学号" = "20250001"
+
+JSON格式为 {"default_value": "...", "answers": {"姓名": "张三", ...}}
+"""
+
+import json
+import os
+import pickle
+import time
+
+from dict_matcher import KeywordMatcher
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10及以下
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_FILE = os.path.join(BASE_DIR, 'profile.toml')
+# 仓库中的示例配置，profile.toml不存在时使用
+EXAMPLE_PROFILE_FILE = os.path.join(BASE_DIR, 'profile.example.toml')
+
+DEFAULT_VALUE = "默认填写"
+
+# 缓存格式版本，KeywordMatcher结构变化时加1使旧缓存失效
+CACHE_VERSION = 1
+
+# 两次检查文件是否变化的最短间隔（秒）
+CHECK_INTERVAL = 0.5
+
+
+class Profile:
+    """编译后的配置：答案字典、匹配器和默认填写值"""
+
+    def __init__(self, answers, default_value=DEFAULT_VALUE, source=''):
+        self.answers = dict(answers)
+        self.default_value = default_value
+        self.source = source
+        self.matcher = KeywordMatcher(self.answers)
+
+
+def parse_profile(path):
+    """读取配置文件，返回 (答案字典, 默认填写值)"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        if tomllib is None:
+            raise RuntimeError("读取TOML配置需要Python 3.11或安装tomli，也可以改用JSON配置文件")
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+
+    answers = data.get('answers', {})
+    if not isinstance(answers, dict):
+        raise ValueError(f"配置文件 {path} 中的answers应为 关键字 = 内容 的表")
+    return {str(key): str(value) for key, value in answers.items()}, str(data.get('default_value', DEFAULT_VALUE))
+
+
+class ProfileStore:
+    def __init__(self, path=PROFILE_FILE, fallback=EXAMPLE_PROFILE_FILE):
+        """path不存在时使用fallback（仓库中的示例配置）"""
+        self.path = path if os.path.exists(path) or not fallback else fallback
+        if self.path != path:
+            print(f"未找到配置文件 {path}，使用示例配置 {self.path}")
+        self.cache_path = self.path + '.cache'
+        self.profile = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self.load()
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """加载配置：缓存与文件一致时读取缓存，否则重新编译并写入缓存"""
+        stamp = self._file_stamp()
+        key = (CACHE_VERSION, os.path.abspath(self.path), stamp)
+        profile = self._read_cache(key)
+        if profile is None:
+            answers, default_value = parse_profile(self.path)
+            profile = Profile(answers, default_value, self.path)
+            self._write_cache(key, profile)
+        self.profile = profile
+        self._stamp = stamp
+        self._checked_at = time.monotonic()
+        return profile
+
+    def _read_cache(self, key):
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cached_key, profile = pickle.load(f)
+            return profile if cached_key == key else None
+        except Exception:
+            return None
+
+    def _write_cache(self, key, profile):
+        """先写临时文件再替换，避免中途退出留下损坏的缓存"""
+        tmp_path = self.cache_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, profile), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"保存配置缓存失败: {e}")
+
+    def reload_if_changed(self):
+        """文件被修改时重新加载，返回是否重新加载；解析失败时保留原配置"""
+        now = time.monotonic()
+        if now - self._checked_at < CHECK_INTERVAL:
+            return False
+        self._checked_at = now
+        try:
+            if self._file_stamp() == self._stamp:
+                return False
+            self.load()
+        except Exception as e:
+            print(f"重新加载配置失败，继续使用原配置: {e}")
+            return False
+        print(f"✓ 配置已重新加载: {len(self.profile.answers)} 个关键字")
+        return True
@@ -0,0 +1,91 @@
+"""
+资源屏蔽工具
+功能：在反复刷新等待问卷开放的阶段，屏蔽图片、字体、媒体和统计/广告脚本，减少每次加载的数据量和渲染时间；
+      问卷自身的页面和脚本不受影响，点击提交前解除屏蔽，保证验证码等资源正常加载
+
+Selenium驱动使用CDP Network.setBlockedURLs（按地址通配符屏蔽）：execute_cdp_cmd收不到Fetch.requestPaused事件，
+无法逐个请求判断，因此资源类型和放行列表只在请求拦截方式下生效（验证码在解除屏蔽后加载，不受影响）；
+CDP直连后端（driver_backend.CdpBackend）使用Fetch请求拦截，另外按资源类型屏蔽，并支持放行列表
+"""
+
+import re
+from urllib.parse import urlsplit
+
+# 屏蔽的资源类型（仅请求拦截方式可用）
+BLOCKED_RESOURCE_TYPES = ('Image', 'Font', 'Media')
+
+# 按扩展名屏蔽的图片、字体、音视频
+BLOCKED_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'webp', 'bmp', 'ico', 'svg',
+                      'woff', 'woff2', 'ttf', 'otf', 'eot', 'mp3', 'mp4', 'webm')
+
+# 屏蔽的地址（通配符*，匹配整个地址），与CDP Network.setBlockedURLs的格式一致：统计与广告
+BLOCK_PATTERNS = [
+    '*hm.baidu.com*', '*cnzz.com*', '*51.la*', '*google-analytics.com*', '*googletagmanager.com*',
+    '*doubleclick.net*', '*googlesyndication.com*', '*umeng.com*', '*growingio.com*', '*sensorsdata*',
+]
+
+# 放行的地址：即使命中屏蔽规则也不屏蔽（验证码相关资源）
+ALLOW_PATTERNS = ['*captcha*', '*verify*', '*geetest*', '*nocaptcha*']
+
+
+def _compile(patterns):
+    if not patterns:
+        return None
+    return re.compile('|'.join('^' + '.*'.join(re.escape(part) for part in pattern.split('*')) + '$'
+                               for pattern in patterns), re.I)
+
+
+class ResourceRules:
+    def __init__(self, block_patterns=BLOCK_PATTERNS, allow_patterns=ALLOW_PATTERNS,
+                 block_types=BLOCKED_RESOURCE_TYPES, block_extensions=BLOCKED_EXTENSIONS):
+        self.block_patterns = list(block_patterns)
+        self.allow_patterns = list(allow_patterns)
+        self.block_types = set(block_types)
+        self.block_extensions = tuple(f'.{extension.lower()}' for extension in block_extensions)
+        self._block_re = _compile(self.block_patterns)
+        self._allow_re = _compile(self.allow_patterns)
+
+    def should_block(self, url, resource_type=None):
+        """放行列表优先，其次按资源类型、地址路径的扩展名和地址判断"""
+        if self._allow_re and self._allow_re.match(url):
+            return False
+        if resource_type in self.block_types:
+            return True
+        if urlsplit(url).path.lower().endswith(self.block_extensions):
+            return True
+        return bool(self._block_re and self._block_re.match(url))
+
+    def blocked_urls(self):
+        """Network.setBlockedURLs使用的通配符列表
+
+        扩展名只匹配地址结尾或紧跟查询参数的位置（*.png、*.png?*），不会屏蔽查询参数中间含有 .png 字样的页面和接口
+        """
+        extension_patterns = [pattern for extension in self.block_extensions
+                              for pattern in (f'*{extension}', f'*{extension}?*')]
+        return extension_patterns + self.block_patterns
+
+
+def block_resources(driver, rules=None):
+    """开启资源屏蔽，返回使用的方式（'intercept' 或 'blocked_urls'），失败时返回None"""
+    rules = rules or ResourceRules()
+    try:
+        if hasattr(driver, 'set_request_filter'):
+            driver.set_request_filter(rules.should_block)
+            return 'intercept'
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': rules.blocked_urls()})
+        return 'blocked_urls'
+    except Exception as e:
+        print(f"开启资源屏蔽失败: {e}")
+        return None
+
+
+def release_resource_blocking(driver):
+    """解除资源屏蔽（提交前调用）；未开启时无影响"""
+    try:
+        if hasattr(driver, 'set_request_filter'):
+            driver.set_request_filter(None)
+        else:
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+    except Exception as e:
+        print(f"解除资源屏蔽失败: {e}")
@@ -0,0 +1,115 @@
+"""
+问卷结构缓存工具
+功能：把某个问卷解析出的"输入框 -> 标签 -> 字典关键字"方案和提交按钮定位保存到本地，
+      以问卷URL + 题目DOM指纹为键；再次运行时指纹一致即跳过标签提取、字典匹配和按钮查找，直接填写
+"""
+
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from page_scan import _JS_FIELD_LOCATOR
+
+# 缓存文件（与脚本放在同一目录）
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'survey_structure_cache.json')
+
+# ==================== 页面内脚本 ====================
+
+# arguments: 输入框元素列表
+# 为每个输入框生成签名（标签名/类型/name/id + 所在题目的文字）和稳定的CSS定位（与field_refs相同）
+SCAN_STRUCTURE_JS = _JS_FIELD_LOCATOR + r"""
+var elements = arguments[0] || [];
+var QUESTION_SELECTOR = '.field, .div_question, [topic], fieldset, li';
+
+var signatures = [], locators = [];
+for (var i = 0; i < elements.length; i++) {
+    var el = elements[i];
+    var question = el.closest(QUESTION_SELECTOR);
+    var questionText = question ? (question.innerText || question.textContent || '').trim().slice(0, 100) : '';
+    signatures.push([el.tagName.toLowerCase(), el.type || '', el.getAttribute('name') || '',
+                     el.id || '', questionText].join('|'));
+    locators.push(fieldLocator(el));
+}
+return {signatures: signatures, locators: locators};
+"""
+
+
+# ==================== 工具函数 ====================
+
+def normalize_url(url):
+    """去掉URL中的#片段，作为缓存键"""
+    parts = urlsplit(url or '')
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, parts.query, ''))
+
+
+def scan_structure(driver, input_elements):
+    """一次往返计算问卷结构指纹和各输入框的CSS定位
+
+    返回 {'fingerprint': 指纹, 'locators': [CSS选择器, ...]}
+    """
+    data = driver.execute_script(SCAN_STRUCTURE_JS, list(input_elements)) or {}
+    signatures = data.get('signatures') or []
+    digest = hashlib.sha1('\n'.join(signatures).encode('utf-8')).hexdigest()
+    return {'fingerprint': digest, 'locators': data.get('locators') or []}
+
+
+def keys_digest(keys):
+    """字典关键字集合的摘要：增删任何关键字都可能改变标签的匹配结果，摘要不同的缓存方案不再使用"""
+    return hashlib.sha1('\n'.join(sorted(keys)).encode('utf-8')).hexdigest()
+
+
+def element_locator(driver, element):
+    """计算单个元素（如提交按钮）的稳定CSS定位，计算失败时返回None"""
+    try:
+        return (driver.execute_script(SCAN_STRUCTURE_JS, [element]) or {}).get('locators', [None])[0]
+    except Exception:
+        return None
+
+
+class StructureCache:
+    def __init__(self, path=None):
+        """加载缓存文件（默认CACHE_FILE），文件不存在或损坏时从空缓存开始"""
+        self.path = path or CACHE_FILE
+        self.entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def lookup(self, url, fingerprint, keys=None):
+        """查找与指纹一致的填写方案；给出keys时，保存方案时的字典关键字集合与之不同也视为失效，返回None"""
+        entry = self.entries.get(normalize_url(url))
+        if not entry or entry.get('fingerprint') != fingerprint:
+            return None
+        if keys is not None and entry.get('keys_digest') != keys_digest(keys):
+            return None
+        return entry
+
+    def store(self, url, fingerprint, fields, submit_locator=None, keys=None):
+        """保存填写方案：fields为 [{'locator', 'label', 'key'}, ...]，key为None表示填写默认值；
+        keys为匹配时使用的字典关键字，只保存其摘要"""
+        self.entries[normalize_url(url)] = {
+            'fingerprint': fingerprint,
+            'keys_digest': keys_digest(keys) if keys is not None else None,
+            'fields': fields,
+            'submit': submit_locator,
+            'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self.save()
+
+    def invalidate(self, url):
+        if self.entries.pop(normalize_url(url), None) is not None:
+            self.save()
+
+    def save(self):
+        """先写临时文件再替换，避免中途退出留下损坏的缓存"""
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"保存结构缓存失败: {e}")
@@ -0,0 +1,308 @@
+"""
+提交结果检测工具
+功能：点击提交按钮后不再固定等待，而是同时监听提交请求的响应（CDP Network事件 / 页面内请求钩子）、
+      完成页面、校验错误提示和验证码，一旦结果明确立即返回，并给出结构化的结果原因
+"""
+
+import json
+import re
+import time
+
+from page_ready import script_timeout
+from tracing import span
+
+# 结果类型
+OUTCOME_SUCCESS = 'success'                    # 提交成功
+OUTCOME_VALIDATION_ERROR = 'validation_error'  # 有未通过校验的题目
+OUTCOME_NEEDS_CAPTCHA = 'needs_captcha'        # 需要完成验证码
+OUTCOME_TIMEOUT = 'timeout'                    # 超时仍无明确结果
+OUTCOME_ERROR = 'error'                        # 提交请求失败
+
+# 问卷星提交请求的地址（/joinnew/processjq.ashx等），不匹配页面上其他含submit字样的统计、日志请求
+SUBMIT_URL_PATTERN = r'/processjq\.ashx'
+
+CAPTCHA_KEYWORDS = ["验证码", "安全验证", "智能验证", "滑动", "captcha"]
+SUCCESS_KEYWORDS = ["提交成功", "答卷已经提交", "感谢您的参与", "感谢您的填写"]
+
+# 问卷星题目下方的校验错误提示（未作答、格式不正确等，题目同时以红色高亮）
+VALIDATION_ERROR_SELECTOR = '.errorMessage, .field-error, .wjx-error, [class*="errorMsg"]'
+
+# ==================== 页面内脚本 ====================
+
+# 提交前安装：记录与提交地址匹配的XHR/fetch响应
+# 同时记下点击前页面上已有的成功提示文字（如问卷说明里的"感谢您"）和已显示的校验错误提示，避免误判
+ARM_MONITOR_JS = r"""
+var pattern = new RegExp(arguments[0], 'i'), successWords = arguments[1], errorSelector = arguments[2];
+var pageText = document.body ? document.body.innerText : '';
+var presentWords = successWords.filter(function (word) { return pageText.indexOf(word) !== -1; });
+var presentErrors = [];
+if (errorSelector) {
+    var errorNodes = document.querySelectorAll(errorSelector);
+    for (var i = 0; i < errorNodes.length; i++) {
+        var style = window.getComputedStyle(errorNodes[i]), rect = errorNodes[i].getBoundingClientRect();
+        if (style.display === 'none' || style.visibility === 'hidden' || !rect.width || !rect.height) continue;
+        var text = (errorNodes[i].innerText || '').trim();
+        if (text) presentErrors.push(text.slice(0, 50));
+    }
+}
+if (window.__submitMonitor) {
+    window.__submitMonitor.events = [];
+    window.__submitMonitor.pattern = pattern;
+    window.__submitMonitor.presentWords = presentWords;
+    window.__submitMonitor.presentErrors = presentErrors;
+    return;
+}
+var monitor = window.__submitMonitor = {events: [], pattern: pattern, presentWords: presentWords,
+                                        presentErrors: presentErrors};
+function record(url, status, body) {
+    if (monitor.pattern.test(url || '')) {
+        monitor.events.push({url: url, status: status, body: String(body || '').slice(0, 500)});
+    }
+}
+var rawOpen = XMLHttpRequest.prototype.open, rawSend = XMLHttpRequest.prototype.send;
+XMLHttpRequest.prototype.open = function (method, url) {
+    this.__monitorUrl = url;
+    return rawOpen.apply(this, arguments);
+};
+XMLHttpRequest.prototype.send = function () {
+    var xhr = this;
+    xhr.addEventListener('loadend', function () {
+        var body = '';
+        try { body = xhr.responseText; } catch (e) {}
+        record(xhr.__monitorUrl, xhr.status, body);
+    });
+    return rawSend.apply(this, arguments);
+};
+if (window.fetch) {
+    var rawFetch = window.fetch;
+    window.fetch = function (input) {
+        var url = (typeof input === 'string') ? input : (input && input.url);
+        return rawFetch.apply(this, arguments).then(function (response) {
+            response.clone().text().then(function (body) { record(url, response.status, body); });
+            return response;
+        });
+    };
+}
+"""
+
+# 等待一个时间片：有请求结果或页面信号时立即返回，否则时间片结束返回null
+CHECK_OUTCOME_JS = r"""
+var sliceMs = arguments[0], captchaWords = arguments[1], successWords = arguments[2], errorSelector = arguments[3];
+var done = arguments[arguments.length - 1];
+var finished = false, observer = null;
+
+function visible(el) {
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden') return false;
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+function visibleTexts(selector) {
+    var texts = [];
+    var nodes = document.querySelectorAll(selector);
+    for (var i = 0; i < nodes.length && texts.length < 5; i++) {
+        if (!visible(nodes[i])) continue;
+        var text = (nodes[i].innerText || '').trim();
+        if (text) texts.push(text.slice(0, 50));
+    }
+    return texts;
+}
+function inspect() {
+    var monitor = window.__submitMonitor;
+    if (monitor && monitor.events.length) {
+        var ev = monitor.events.shift();  // 每个响应只报告一次，无法判断时之后继续检查页面
+        return {source: 'xhr', url: ev.url, status: ev.status, body: ev.body};
+    }
+    var captcha = document.querySelector('#divCaptcha, #captchaOut, .nc_wrapper, .geetest_panel, iframe[src*="captcha"]');
+    if (captcha && visible(captcha)) return {source: 'dom', outcome: 'needs_captcha', reason: '页面出现验证码'};
+
+    var presentErrors = (monitor && monitor.presentErrors) || [];
+    var errors = visibleTexts(errorSelector).filter(function (text) { return presentErrors.indexOf(text) === -1; });
+    if (errors.length) return {source: 'dom', outcome: 'validation_error', reason: errors.join('; ')};
+
+    var bodyText = document.body ? document.body.innerText.slice(0, 2000) : '';
+    var presentWords = (monitor && monitor.presentWords) || [];
+    for (var i = 0; i < successWords.length; i++) {
+        if (presentWords.indexOf(successWords[i]) !== -1) continue;
+        if (bodyText.indexOf(successWords[i]) !== -1) {
+            return {source: 'dom', outcome: 'success', reason: '页面显示: ' + successWords[i]};
+        }
+    }
+    var popupText = visibleTexts('.layui-layer-content, .popup, [class*="dialog"], [class*="toast"]').join(' ');
+    for (var j = 0; j < captchaWords.length; j++) {
+        if (popupText.indexOf(captchaWords[j]) !== -1) {
+            return {source: 'dom', outcome: 'needs_captcha', reason: '弹窗提示: ' + captchaWords[j]};
+        }
+    }
+    return null;
+}
+function finish(result) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    done(result);
+}
+var first = inspect();
+if (first) {
+    finish(first);
+} else {
+    observer = new MutationObserver(function () { var r = inspect(); if (r) finish(r); });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true,
+                                                attributeFilter: ['style', 'class']});
+    setTimeout(function () { finish(inspect()); }, sliceMs);
+}
+"""
+
+
+# ==================== 工具函数 ====================
+
+def classify_submit_response(status, body):
+    """根据提交请求的响应判断结果，无法判断时返回None"""
+    body = body or ''
+    if status and int(status) >= 400:
+        return OUTCOME_ERROR, f"提交请求返回HTTP {status}"
+    for keyword in CAPTCHA_KEYWORDS:
+        if keyword.lower() in body.lower():
+            return OUTCOME_NEEDS_CAPTCHA, f"提交响应要求验证: {body[:80]}"
+    # 问卷星提交成功时响应以"10"开头，后面跟完成页地址
+    if body.startswith('10') or 'complete' in body or any(keyword in body for keyword in SUCCESS_KEYWORDS):
+        return OUTCOME_SUCCESS, "提交请求已成功返回"
+    # 其他响应（如跳转脚本、提示文字）不足以判断，交给页面上的校验提示和地址变化
+    return None
+
+
+class SubmitMonitor:
+    def __init__(self, driver, url_pattern=SUBMIT_URL_PATTERN):
+        self.driver = driver
+        self.url_pattern = url_pattern
+        self.before_url = ''
+        self.network_enabled = False
+        self._pending_requests = {}  # requestId -> (url, status)
+
+    def arm(self):
+        """点击提交前调用：记录当前地址，开启Network事件并安装页面内请求钩子"""
+        self.before_url = self.driver.current_url
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.get_log('performance')  # 清空点击前的旧事件
+            self.network_enabled = True
+        except Exception:
+            # 浏览器未开启performance日志时只依赖页面内钩子
+            self.network_enabled = False
+        try:
+            self.driver.execute_script(ARM_MONITOR_JS, self.url_pattern, SUCCESS_KEYWORDS, VALIDATION_ERROR_SELECTOR)
+        except Exception as e:
+            print(f"安装提交监听失败: {e}")
+
+    def adopt(self, before_url):
+        """接管页面内已安装的监听（如预装脚本已在页面内完成点击），只记录点击前地址"""
+        self.before_url = before_url
+        self.network_enabled = False
+
+    def _check_network(self):
+        """读取CDP Network事件，提交请求完成时取响应内容判断结果"""
+        pattern = re.compile(self.url_pattern, re.I)
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            self.network_enabled = False
+            return None
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if pattern.search(response.get('url', '')):
+                    self._pending_requests[params.get('requestId')] = (response.get('url'), response.get('status'))
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                request_id = params.get('requestId')
+                if request_id not in self._pending_requests:
+                    continue
+                url, status = self._pending_requests.pop(request_id)
+                if method == 'Network.loadingFailed':
+                    return OUTCOME_ERROR, f"提交请求失败: {params.get('errorText', '')}", 'network'
+                body = ''
+                try:
+                    body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id}).get('body', '')
+                except Exception:
+                    pass
+                result = classify_submit_response(status, body)
+                if result:
+                    return result + ('network',)
+        return None
+
+    def wait_for_outcome(self, timeout=10, slice_seconds=0.25):
+        """等待提交结果，返回 {'outcome', 'reason', 'source', 'elapsed', 'url'}"""
+        with span('submit_confirm'), script_timeout(self.driver, slice_seconds + 5):
+            return self._wait_for_outcome(timeout, slice_seconds)
+
+    def _wait_for_outcome(self, timeout, slice_seconds):
+        start = time.time()
+        deadline = start + timeout
+        last_response = ''
+
+        def result(outcome, reason, source):
+            try:
+                url = self.driver.current_url
+            except Exception:
+                url = ''
+            return {'outcome': outcome, 'reason': reason, 'source': source,
+                    'elapsed': round(time.time() - start, 3), 'url': url}
+
+        while time.time() < deadline:
+            if self.network_enabled:
+                network_result = self._check_network()
+                if network_result:
+                    return result(*network_result)
+
+            try:
+                signal = self.driver.execute_async_script(CHECK_OUTCOME_JS, int(slice_seconds * 1000),
+                                                          CAPTCHA_KEYWORDS, SUCCESS_KEYWORDS,
+                                                          VALIDATION_ERROR_SELECTOR)
+            except Exception:
+                # 页面跳转时脚本会被中断，交给下面的地址检查
+                signal = None
+
+            if signal and signal.get('source') == 'xhr':
+                classified = classify_submit_response(signal.get('status'), signal.get('body'))
+                if classified:
+                    return result(classified[0], classified[1], 'xhr')
+                last_response = signal.get('body') or ''
+            elif signal:
+                return result(signal['outcome'], signal['reason'], 'dom')
+
+            # 地址变化说明已跳转到完成页
+            try:
+                current_url = self.driver.current_url
+            except Exception:
+                continue
+            if current_url != self.before_url:
+                if any(word in current_url.lower() for word in ('captcha', 'verify')):
+                    return result(OUTCOME_NEEDS_CAPTCHA, f"跳转到验证页面: {current_url}", 'navigation')
+                return result(OUTCOME_SUCCESS, f"页面已跳转: {current_url}", 'navigation')
+
+        reason = f"{timeout}秒内未检测到提交结果"
+        if last_response:
+            reason += f"（最后响应: {last_response[:80]}）"
+        return result(OUTCOME_TIMEOUT, reason, 'timeout')
+
+
+def enable_network_logging(edge_options):
+    """开启performance日志，使SubmitMonitor能读取CDP Network事件
+
+    日志从浏览器启动起一直积累，等待期间需定期调用discard_network_log清空
+    """
+    edge_options.set_capability('ms:loggingPrefs', {'performance': 'ALL'})
+
+
+def discard_network_log(driver):
+    """丢弃performance日志中已积累的事件，避免等待数小时后点击提交时才一次读取全部积压；日志不可用时返回False"""
+    try:
+        driver.get_log('performance')
+        return True
+    except Exception:
+        return False
@@ -0,0 +1,104 @@
+"""
+合成问卷生成器
+功能：按指定比例生成标签位置受控的问卷HTML（label / 前面的兄弟元素 / 父元素文字 / 仅placeholder / 裸文本节点），
+      可混入干扰文字，并把每个输入框的正确答案写入同名的 .truth.json 文件，供标签提取基准测试使用
+
+运行: python survey_generator.py [--fields 100] [--seed 1] [--decoy-rate 0.3] [--out synthetic_surveys]
+"""
+
+import argparse
+import html
+import json
+import os
+import random
+
+from mock_wjx_server import FIELD_TOPICS
+
+# 标签位置，与page_scan.LABEL_METHODS的方法名一致
+PLACEMENTS = ('label', 'sibling', 'ancestor', 'placeholder', 'text_node')
+
+# 干扰文字：含中文但不含任何字典关键字
+DECOY_TEXTS = ["个人信息", "请认真填写", "以下为必填项", "基本情况", "（必填）", "温馨提示：请如实作答"]
+
+# 干扰方式
+DECOYS = ('section_header', 'hint_before', 'hidden_text')
+
+
+def render_field(index, topic, placement, decoy=None, decoy_text=''):
+    """生成一道题，返回HTML；输入框id为 f{index}"""
+    field_id = f"f{index}"
+    title = html.escape(f"{index}. {topic}")
+    input_tag = f'<input type="text" id="{field_id}" name="{field_id}">'
+
+    if placement == 'label':
+        body = f'<label for="{field_id}">{title}</label>{input_tag}'
+    elif placement == 'sibling':
+        body = f'<div class="title">{title}</div>{input_tag}'
+    elif placement == 'ancestor':
+        # 输入框没有前面的兄弟元素，文字在祖父元素中
+        body = f'<div class="q">{title}<div class="answer">{input_tag}</div></div>'
+    elif placement == 'placeholder':
+        body = f'<input type="text" id="{field_id}" name="{field_id}" placeholder="请输入{html.escape(topic)}">'
+    else:  # text_node：文字是裸文本节点，输入框嵌在表格中，三层祖先内都没有文字
+        body = f'{title}<table><tbody><tr><td>{input_tag}</td></tr></tbody></table>'
+
+    decoy_html = html.escape(decoy_text)
+    if decoy == 'section_header':
+        return f'<h3 class="section">{decoy_html}</h3><div class="field" topic="{index}">{body}</div>'
+    if decoy == 'hint_before':
+        # 提示文字紧挨在输入框前面
+        if placement == 'placeholder':
+            body = f'<span class="hint">{decoy_html}</span>{body}'
+        else:
+            body = body.replace(input_tag, f'<span class="hint">{decoy_html}</span>{input_tag}', 1)
+    elif decoy == 'hidden_text':
+        body = f'<div style="display:none">{decoy_html}</div>{body}'
+    return f'<div class="field" topic="{index}">{body}</div>'
+
+
+def generate_survey(fields=100, seed=1, decoy_rate=0.3, placements=PLACEMENTS):
+    """生成问卷，返回 (HTML, 正确答案列表)"""
+    rng = random.Random(seed)
+    parts, truth = [], []
+    for index in range(1, fields + 1):
+        topic = rng.choice(FIELD_TOPICS)
+        placement = placements[(index - 1) % len(placements)]
+        decoy = rng.choice(DECOYS) if rng.random() < decoy_rate else None
+        decoy_text = rng.choice(DECOY_TEXTS) if decoy else ''
+        parts.append(render_field(index, topic, placement, decoy, decoy_text))
+        truth.append({'id': f"f{index}", 'key': topic, 'placement': placement,
+                      'decoy': decoy, 'decoy_text': decoy_text})
+
+    page = ('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>合成问卷</title></head><body>\n'
+            f'<div id="divQuestion">\n' + '\n'.join(parts) + '\n</div>\n'
+            '<div id="ctlNext" class="submitbtn">提交</div>\n</body></html>\n')
+    return page, truth
+
+
+def write_survey(out_dir, fields=100, seed=1, decoy_rate=0.3):
+    """生成问卷并写入 out_dir/survey_{fields}_{seed}.html 和对应的 .truth.json，返回HTML路径"""
+    os.makedirs(out_dir, exist_ok=True)
+    page, truth = generate_survey(fields, seed, decoy_rate)
+    base = os.path.join(out_dir, f"survey_{fields}_{seed}")
+    with open(base + '.html', 'w', encoding='utf-8') as f:
+        f.write(page)
+    with open(base + '.truth.json', 'w', encoding='utf-8') as f:
+        json.dump({'fields': fields, 'seed': seed, 'decoy_rate': decoy_rate, 'truth': truth},
+                  f, ensure_ascii=False, indent=2)
+    return base + '.html'
+
+
+def load_truth(html_path):
+    """读取HTML对应的正确答案文件"""
+    with open(os.path.splitext(html_path)[0] + '.truth.json', 'r', encoding='utf-8') as f:
+        return json.load(f)['truth']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='生成标签位置受控的合成问卷')
+    parser.add_argument('--fields', type=int, default=100, help='题目数')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子')
+    parser.add_argument('--decoy-rate', type=float, default=0.3, help='加入干扰文字的题目比例')
+    parser.add_argument('--out', default='synthetic_surveys', help='输出目录')
+    args = parser.parse_args()
+    print(f"已生成: {write_survey(args.out, args.fields, args.seed, args.decoy_rate)}")
@@ -0,0 +1,157 @@
+"""
+耗时追踪工具
+功能：按阶段记录耗时（浏览器启动、打开网页、等待就绪、查找输入框、提取标签、填写、查找按钮、确认提交），
+      同时拦截WebDriver命令，统计每个阶段内各命令的次数和耗时，结果写入JSON文件
+"""
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+# 当前正在记录的追踪器，未开启追踪时为None，span()不做任何事
+_active_tracer = None
+
+
+class Tracer:
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        self._t0 = time.perf_counter()
+        self._driver = None
+        self.spans = []  # 按开始顺序排列
+        self._stack = []
+        # 不在任何阶段内的命令记到这里
+        self.unscoped = self._new_span('(阶段外)', None)
+
+    def _now_ms(self):
+        return (time.perf_counter() - self._t0) * 1000
+
+    def _new_span(self, name, parent):
+        return {'name': name, 'parent': parent, 'start_ms': self._now_ms(), 'duration_ms': None,
+                'command_count': 0, 'command_ms': 0.0, 'commands': {}}
+
+    @contextmanager
+    def span(self, name):
+        """记录一个阶段；阶段可以嵌套，WebDriver命令计入最内层的阶段"""
+        parent = self._stack[-1]['name'] if self._stack else None
+        record = self._new_span(name, parent)
+        self.spans.append(record)
+        self._stack.append(record)
+        try:
+            yield record
+        finally:
+            record['duration_ms'] = self._now_ms() - record['start_ms']
+            self._stack.pop()
+
+    # ---------- WebDriver命令拦截 ----------
+
+    def attach(self, driver):
+        """拦截driver.execute：WebElement的操作也经由它发送，因此能统计到全部命令"""
+        if self._driver is not None:
+            return
+        original_execute = driver.execute
+
+        def traced_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return original_execute(driver_command, params)
+            finally:
+                self._record_command(driver_command, (time.perf_counter() - start) * 1000)
+
+        driver.execute = traced_execute
+        self._driver = driver
+
+    def detach(self):
+        """恢复driver.execute"""
+        if self._driver is not None:
+            try:
+                del self._driver.execute
+            except AttributeError:
+                pass
+            self._driver = None
+
+    def _record_command(self, command, elapsed_ms):
+        record = self._stack[-1] if self._stack else self.unscoped
+        record['command_count'] += 1
+        record['command_ms'] += elapsed_ms
+        stats = record['commands'].setdefault(command, {'count': 0, 'ms': 0.0})
+        stats['count'] += 1
+        stats['ms'] += elapsed_ms
+
+    # ---------- 汇总输出 ----------
+
+    def stage_totals(self):
+        """按阶段名称汇总（同名阶段可能出现多次，如逐个输入框提取标签）"""
+        totals = {}
+        for record in self.spans + [self.unscoped]:
+            if record is self.unscoped and not record['command_count']:
+                continue
+            stage = totals.setdefault(record['name'], {'count': 0, 'duration_ms': 0.0,
+                                                        'command_count': 0, 'command_ms': 0.0})
+            stage['count'] += 1
+            stage['duration_ms'] += record['duration_ms'] or 0.0
+            stage['command_count'] += record['command_count']
+            stage['command_ms'] += record['command_ms']
+        return totals
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'started_at': self.started_at,
+            'total_ms': round(self._now_ms(), 3),
+            'stages': self.stage_totals(),
+            'spans': self.spans,
+            'unscoped': self.unscoped,
+        }
+
+    def write(self, path):
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            print(f"耗时追踪已写入: {path}")
+        except OSError as e:
+            print(f"写入耗时追踪失败: {e}")
+
+    def print_summary(self):
+        print("\n各阶段耗时:")
+        for name, stage in self.stage_totals().items():
+            times = f" x{stage['count']}" if stage['count'] > 1 else ''
+            print(f"  {name}{times}: {stage['duration_ms']:.1f} 毫秒，"
+                  f"WebDriver命令 {stage['command_count']} 次 / {stage['command_ms']:.1f} 毫秒")
+
+
+def start_trace(name):
+    """开始追踪并设为当前追踪器"""
+    global _active_tracer
+    _active_tracer = Tracer(name)
+    return _active_tracer
+
+
+def stop_trace():
+    """结束追踪，恢复driver并返回追踪器"""
+    global _active_tracer
+    tracer, _active_tracer = _active_tracer, None
+    if tracer is not None:
+        tracer.detach()
+    return tracer
+
+
+def span(name):
+    """在当前追踪器中记录一个阶段；未开启追踪时不做任何事"""
+    if _active_tracer is None:
+        return nullcontext()
+    return _active_tracer.span(name)
+
+
+def attach_driver(driver):
+    """让当前追踪器统计该driver的WebDriver命令"""
+    if _active_tracer is not None:
+        _active_tracer.attach(driver)
+
+
+def finish_trace(path):
+    """结束追踪，显示各阶段耗时并写入JSON文件"""
+    tracer = stop_trace()
+    if tracer is not None:
+        tracer.print_summary()
+        tracer.write(path)